@@ -12,6 +12,7 @@ from .glue_error import (
     GlueError,
     GlueTableFetchError,
     GlueTableMigrationError,
+    SchemaInferenceError,
 )
 from .iam_error import RoleNotFound, PolicyNotFound
 from .query_execution_error import (
@@ -27,3 +27,12 @@ class GlueTableMigrationError(GlueError):
             f"Failed to migrate table {self.__original_table} to {self.__new_table} "
             f"in database {self.__glue_database}"
         )
+
+
+class SchemaInferenceError(GlueError):
+    def __init__(self, s3_object, reason):
+        self.__s3_object = s3_object
+        self.__reason = reason
+
+    def __str__(self):
+        return f"Unable to infer glue schema of {self.__s3_object} - {self.__reason}"
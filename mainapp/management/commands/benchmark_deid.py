@@ -0,0 +1,87 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from mainapp.utils.deidentification import benchmark
+from mainapp.utils.deidentification.method_handler import MethodHandler
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark de-identification end to end on a synthetic data source with every action of every "
+        "lynx type, optionally saving the results as a baseline or failing on regressions from one."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=100000)
+        parser.add_argument(
+            "--columns",
+            type=int,
+            default=None,
+            help="Columns of the data source, a column of every action of every lynx type by default",
+        )
+        parser.add_argument(
+            "--engine",
+            action="append",
+            dest="engines",
+            choices=[MethodHandler.ROW_ENGINE, MethodHandler.COLUMNAR_ENGINE],
+            help="Engines to benchmark, all of them by default",
+        )
+        parser.add_argument("--workers", type=int, default=1)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--save-baseline", help="Path of a json file to save the results to"
+        )
+        parser.add_argument(
+            "--baseline", help="Path of a json file of results to compare to"
+        )
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=0.2,
+            help="Fraction by which results may be worse than the baseline",
+        )
+
+    def handle(self, *args, **options):
+        setup = {
+            "rows": options["rows"],
+            "columns": len(benchmark.benchmark_attributes(options["columns"])),
+            "workers": options["workers"],
+            "seed": options["seed"],
+        }
+        baseline = None
+        if options["baseline"]:
+            with open(options["baseline"]) as f:
+                baseline = json.load(f)
+
+            baseline_setup = {key: baseline[key] for key in setup}
+            if baseline_setup != setup:
+                raise CommandError(
+                    f"The baseline was measured with {baseline_setup}, not {setup}"
+                )
+
+        results = benchmark.benchmark(
+            rows=options["rows"],
+            columns=options["columns"],
+            engines=options["engines"],
+            workers=options["workers"],
+            seed=options["seed"],
+        )
+        self.stdout.write(json.dumps(results, indent=2))
+
+        if options["save_baseline"]:
+            with open(options["save_baseline"], "w") as f:
+                json.dump(results, f, indent=2)
+
+        if baseline is None:
+            return
+
+        regressions = benchmark.find_regressions(
+            results, baseline, options["tolerance"]
+        )
+        if regressions:
+            raise CommandError(
+                "De-identification regressed:\n" + "\n".join(regressions)
+            )
+
+        self.stdout.write(self.style.SUCCESS("No regressions from the baseline"))
@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from mainapp.utils.deidentification.common.deid_helper_functions import (
+    resume_abandoned_methods,
+)
+from mainapp.utils.deidentification.scheduler import deid_scheduler
+
+
+class Command(BaseCommand):
+    help = (
+        "Resume the abandoned de-identification jobs of every dataset and wait for them, "
+        "meant to be run periodically, e.g. by cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=10,
+            help="Seconds between checks whether the resumed jobs are done",
+        )
+
+    def handle(self, *args, **options):
+        method_ids = resume_abandoned_methods()
+        self.stdout.write(f"Resumed the jobs of {len(method_ids)} methods")
+
+        while any(deid_scheduler.has_tag(method_id) for method_id in method_ids):
+            time.sleep(options["poll_interval"])
+
+        self.stdout.write(self.style.SUCCESS("The resumed jobs are done"))
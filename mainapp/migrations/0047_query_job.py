@@ -0,0 +1,43 @@
+# Generated by Django 2.2.1 on 2026-10-18 10:00
+
+from django.conf import settings
+import django.contrib.postgres.fields.jsonb
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mainapp', '0046_deid'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QueryJob',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('type', models.CharField(default='query', max_length=32)),
+                ('state', models.CharField(default='pending', max_length=32)),
+                ('query', models.TextField()),
+                ('count_query', models.TextField(blank=True, null=True)),
+                ('sample_aprx', models.IntegerField(blank=True, null=True)),
+                ('limit', models.IntegerField(blank=True, null=True)),
+                ('return_count', models.BooleanField(default=False)),
+                ('count', models.BigIntegerField(blank=True, null=True)),
+                ('count_execution_id', models.CharField(blank=True, max_length=64, null=True)),
+                ('execution_id', models.CharField(blank=True, max_length=64, null=True)),
+                ('columns_types', django.contrib.postgres.fields.jsonb.JSONField(blank=True, default=None, null=True)),
+                ('error', models.TextField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('data_source', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='query_jobs', to='mainapp.DataSource')),
+                ('dataset', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='query_jobs', to='mainapp.Dataset')),
+                ('user', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='query_jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'query_jobs',
+            },
+        ),
+    ]
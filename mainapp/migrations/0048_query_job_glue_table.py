@@ -0,0 +1,18 @@
+# Generated by Django 2.2.1 on 2026-10-18 11:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mainapp', '0047_query_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='queryjob',
+            name='glue_table',
+            field=models.CharField(blank=True, max_length=255, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 2.2.1 on 2026-10-18 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mainapp', '0048_query_job_glue_table'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='organizationpreference',
+            name='key',
+            field=models.CharField(choices=[('can_copy_paste_in_notebook', 'can_copy_paste_in_notebook'), ('deid_workers', 'deid_workers')], max_length=32),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 2.2.1 on 2026-10-18 14:00
+
+import django.contrib.postgres.fields.jsonb
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mainapp', '0049_organization_preference_deid_workers'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='datasourcemethod',
+            name='checkpoint',
+            field=django.contrib.postgres.fields.jsonb.JSONField(blank=True, default=None, null=True),
+        ),
+        migrations.AddField(
+            model_name='datasourcemethod',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, default=django.utils.timezone.now, null=True),
+        ),
+    ]
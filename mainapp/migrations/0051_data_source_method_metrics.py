@@ -0,0 +1,19 @@
+# Generated by Django 2.2.1 on 2026-10-18 16:00
+
+import django.contrib.postgres.fields.jsonb
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mainapp', '0050_data_source_method_checkpoint'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='datasourcemethod',
+            name='metrics',
+            field=django.contrib.postgres.fields.jsonb.JSONField(blank=True, default=None, null=True),
+        ),
+    ]
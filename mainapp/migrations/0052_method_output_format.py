@@ -0,0 +1,18 @@
+# Generated by Django 2.2.1 on 2026-10-18 17:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mainapp', '0051_data_source_method_metrics'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='method',
+            name='output_format',
+            field=models.CharField(choices=[('csv', 'csv'), ('parquet', 'parquet')], default='csv', max_length=32),
+        ),
+    ]
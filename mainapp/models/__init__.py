@@ -8,6 +8,7 @@ from .execution import Execution
 from .method import Method
 from .organization import Organization
 from .organization_preference import OrganizationPreference
+from .query_job import QueryJob
 from .request import Request
 from .study import Study
 from .study_dataset import StudyDataset
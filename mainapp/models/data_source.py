@@ -1,5 +1,6 @@
 import logging
 import uuid
+from itertools import islice
 
 from botocore.exceptions import ClientError
 from django.contrib.postgres.fields import JSONField
@@ -9,6 +10,7 @@ from django.dispatch import receiver
 
 from mainapp.exceptions.limited_key_invalid_exception import LimitedKeyInvalidException
 from mainapp.exceptions.s3 import BucketNotFound
+from mainapp.utils import csv_stream
 from mainapp.utils.data_source import (
     delete_data_source_glue_tables,
     delete_data_source_files_from_bucket,
@@ -21,6 +23,7 @@ from mainapp.utils.deidentification import (
     LynxDataTypeNames,
     DataTypes,
     COL_NAME_ROW_INDEX,
+    EXAMPLE_QUERY_LENGTH,
     EXAMPLE_VALUES_ROW_INDEX,
 )
 
@@ -122,7 +125,8 @@ class DataSource(models.Model):
             f"Querying table {self.dataset.glue_database}.{self.glue_table} for examples"
         )
         example_values_query_response = self.dataset.query(
-            f"SELECT * FROM {','.join(column_example_queries)};"
+            f"SELECT * FROM {','.join(column_example_queries)};",
+            glue_table=self.glue_table,
         )
 
         response_object = self.dataset.get_query_execution(
@@ -132,13 +136,18 @@ class DataSource(models.Model):
         logger.info(
             f"Received example values for {self.dataset.glue_database}.{self.glue_table}"
         )
-        query_result = (
-            response_object["Body"].read().decode("utf-8").replace('"', "").split("\n")
+        query_result = list(
+            islice(
+                csv_stream.read_rows(csv_stream.open_body(response_object["Body"])),
+                EXAMPLE_QUERY_LENGTH,
+            )
         )
+        if len(query_result) < EXAMPLE_QUERY_LENGTH:
+            return dict()
 
         col_names, example_values = (
-            query_result[COL_NAME_ROW_INDEX].split(","),
-            query_result[EXAMPLE_VALUES_ROW_INDEX].split(","),
+            query_result[COL_NAME_ROW_INDEX],
+            query_result[EXAMPLE_VALUES_ROW_INDEX],
         )
         examples = dict()
 
@@ -1,7 +1,11 @@
+import datetime
 import logging
 
 from django.contrib.postgres.fields import JSONField
 from django.db import models
+from django.utils import timezone
+
+from mainapp import settings
 
 logger = logging.getLogger(__name__)
 
@@ -11,6 +15,9 @@ class DataSourceMethod(models.Model):
     PENDING = "pending"
     ERROR = "error"
 
+    # the attributes of a column which its deid values depend on
+    DEID_COLUMN_KEYS = ["action", "lynx_type", "arguments"]
+
     method = models.ForeignKey(
         "Method",
         on_delete=models.CASCADE,
@@ -28,6 +35,10 @@ class DataSourceMethod(models.Model):
     included = models.BooleanField(default=True)
     attributes = JSONField(default=dict)
     state = models.CharField(default=PENDING, blank=True, max_length=32)
+    checkpoint = JSONField(null=True, blank=True, default=None)
+    heartbeat_at = models.DateTimeField(null=True, blank=True, default=timezone.now)
+    metrics = JSONField(null=True, blank=True, default=None)
+    processed = JSONField(null=True, blank=True, default=None)
 
     class Meta:
         db_table = "data_source_methods"
@@ -42,6 +53,12 @@ class DataSourceMethod(models.Model):
         else:
             logger.info(f"DataSourceMethod {self} state was changed to {state}")
             self.state = state
+            # checkpoints only matter while the job is pending
+            if state == self.PENDING:
+                self.heartbeat_at = timezone.now()
+                self.metrics = None
+            else:
+                self.checkpoint = None
             self.save()
 
     def set_as_pending(self):
@@ -56,5 +73,69 @@ class DataSourceMethod(models.Model):
     def is_ready(self):
         return self.state == self.READY
 
+    def beat(self, checkpoint=None, metrics=None):
+        """
+        Record that the de-identification job of the method is alive, along with its latest checkpoint
+        and metrics. Returns False if another worker took the job over since the last beat of this instance.
+        """
+        heartbeat_at = timezone.now()
+        checkpoint = self.checkpoint if checkpoint is None else checkpoint
+        metrics = self.metrics if metrics is None else metrics
+        updated = DataSourceMethod.objects.filter(
+            id=self.id, heartbeat_at=self.heartbeat_at
+        ).update(heartbeat_at=heartbeat_at, checkpoint=checkpoint, metrics=metrics)
+        if updated:
+            self.heartbeat_at, self.checkpoint, self.metrics = (
+                heartbeat_at,
+                checkpoint,
+                metrics,
+            )
+
+        return bool(updated)
+
+    @property
+    def is_abandoned(self):
+        return self.state == self.PENDING and (
+            not self.heartbeat_at
+            or timezone.now() - self.heartbeat_at
+            > datetime.timedelta(seconds=settings.DEID_HEARTBEAT_TIMEOUT)
+        )
+
+    @property
+    def deid_settings(self):
+        """
+        Everything the deid output of the method depends on, besides its source objects.
+        """
+        return {
+            "columns": {
+                col: {key: col_attributes.get(key) for key in self.DEID_COLUMN_KEYS}
+                for col, col_attributes in self.attributes.items()
+            },
+            "group_age_over": self.method.group_age_over,
+            "output_format": self.method.output_format,
+        }
+
+    def pending_objects(self, source_objects):
+        """
+        The source objects ({key: ETag}) which the ready output of the method doesn't cover yet.
+        Returns None when the whole output must be rebuilt: it isn't ready, its deid settings changed since it
+        was built, or objects it covers were changed or removed.
+        """
+        processed = self.processed or dict()
+        if self.state != self.READY or processed.get("settings") != self.deid_settings:
+            return None
+
+        processed_objects = processed.get("objects") or dict()
+        if any(
+            source_objects.get(key) != etag for key, etag in processed_objects.items()
+        ):
+            return None
+
+        return {
+            key: etag
+            for key, etag in source_objects.items()
+            if key not in processed_objects
+        }
+
     def __str__(self):
         return f"<DataSourceMethod - Method:{self.method.id}, DataSource:{self.data_source.id}>"
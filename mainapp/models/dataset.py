@@ -5,7 +5,7 @@ from django.contrib.postgres.fields import JSONField
 from django.db import models
 
 from mainapp.settings import DELETE_DATASETS_FROM_DATABASE
-from mainapp.utils import lib, aws_service
+from mainapp.utils import lib, aws_service, athena_waiter, query_cache
 from mainapp.utils.dataset import delete_aws_resources_for_dataset
 from .dataset_user import DatasetUser
 from .study import Study
@@ -98,25 +98,59 @@ class Dataset(models.Model):
             # This will trigger data_source `delete_data_source` @receiver also as there is a CASCADE set onDelete.
             super(Dataset, self).delete()
 
-    def query(self, query):
+    def query(self, query, glue_table=None):
+        """
+        Start an Athena execution for the query.
+        Read queries over a single table should pass `glue_table` so an identical query over the same
+        version of the table is answered from the result cache.
+        """
         client = aws_service.create_athena_client(org_name=self.organization.name)
 
-        return client.start_query_execution(
-            QueryString=query,
-            QueryExecutionContext={"Database": self.glue_database},
-            ResultConfiguration={
-                "OutputLocation": f"s3://{self.bucket}/temp_execution_results"
-            },
+        return query_cache.start_query_execution(
+            client,
+            org_name=self.organization.name,
+            query=query,
+            glue_database=self.glue_database,
+            output_location=f"s3://{self.bucket}/temp_execution_results",
+            glue_table=glue_table,
         )
 
-    def get_s3_object(self, key):
+    def describe_query_execution(self, query_execution_id):
+        client = aws_service.create_athena_client(org_name=self.organization.name)
+
+        return client.get_query_execution(QueryExecutionId=query_execution_id)[
+            "QueryExecution"
+        ]
+
+    def get_query_results(self, query_execution_id, next_token=None, max_results=None):
+        client = aws_service.create_athena_client(org_name=self.organization.name)
+        kwargs = {"QueryExecutionId": query_execution_id}
+        if next_token:
+            kwargs["NextToken"] = next_token
+        if max_results:
+            kwargs["MaxResults"] = max_results
+
+        return client.get_query_results(**kwargs)
+
+    def get_s3_object(self, key, retries=60):
         return lib.get_s3_object(
-            bucket=self.bucket, key=key, org_name=self.organization.name
+            bucket=self.bucket,
+            key=key,
+            org_name=self.organization.name,
+            retries=retries,
         )
 
+    @staticmethod
+    def query_execution_key(query_execution_id):
+        return "temp_execution_results/" + query_execution_id + ".csv"
+
     def get_query_execution(self, query_execution_id):
+        athena_waiter.wait_for_query_execution(
+            self.organization.name, query_execution_id
+        )
+        # the result object exists once the execution succeeded, no need to retry for it
         return self.get_s3_object(
-            key="temp_execution_results/" + query_execution_id + ".csv"
+            key=self.query_execution_key(query_execution_id), retries=0
         )
 
     def get_columns_types(self, glue_table):
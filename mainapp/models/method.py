@@ -1,7 +1,11 @@
 import uuid
 
 from django.db import models
+from django.db.models import signals
+from django.dispatch import receiver
+
 from mainapp.models import DataSourceMethod
+from mainapp.utils.deidentification.scheduler import deid_scheduler
 
 
 class Method(models.Model):
@@ -9,6 +13,10 @@ class Method(models.Model):
     PENDING = "pending"
     ERROR = "error"
 
+    CSV = "csv"
+    PARQUET = "parquet"
+    output_formats = ((CSV, "csv"), (PARQUET, "parquet"))
+
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     name = models.CharField(max_length=255)
     dataset = models.ForeignKey(
@@ -22,6 +30,7 @@ class Method(models.Model):
         unique=True, null=False, blank=False, default=uuid.uuid4
     )
     group_age_over = models.BooleanField(default=False)
+    output_format = models.CharField(choices=output_formats, default=CSV, max_length=32)
     updated_at = models.DateTimeField(auto_now=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
@@ -44,3 +53,9 @@ class Method(models.Model):
             return self.PENDING
 
         return self.READY
+
+
+@receiver(signals.pre_delete, sender=Method)
+def cancel_method_jobs(sender, instance, **kwargs):
+    # jobs shared with other methods stay queued, and skip this method as it can no longer claim its job
+    deid_scheduler.cancel(instance.id)
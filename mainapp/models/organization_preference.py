@@ -5,7 +5,13 @@ from django.db import models
 
 class OrganizationPreference(models.Model):
     CAN_COPY_PASTE_IN_NOTEBOOK = "can_copy_paste_in_notebook"
-    possible_keys = ((CAN_COPY_PASTE_IN_NOTEBOOK, "can_copy_paste_in_notebook"),)
+    DEID_WORKERS = "deid_workers"
+    DEID_MAX_JOBS = "deid_max_jobs"
+    possible_keys = (
+        (CAN_COPY_PASTE_IN_NOTEBOOK, "can_copy_paste_in_notebook"),
+        (DEID_WORKERS, "deid_workers"),
+        (DEID_MAX_JOBS, "deid_max_jobs"),
+    )
 
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     organization = models.ForeignKey(
@@ -0,0 +1,225 @@
+import logging
+import uuid
+
+from django.contrib.postgres.fields import JSONField
+from django.db import models
+
+from mainapp.utils import statistics
+
+logger = logging.getLogger(__name__)
+
+
+class QueryJob(models.Model):
+    """
+    An Athena query submitted on behalf of a user.
+
+    Jobs never wait on Athena: every call to `refresh` checks the current execution once, and when a stage
+    is done it starts the next one (e.g. the count query of a sampled query is followed by the sampled query).
+    """
+
+    PENDING = "pending"
+    READY = "ready"
+    ERROR = "error"
+
+    QUERY = "query"
+    STATISTICS = "statistics"
+
+    ATHENA_RUNNING_STATES = ["QUEUED", "RUNNING"]
+    ATHENA_SUCCEEDED = "SUCCEEDED"
+    MAX_PAGE_SIZE = 1000
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    type = models.CharField(default=QUERY, max_length=32)
+    state = models.CharField(default=PENDING, max_length=32)
+    user = models.ForeignKey(
+        "User", on_delete=models.CASCADE, related_name="query_jobs", null=True
+    )
+    dataset = models.ForeignKey(
+        "Dataset", on_delete=models.CASCADE, related_name="query_jobs"
+    )
+    data_source = models.ForeignKey(
+        "DataSource", on_delete=models.CASCADE, related_name="query_jobs", null=True
+    )
+    glue_table = models.CharField(null=True, blank=True, max_length=255)
+    query = models.TextField()
+    count_query = models.TextField(null=True, blank=True)
+    sample_aprx = models.IntegerField(null=True, blank=True)
+    limit = models.IntegerField(null=True, blank=True)
+    return_count = models.BooleanField(default=False)
+    count = models.BigIntegerField(null=True, blank=True)
+    count_execution_id = models.CharField(null=True, blank=True, max_length=64)
+    execution_id = models.CharField(null=True, blank=True, max_length=64)
+    columns_types = JSONField(null=True, blank=True, default=None)
+    error = models.TextField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "query_jobs"
+
+    def __str__(self):
+        return f"<QueryJob id={self.id} type={self.type} state={self.state}>"
+
+    @property
+    def needs_count(self):
+        return bool(self.sample_aprx or self.return_count)
+
+    @property
+    def final_query(self):
+        final_query = self.query
+        if self.sample_aprx and self.count and self.count > self.sample_aprx:
+            percentage = int((self.sample_aprx / self.count) * 100)
+            final_query = f"{final_query} TABLESAMPLE BERNOULLI({percentage})"
+
+        if self.limit:
+            final_query += f" LIMIT {self.limit}"
+
+        return final_query
+
+    def is_ready(self):
+        return self.state == self.READY
+
+    def set_as_error(self, error):
+        logger.error(f"QueryJob {self.id} failed - {error}")
+        self.state = self.ERROR
+        self.error = str(error)
+        self.save()
+
+    def __start_final_query(self):
+        final_query = self.final_query
+        logger.debug(f"Final query for QueryJob {self.id}: {final_query}")
+        self.execution_id = self.dataset.query(final_query, glue_table=self.glue_table)[
+            "QueryExecutionId"
+        ]
+        self.save()
+
+    def submit(self):
+        """
+        Start the first stage of the job and return immediately
+        """
+        try:
+            if self.needs_count:
+                logger.debug(f"Count query for QueryJob {self.id}: {self.count_query}")
+                self.count_execution_id = self.dataset.query(
+                    self.count_query, glue_table=self.glue_table
+                )["QueryExecutionId"]
+                self.save()
+            else:
+                self.__start_final_query()
+        except Exception as e:
+            self.set_as_error(e)
+
+    def __check_execution(self, query_execution_id):
+        query_execution = self.dataset.describe_query_execution(query_execution_id)
+        state = query_execution["Status"]["State"]
+        if state not in self.ATHENA_RUNNING_STATES and state != self.ATHENA_SUCCEEDED:
+            self.set_as_error(
+                query_execution["Status"].get(
+                    "StateChangeReason", f"Query execution {state.lower()}"
+                )
+            )
+
+        return query_execution
+
+    def __read_count(self):
+        rows = self.dataset.get_query_results(self.count_execution_id)["ResultSet"][
+            "Rows"
+        ]
+        return int(rows[1]["Data"][0]["VarCharValue"])
+
+    def refresh(self):
+        """
+        Check the current Athena execution of the job once, advancing the job if its stage is done.
+        Returns the Athena `QueryExecution` of the current stage (None if no stage was started).
+        """
+        if self.state != self.PENDING:
+            return (
+                self.dataset.describe_query_execution(self.execution_id)
+                if self.execution_id
+                else None
+            )
+
+        try:
+            if not self.execution_id:
+                query_execution = self.__check_execution(self.count_execution_id)
+                if query_execution["Status"]["State"] != self.ATHENA_SUCCEEDED:
+                    return query_execution
+
+                self.count = self.__read_count()
+                self.__start_final_query()
+
+            query_execution = self.__check_execution(self.execution_id)
+            if query_execution["Status"]["State"] == self.ATHENA_SUCCEEDED:
+                self.state = self.READY
+                self.save()
+        except Exception as e:
+            self.set_as_error(e)
+            return None
+
+        return query_execution
+
+    @staticmethod
+    def __convert(value, column_type):
+        if value is None or value == "":
+            return None
+        try:
+            if column_type == "bigint":
+                return int(value)
+            if column_type == "double":
+                return float(value)
+        except ValueError:
+            return str(value)
+
+        return str(value)
+
+    def results(self, page_token=None, page_size=MAX_PAGE_SIZE, result_format=None):
+        """
+        Fetch a single page of the job's results.
+        The header row Athena returns at the top of the first page is left out of `rows`.
+        """
+        if self.type == self.STATISTICS:
+            return self.__statistics_results()
+
+        response = self.dataset.get_query_results(
+            self.execution_id,
+            next_token=page_token,
+            max_results=min(page_size, self.MAX_PAGE_SIZE),
+        )
+        column_info = response["ResultSet"]["ResultSetMetadata"]["ColumnInfo"]
+        rows = [
+            [data.get("VarCharValue") for data in row["Data"]]
+            for row in response["ResultSet"]["Rows"]
+        ]
+        if not page_token and rows:
+            rows = rows[1:]
+
+        columns = [column["Name"] for column in column_info]
+        if result_format == "json":
+            result = {
+                column["Name"]: [
+                    self.__convert(row[index], column["Type"]) for row in rows
+                ]
+                for index, column in enumerate(column_info)
+            }
+        else:
+            result = rows
+
+        return {
+            "columns": columns,
+            "result": result,
+            "next_page_token": response.get("NextToken"),
+        }
+
+    def __statistics_results(self):
+        response = self.dataset.get_query_results(self.execution_id)
+        default_athena_col_names = statistics.create_default_column_names(
+            self.columns_types
+        )
+
+        return {
+            "result": statistics.sql_response_processing(
+                response, default_athena_col_names
+            ),
+            "columns_types": self.columns_types,
+            "max_count": statistics.max_count(response),
+        }
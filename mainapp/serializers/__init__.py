@@ -14,6 +14,7 @@ from .organization_preference import (
     SingleOrganizationPreferenceSerializer,
 )
 from .query import QuerySerializer
+from .query_job import QueryJobSerializer
 from .request import RequestSerializer
 from .simple_query import SimpleQuerySerializer
 from .study import StudySerializer
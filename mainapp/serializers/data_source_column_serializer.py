@@ -1,7 +1,9 @@
 from botocore.exceptions import ClientError
 from http import HTTPStatus
+from itertools import islice
 from rest_framework.serializers import empty, JSONField, Serializer, ValidationError
 
+from mainapp.utils import csv_stream
 from mainapp.utils.deidentification import (
     DATA_TYPE_CASTING,
     LYNX_DATA_TYPES,
@@ -24,7 +26,8 @@ class DataSourceColumnsSerializer(Serializer):
     def __get_curr_results_from_glue(self, data_source):
         try:
             first_row_query_response = data_source.dataset.query(
-                f'SELECT * FROM "{data_source.glue_table}" limit 1;'
+                f'SELECT * FROM "{data_source.glue_table}" limit 1;',
+                glue_table=data_source.glue_table,
             )
         except ClientError as e:
             raise ValidationError(
@@ -37,20 +40,19 @@ class DataSourceColumnsSerializer(Serializer):
             response_object = data_source.dataset.get_query_execution(
                 first_row_query_response["QueryExecutionId"]
             )
-            query_result = (
-                response_object["Body"]
-                .read()
-                .decode("utf-8")
-                .replace('"', "")
-                .split("\n")
+            query_result = list(
+                islice(
+                    csv_stream.read_rows(csv_stream.open_body(response_object["Body"])),
+                    EXAMPLE_QUERY_LENGTH,
+                )
             )
 
             if len(query_result) < EXAMPLE_QUERY_LENGTH:
                 raise NoExamplesError("Full data is empty, Can't validate data")
             result = dict()
             col_names, first_values = (
-                query_result[COL_NAME_ROW_INDEX].split(","),
-                query_result[EXAMPLE_VALUES_ROW_INDEX].split(","),
+                query_result[COL_NAME_ROW_INDEX],
+                query_result[EXAMPLE_VALUES_ROW_INDEX],
             )
             for col_index in range(len(col_names)):
                 result[col_names[col_index]] = first_values[col_index]
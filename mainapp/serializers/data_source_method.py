@@ -6,6 +6,7 @@ from mainapp.models import DataSourceMethod
 class DataSourceMethodSerializer(ModelSerializer):
     class Meta:
         model = DataSourceMethod
-        fields = ("method", "data_source", "included", "attributes")
+        fields = ("method", "data_source", "included", "attributes", "state", "metrics")
+        read_only_fields = ("state", "metrics")
 
         extra_kwargs = {"method": {"read_only": True}}
@@ -16,6 +16,7 @@ class MethodSerializer(ModelSerializer):
             "dataset",
             "data_source_methods",
             "group_age_over",
+            "output_format",
             "state",
             "updated_at",
             "created_at",
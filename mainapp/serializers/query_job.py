@@ -0,0 +1,23 @@
+from rest_framework.serializers import ModelSerializer
+
+from mainapp.models import QueryJob
+
+
+class QueryJobSerializer(ModelSerializer):
+    class Meta:
+        model = QueryJob
+        fields = (
+            "id",
+            "type",
+            "state",
+            "dataset",
+            "data_source",
+            "query",
+            "count_query",
+            "count",
+            "execution_id",
+            "error",
+            "updated_at",
+            "created_at",
+        )
+        read_only_fields = fields
@@ -142,6 +142,86 @@ SECURED_BUCKET = False
 # but MUST BE set to False in production!
 DELETE_DATASETS_FROM_DATABASE = False
 
+# boto3 clients and resources are pooled per organization (see `mainapp.utils.client_pool`).
+AWS_CLIENT_POOL_MAX_SIZE = 128
+AWS_CLIENT_POOL_IDLE_TIMEOUT = 900  # seconds
+
+# Pending Athena executions are checked together by `mainapp.utils.athena_waiter`.
+ATHENA_WAITER_MIN_INTERVAL = 0.5  # seconds
+ATHENA_WAITER_MAX_INTERVAL = 5  # seconds
+ATHENA_WAITER_MAX_WAIT = 3600  # seconds
+
+# Read queries are answered from `mainapp.utils.query_cache` while their table is unchanged.
+# The TTL must stay below the expiration of `temp_execution_results` (1 day).
+ATHENA_RESULT_CACHE_MAX_SIZE = 1024
+ATHENA_RESULT_CACHE_TTL = 3600  # seconds
+
+# Glue tables of uploaded CSVs are created from a schema inferred on a sample of the file ("inference"),
+# or by a glue crawler ("crawler"). Inference falls back to a crawler for files it can't handle.
+GLUE_TABLE_CREATION_MODE = "inference"
+GLUE_SCHEMA_SAMPLE_SIZE = 1024 * 1024  # bytes
+
+# Bulk S3 moves (`mainapp.utils.aws_utils.s3_move`) copy objects concurrently, objects above the threshold
+# are copied in parts (a single copy is limited to 5GB).
+S3_MOVE_MAX_WORKERS = 16
+S3_MULTIPART_COPY_THRESHOLD = 512 * 1024 * 1024  # bytes
+S3_COPY_PART_SIZE = 256 * 1024 * 1024  # bytes
+
+# Objects read through ranged GETs (e.g. zip archives) are read ahead in buffers of this size,
+# and streamed uploads are sent in parts of S3_UPLOAD_PART_SIZE.
+S3_READ_BUFFER_SIZE = 8 * 1024 * 1024  # bytes
+S3_UPLOAD_PART_SIZE = 16 * 1024 * 1024  # bytes
+ZIP_EXTRACT_MAX_WORKERS = 4
+
+# Uploaded files are validated by the content type of their first bytes.
+FILE_TYPE_SAMPLE_SIZE = 16 * 1024  # bytes
+
+# Broken CSV headers are fixed in place by rewriting only the first line ("streaming"),
+# or by downloading, fixing and uploading the whole file ("download").
+CSV_HEADER_REPAIR_MODE = "streaming"
+CSV_HEADER_READ_SIZE = 64 * 1024  # bytes
+
+# Uploaded spss files are converted to csv in chunks of this many rows.
+SAV_CONVERSION_CHUNK_ROWS = 100000
+
+# Athena results and other csv objects are read in blocks of this size (`mainapp.utils.csv_stream`).
+CSV_READ_BLOCK_SIZE = 8 * 1024 * 1024  # bytes
+
+# De-identification runs on blocks of rows, a column at a time ("columnar"), or a cell at a time ("row").
+DEID_ENGINE = "columnar"
+DEID_BLOCK_ROWS = 10000
+
+# Data sources larger than a partition are de-identified in line aligned partitions of about this size,
+# by this many worker processes (overridden per organization by the `deid_workers` preference).
+DEID_PARTITION_SIZE = 64 * 1024 * 1024  # bytes
+DEID_WORKERS = 4
+
+# De-identification jobs run on DEID_SCHEDULER_WORKERS threads of their own, each organization running up to
+# DEID_ORG_MAX_JOBS of them at once (overridden per organization by the `deid_max_jobs` preference).
+DEID_SCHEDULER_WORKERS = 8
+DEID_ORG_MAX_JOBS = 2
+
+# De-identification reads the csv objects of a data source directly ("s3"), fetching ranges of them on
+# DEID_SOURCE_READ_WORKERS threads, or a copy of its table extracted by Athena ("athena").
+# Tables which aren't plain, quoted (OpenCSVSerde) csv are always read through Athena.
+DEID_SOURCE_READER = "s3"
+DEID_SOURCE_READ_WORKERS = 8
+
+# Deterministic de-identification actions cache the deid values of up to this many bytes per column.
+DEID_COLUMN_CACHE_SIZE = 16 * 1024 * 1024  # bytes
+
+# Pending de-identification jobs which haven't checkpointed for this long were abandoned, and are resumed.
+DEID_HEARTBEAT_TIMEOUT = 30 * 60  # seconds
+
+# Parquet deid outputs are written in Snappy compressed row groups of about this size (uncompressed).
+DEID_PARQUET_ROW_GROUP_SIZE = 128 * 1024 * 1024  # bytes
+
+# A uniform sample of this many rows of every structured data source is kept for method previews,
+# which are served from memory for DEID_PREVIEW_CACHE_TTL.
+DEID_PREVIEW_SAMPLE_ROWS = 200
+DEID_PREVIEW_CACHE_MAX_SIZE = 64
+DEID_PREVIEW_CACHE_TTL = 3600  # seconds
+
 ENV = os.getenv("ENV", "local")
 
 if ENV != "local":
@@ -0,0 +1,46 @@
+from django.test import TestCase
+
+from mainapp.models import DataSourceMethod, Method
+
+
+class DataSourceMethodTest(TestCase):
+    ATTRIBUTES = {
+        "name": {"action": "mask", "lynx_type": "text", "arguments": {}},
+    }
+
+    def create_dsrc_method(self, objects):
+        dsrc_method = DataSourceMethod(
+            method=Method(group_age_over=False),
+            attributes=self.ATTRIBUTES,
+            state=DataSourceMethod.READY,
+        )
+        dsrc_method.processed = {
+            "objects": objects,
+            "settings": dsrc_method.deid_settings,
+        }
+        return dsrc_method
+
+    def test_pending_objects_are_the_new_objects(self):
+        dsrc_method = self.create_dsrc_method({"a.csv": "1"})
+
+        self.assertEqual(dict(), dsrc_method.pending_objects({"a.csv": "1"}))
+        self.assertEqual(
+            {"b.csv": "2"}, dsrc_method.pending_objects({"a.csv": "1", "b.csv": "2"})
+        )
+
+    def test_changed_objects_rebuild_the_output(self):
+        dsrc_method = self.create_dsrc_method({"a.csv": "1"})
+
+        self.assertIsNone(dsrc_method.pending_objects({"a.csv": "2"}))
+        self.assertIsNone(dsrc_method.pending_objects({"b.csv": "2"}))
+
+    def test_only_deid_settings_rebuild_the_output(self):
+        dsrc_method = self.create_dsrc_method({"a.csv": "1"})
+
+        dsrc_method.attributes = {
+            "name": dict(self.ATTRIBUTES["name"], display_name="Name")
+        }
+        self.assertEqual(dict(), dsrc_method.pending_objects({"a.csv": "1"}))
+
+        dsrc_method.attributes = {"name": dict(self.ATTRIBUTES["name"], action="omit")}
+        self.assertIsNone(dsrc_method.pending_objects({"a.csv": "1"}))
@@ -0,0 +1,160 @@
+from unittest.mock import patch
+
+from django.test import Client, TestCase
+
+from mainapp.models import DataSource, Dataset, Organization, QueryJob, User
+
+
+@patch.object(Dataset, "get_query_results")
+@patch.object(Dataset, "describe_query_execution")
+@patch.object(Dataset, "query", return_value={"QueryExecutionId": "execution1"})
+class QueryJobViewsTest(TestCase):
+    def setUp(self):
+        self.organization = Organization.objects.create(name="Lynx", logo=None)
+        self.user = User.objects.create(
+            email="admin_user@lynx.com",
+            is_active=True,
+            is_superuser=True,
+            is_admin=True,
+            name="Lynx",
+            first_login=False,
+            organization=self.organization,
+            cognito_id="1234",
+            is_execution=True,
+        )
+        self.dataset = Dataset.objects.create(
+            name="Public Dataset",
+            description="...",
+            readme=None,
+            user_created=self.user,
+            state="public",
+            is_discoverable=True,
+            organization=self.organization,
+        )
+        self.data_source = DataSource.objects.create(
+            name="A test DataSource", dataset=self.dataset, glue_table="patients"
+        )
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def submit(self):
+        return self.client.post(
+            "/query/",
+            {
+                "query": "SELECT * FROM patients LIMIT 10",
+                "dataset_id": str(self.dataset.id),
+                "data_source_id": str(self.data_source.id),
+            },
+        )
+
+    @staticmethod
+    def query_execution(state):
+        return {
+            "QueryExecutionId": "execution1",
+            "Status": {"State": state},
+            "Statistics": {
+                "DataScannedInBytes": 2048,
+                "EngineExecutionTimeInMillis": 300,
+                "TotalExecutionTimeInMillis": 450,
+            },
+        }
+
+    def test_submit_returns_the_job_immediately(
+        self, query, describe_query_execution, get_query_results
+    ):
+        response = self.submit()
+
+        self.assertEqual(response.status_code, 202)
+        query_job = QueryJob.objects.get(id=response.data["job_id"])
+        self.assertEqual(QueryJob.PENDING, response.data["state"])
+        self.assertEqual("execution1", query_job.execution_id)
+        query.assert_called_once_with(
+            "SELECT * FROM patients LIMIT 10", glue_table="patients"
+        )
+        # nothing waits on the execution while submitting
+        describe_query_execution.assert_not_called()
+        get_query_results.assert_not_called()
+
+    def test_status_reports_the_athena_execution(
+        self, query, describe_query_execution, get_query_results
+    ):
+        job_id = self.submit().data["job_id"]
+
+        describe_query_execution.return_value = self.query_execution("RUNNING")
+        response = self.client.get(f"/query/{job_id}/status/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(QueryJob.PENDING, response.data["state"])
+        self.assertEqual(
+            {
+                "query_execution_id": "execution1",
+                "state": "RUNNING",
+                "data_scanned_in_bytes": 2048,
+                "engine_execution_time_in_millis": 300,
+                "total_execution_time_in_millis": 450,
+            },
+            response.data["execution"],
+        )
+
+        describe_query_execution.return_value = self.query_execution("SUCCEEDED")
+        response = self.client.get(f"/query/{job_id}/status/")
+
+        self.assertEqual(QueryJob.READY, response.data["state"])
+        self.assertEqual("SUCCEEDED", response.data["execution"]["state"])
+
+    def test_results_are_paged(
+        self, query, describe_query_execution, get_query_results
+    ):
+        job_id = self.submit().data["job_id"]
+        describe_query_execution.return_value = self.query_execution("SUCCEEDED")
+        column_info = [{"Name": "id", "Type": "bigint"}]
+        get_query_results.side_effect = [
+            {
+                "ResultSet": {
+                    "ResultSetMetadata": {"ColumnInfo": column_info},
+                    "Rows": [
+                        {"Data": [{"VarCharValue": "id"}]},
+                        {"Data": [{"VarCharValue": "1"}]},
+                    ],
+                },
+                "NextToken": "page2",
+            },
+            {
+                "ResultSet": {
+                    "ResultSetMetadata": {"ColumnInfo": column_info},
+                    "Rows": [{"Data": [{"VarCharValue": "2"}]}],
+                }
+            },
+        ]
+
+        first_page = self.client.get(f"/query/{job_id}/results/", {"page_size": 2})
+        second_page = self.client.get(
+            f"/query/{job_id}/results/",
+            {"page_size": 5000, "page_token": "page2", "result_format": "json"},
+        )
+
+        self.assertEqual(first_page.status_code, 200)
+        # the header row is only left out of the first page
+        self.assertEqual(
+            {"columns": ["id"], "result": [["1"]], "next_page_token": "page2"},
+            first_page.data,
+        )
+        self.assertEqual(
+            {"columns": ["id"], "result": {"id": [2]}, "next_page_token": None},
+            second_page.data,
+        )
+        get_query_results.assert_any_call("execution1", next_token=None, max_results=2)
+        get_query_results.assert_any_call(
+            "execution1", next_token="page2", max_results=QueryJob.MAX_PAGE_SIZE
+        )
+
+    def test_results_of_a_running_job_conflict(
+        self, query, describe_query_execution, get_query_results
+    ):
+        job_id = self.submit().data["job_id"]
+        describe_query_execution.return_value = self.query_execution("RUNNING")
+
+        response = self.client.get(f"/query/{job_id}/results/")
+
+        self.assertEqual(response.status_code, 409)
+        get_query_results.assert_not_called()
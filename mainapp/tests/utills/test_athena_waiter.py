@@ -0,0 +1,135 @@
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+from django.test import TestCase
+
+from mainapp.exceptions import (
+    InvalidExecutionId,
+    MaxExecutionReactedError,
+    QueryExecutionError,
+)
+from mainapp.utils.athena_waiter import AthenaExecutionWaiter
+
+
+class AthenaExecutionWaiterTestCase(TestCase):
+    def setUp(self):
+        self.states = dict()
+        self.unprocessed = set()
+        self.athena_client = MagicMock()
+        self.athena_client.batch_get_query_execution.side_effect = (
+            self.batch_get_query_execution
+        )
+        patcher = patch(
+            "mainapp.utils.athena_waiter.aws_service.create_athena_client",
+            return_value=self.athena_client,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def batch_get_query_execution(self, QueryExecutionIds):
+        return {
+            "QueryExecutions": [
+                {
+                    "QueryExecutionId": query_execution_id,
+                    "Status": {"State": self.states.get(query_execution_id, "RUNNING")},
+                }
+                for query_execution_id in QueryExecutionIds
+                if query_execution_id not in self.unprocessed
+            ],
+            "UnprocessedQueryExecutionIds": [
+                {"QueryExecutionId": query_execution_id, "ErrorMessage": "unknown"}
+                for query_execution_id in QueryExecutionIds
+                if query_execution_id in self.unprocessed
+            ],
+        }
+
+    def wait_until(self, condition, timeout=5):
+        deadline = time.time() + timeout
+        while not condition():
+            self.assertLess(time.time(), deadline)
+            time.sleep(0.01)
+
+    def test_executions_are_checked_in_batches_of_50(self):
+        waiter = AthenaExecutionWaiter(min_interval=0.01, max_interval=0.01)
+        execution_ids = [f"execution{index}" for index in range(120)]
+        futures = [waiter.wait("org", execution_id) for execution_id in execution_ids]
+        self.states.update(dict.fromkeys(execution_ids, "SUCCEEDED"))
+
+        for future in futures:
+            future.result(timeout=5)
+
+        batches = [
+            len(call[1]["QueryExecutionIds"])
+            for call in self.athena_client.batch_get_query_execution.call_args_list
+        ]
+        self.assertLessEqual(max(batches), AthenaExecutionWaiter.BATCH_SIZE)
+        self.assertIn(AthenaExecutionWaiter.BATCH_SIZE, batches)
+        self.assertEqual(120, waiter.stats()["resolved"])
+
+    def test_interval_grows_and_resets_on_new_executions(self):
+        waiter = AthenaExecutionWaiter(
+            min_interval=10, max_interval=100, backoff_factor=1.5
+        )
+        waiter.wait("org", "first")
+        self.wait_until(lambda: waiter.stats()["api_calls"] == 1)
+        self.wait_until(lambda: waiter.stats()["interval"] == 15)
+
+        # a new execution wakes the waiter up and restarts the backoff from `min_interval`
+        waiter.wait("org", "second")
+        self.wait_until(lambda: waiter.stats()["api_calls"] == 2)
+        self.wait_until(lambda: waiter.stats()["interval"] != 10)
+        self.assertEqual(15, waiter.stats()["interval"])
+
+        self.states.update(dict.fromkeys(["first", "second", "third"], "SUCCEEDED"))
+        waiter.wait("org", "third").result(timeout=5)
+        self.assertEqual(0, waiter.stats()["pending"])
+
+    def test_failed_unprocessed_and_expired_executions(self):
+        self.states.update({"succeeded": "SUCCEEDED", "failed": "FAILED"})
+        self.unprocessed.add("unprocessed")
+        waiter = AthenaExecutionWaiter(
+            min_interval=0.01, max_interval=0.01, max_wait=0.1
+        )
+
+        futures = {
+            execution_id: waiter.wait("org", execution_id)
+            for execution_id in ["succeeded", "failed", "unprocessed", "running"]
+        }
+
+        self.assertEqual(
+            "succeeded", futures["succeeded"].result(timeout=5)["QueryExecutionId"]
+        )
+        self.assertIsInstance(
+            futures["failed"].exception(timeout=5), QueryExecutionError
+        )
+        self.assertIsInstance(
+            futures["unprocessed"].exception(timeout=5), InvalidExecutionId
+        )
+        self.assertIsInstance(
+            futures["running"].exception(timeout=5), MaxExecutionReactedError
+        )
+        self.assertEqual(0, waiter.stats()["pending"])
+
+    def test_callbacks_run_outside_the_lock(self):
+        waiter = AthenaExecutionWaiter(min_interval=0.01, max_interval=0.01)
+        callback_started, release_callback = threading.Event(), threading.Event()
+
+        def slow_callback(future):
+            callback_started.set()
+            release_callback.wait(5)
+
+        waiter.wait("org", "slow", callback=slow_callback)
+        self.states["slow"] = "SUCCEEDED"
+        self.assertTrue(callback_started.wait(5))
+
+        self.states["other"] = "SUCCEEDED"
+        waited = threading.Event()
+        threading.Thread(
+            target=lambda: waiter.wait("org", "other") and waited.set()
+        ).start()
+        try:
+            self.assertTrue(waited.wait(1))
+        finally:
+            release_callback.set()
+        self.wait_until(lambda: not waiter.stats()["pending"])
@@ -0,0 +1,42 @@
+from unittest.mock import patch
+from django.test import TestCase
+
+from mainapp.utils.client_pool import ClientPool
+
+
+class ClientPoolTestCase(TestCase):
+    ORG_SETTINGS = {
+        "AWS_ACCESS_KEY_ID": "some_AWS_ACCESS_KEY_ID",
+        "AWS_SECRET_ACCESS_KEY": "some_AWS_SECRET_ACCESS_KEY",
+        "AWS_REGION": "some_region",
+    }
+
+    @patch("mainapp.utils.client_pool.boto3")
+    def test_client_is_reused(self, boto3_mock):
+        pool = ClientPool()
+        pool.get(ClientPool.CLIENT, "health_org", self.ORG_SETTINGS, "s3")
+        pool.get(ClientPool.CLIENT, "health_org", self.ORG_SETTINGS, "s3")
+
+        self.assertEqual(1, boto3_mock.session.Session.return_value.client.call_count)
+        self.assertEqual(1, pool.stats()["hits"])
+        self.assertEqual(1, pool.stats()["misses"])
+
+    @patch("mainapp.utils.client_pool.boto3")
+    def test_credentials_rotation_reloads_clients(self, boto3_mock):
+        pool = ClientPool()
+        pool.get(ClientPool.CLIENT, "health_org", self.ORG_SETTINGS, "s3")
+        rotated_settings = {**self.ORG_SETTINGS, "AWS_SECRET_ACCESS_KEY": "rotated"}
+        pool.get(ClientPool.CLIENT, "health_org", rotated_settings, "s3")
+
+        self.assertEqual(2, boto3_mock.session.Session.call_count)
+        self.assertEqual(1, pool.stats()["reloads"])
+        self.assertEqual(2, pool.stats()["misses"])
+
+    @patch("mainapp.utils.client_pool.boto3")
+    def test_pool_is_bounded(self, boto3_mock):
+        pool = ClientPool(max_size=2)
+        for service_name in ["s3", "glue", "athena"]:
+            pool.get(ClientPool.CLIENT, "health_org", self.ORG_SETTINGS, service_name)
+
+        self.assertEqual(2, pool.stats()["size"])
+        self.assertEqual(1, pool.stats()["evictions"])
@@ -0,0 +1,47 @@
+import io
+import random
+
+from django.test import TestCase
+
+from mainapp.utils import csv_stream
+
+
+class CsvStreamTestCase(TestCase):
+    DATA = b'id,notes\n1,"a, ""quoted""\nvalue"\n2,plain\n\n3,last'
+
+    def test_read_rows(self):
+        rows = csv_stream.read_rows(csv_stream.open_body(io.BytesIO(self.DATA), 4))
+
+        self.assertEqual(
+            [
+                ["id", "notes"],
+                ["1", 'a, "quoted"\nvalue'],
+                ["2", "plain"],
+                [""],
+                ["3", "last"],
+            ],
+            list(rows),
+        )
+
+    def test_write_rows_quotes_only_when_needed(self):
+        self.assertEqual(
+            b'1,"a, ""quoted""\nvalue"\n2,plain\n',
+            csv_stream.write_rows([["1", 'a, "quoted"\nvalue'], ["2", "plain"]]),
+        )
+
+    def test_record_blocks_end_outside_quotes(self):
+        blocks = list(csv_stream.record_blocks(io.BytesIO(self.DATA), 12))
+
+        self.assertEqual(self.DATA, b"".join(blocks))
+        for block in blocks[:-1]:
+            self.assertTrue(block.endswith(b"\n"))
+            self.assertEqual(0, block.count(b'"') % 2)
+
+    def test_sample_rows_keeps_stream_order(self):
+        rows = [[str(index)] for index in range(1000)]
+
+        sample = csv_stream.sample_rows(iter(rows), 10, rng=random.Random(0))
+
+        self.assertEqual(10, len(sample))
+        self.assertEqual(sorted(sample, key=lambda row: int(row[0])), sample)
+        self.assertEqual(rows[:3], csv_stream.sample_rows(iter(rows[:3]), 10))
@@ -0,0 +1,46 @@
+import datetime
+
+from dateutil import parser
+from django.test import TestCase
+
+from mainapp.utils.deidentification import Date
+from mainapp.utils.deidentification.common import DateParser
+
+
+class DateParserTestCase(TestCase):
+    VALUES = ["01/02/2020", "12/31/1999", "2020-03-04", "March 5, 2021", "", "abc"]
+
+    def test_infers_the_column_format(self):
+        date_parser = DateParser()
+
+        self.assertEqual("%m/%d/%Y", date_parser.infer(self.VALUES))
+
+    def test_matches_dateutil(self):
+        date_parser = DateParser()
+
+        for value in self.VALUES[:4]:
+            self.assertEqual(parser.parse(value), date_parser.parse(value))
+        self.assertEqual(
+            [parser.parse(value) for value in self.VALUES[:4]] + [None, None],
+            date_parser.parse_batch(self.VALUES),
+        )
+
+    def test_batch_offset_matches_per_value(self):
+        date_parser = DateParser()
+        values = self.VALUES[:4] + ["9999-12-31"]
+
+        self.assertEqual(
+            [Date._offset(value, 2.5, date_parser=date_parser) for value in values[:4]]
+            + [None],
+            Date._offset_batch(values, 2.5, date_parser=date_parser),
+        )
+
+    def test_groups_over_age_against_a_fixed_now(self):
+        date_parser = DateParser(now=datetime.datetime(2020, 6, 1))
+
+        self.assertEqual(
+            "1999-12-31", Date.group_over_age("12/31/1999", date_parser=date_parser)
+        )
+        self.assertEqual(
+            "2010-01-01", Date.group_over_age("2120-01-01", date_parser=date_parser)
+        )
@@ -0,0 +1,65 @@
+import random
+import tempfile
+
+from django.test import TestCase
+
+from mainapp.utils.aws_utils import LocalS3Client
+from mainapp.utils.deidentification import ACTIONS, LYNX_DATA_TYPES, benchmark
+
+
+class DeidBenchmarkTestCase(TestCase):
+    def test_attributes_cover_every_lynx_type_and_action(self):
+        attributes = benchmark.benchmark_attributes()
+
+        self.assertEqual(
+            set(LYNX_DATA_TYPES),
+            {col_attributes["lynx_type"] for col_attributes in attributes.values()},
+        )
+        self.assertEqual(
+            set(ACTIONS),
+            {col_attributes["action"] for col_attributes in attributes.values()},
+        )
+        self.assertEqual(
+            set(LYNX_DATA_TYPES), set(benchmark.synthetic_record(random.Random(0)))
+        )
+        self.assertEqual(
+            len(attributes) + 2,
+            len(benchmark.benchmark_attributes(len(attributes) + 2)),
+        )
+
+    def test_run_benchmark_end_to_end(self):
+        attributes = benchmark.benchmark_attributes()
+        with tempfile.TemporaryDirectory() as root:
+            s3_client = LocalS3Client(root)
+            benchmark.write_source(s3_client, attributes, 50)
+            results = benchmark.run_benchmark(s3_client, attributes)
+
+        self.assertGreater(results["rows_per_second"], 0)
+        self.assertEqual(set(ACTIONS), set(results["actions"]))
+
+    def test_find_regressions(self):
+        baseline = {
+            "engines": {
+                "columnar": {
+                    "rows_per_second": 1000,
+                    "peak_rss_mb": 100,
+                    "peak_worker_rss_mb": 0,
+                    "actions": {"mask": 1.0, "offset": 0.1},
+                }
+            }
+        }
+        results = {
+            "engines": {
+                "columnar": {
+                    "rows_per_second": 700,
+                    "peak_rss_mb": 110,
+                    "peak_worker_rss_mb": 0,
+                    "actions": {"mask": 1.1, "offset": 0.3},
+                }
+            }
+        }
+
+        regressions = benchmark.find_regressions(results, baseline, 0.2)
+
+        self.assertEqual(1, len(regressions))
+        self.assertIn("700 rows/s", regressions[0])
@@ -0,0 +1,141 @@
+import pickle
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from django.test import TestCase
+
+from mainapp.utils import csv_stream
+from mainapp.utils.deidentification import Number, Offset
+from mainapp.utils.deidentification.method_handler import MethodHandler
+
+
+class DeidEngineTestCase(TestCase):
+    ATTRIBUTES = {
+        "age": {
+            "action": "offset",
+            "lynx_type": "Number",
+            "arguments": {"interval": 2},
+        },
+        "name": {"action": "salted_hash", "lynx_type": "Name", "arguments": {}},
+        "ssn": {
+            "action": "omit",
+            "lynx_type": "Social Security Number",
+            "arguments": {},
+        },
+        "notes": {
+            "action": "free_text_replacement",
+            "lynx_type": "Text",
+            "arguments": {"mapping": {}},
+        },
+    }
+    ROWS = [
+        b"1,john,123,john was here\n",
+        b'2.5,jane,456,"jane met john, ""twice""\nyesterday"\n',
+        b"abc,,789,nobody\n",
+        b"-3.5,john,000,\n",
+    ]
+
+    @staticmethod
+    def dsrc_method():
+        dsrc_method = MagicMock()
+        dsrc_method.method.group_age_over = False
+        dsrc_method.method.salt_key.hex = "salt"
+        dsrc_method.attributes = DeidEngineTestCase.ATTRIBUTES
+        return dsrc_method
+
+    def test_offset_batch_matches_per_value(self):
+        action = Offset(MagicMock(), self.dsrc_method(), dict(), Number, interval=2)
+        values = ["1", "2.5", "-3.5", "abc", "", "1e3"]
+
+        self.assertEqual(
+            [action.deid_with_fallback(value) for value in values],
+            action.deid_batch(values),
+        )
+
+    def test_memoized_deid_matches_uncached(self):
+        values = ["1", "2.5", "1", "1", "2.5"]
+        action = Offset(MagicMock(), self.dsrc_method(), dict(), Number, interval=2)
+        with patch(
+            "mainapp.utils.deidentification.actions.deid_action.settings.DEID_COLUMN_CACHE_SIZE",
+            1,
+        ):
+            uncached_action = Offset(
+                MagicMock(), self.dsrc_method(), dict(), Number, interval=2
+            )
+
+        self.assertEqual(
+            [uncached_action.deid_with_fallback(value) for value in values],
+            [action.deid_with_fallback(value) for value in values],
+        )
+        self.assertEqual(0, uncached_action.pop_stats()["hits"])
+        cache_stats = action.pop_stats()
+        self.assertEqual((3, 2), (cache_stats["hits"], cache_stats["misses"]))
+        self.assertEqual(0, action.pop_stats()["hits"])
+
+    def test_memoized_action_pickles_with_an_empty_cache(self):
+        # actions are pickled along with their handler to the spawned deid workers
+        action = Offset(
+            SimpleNamespace(name="ds", id=1),
+            SimpleNamespace(method=SimpleNamespace(group_age_over=False)),
+            dict(),
+            Number,
+            interval=2,
+        )
+        action.deid_with_fallback("1")
+        action.deid_with_fallback("1")
+        self.assertEqual(1, action.pop_stats()["hits"])
+
+        copied_action = pickle.loads(pickle.dumps(action))
+        copied_action.deid_with_fallback("1")
+
+        copied_stats = copied_action.pop_stats()
+        self.assertEqual((0, 1), (copied_stats["hits"], copied_stats["misses"]))
+
+    def test_engines_write_the_same_rows(self):
+        columns = {"age": 0, "name": 1, "ssn": 2, "notes": 3}
+        deid_rows = dict()
+        for engine in [MethodHandler.ROW_ENGINE, MethodHandler.COLUMNAR_ENGINE]:
+            handler = MethodHandler(MagicMock(), self.dsrc_method(), 0, engine=engine)
+            deid_rows[engine] = [
+                list(deid_row)
+                for block in handler.deidentify_blocks(
+                    csv_stream.parse_rows(b"".join(self.ROWS).decode("utf-8")), columns
+                )
+                for deid_row in block
+            ]
+
+        self.assertEqual(
+            deid_rows[MethodHandler.ROW_ENGINE],
+            deid_rows[MethodHandler.COLUMNAR_ENGINE],
+        )
+
+    def test_partitions_concatenate_to_the_whole(self):
+        dsrc_method = self.dsrc_method()
+        dsrc_method.attributes = {
+            col: attributes
+            for col, attributes in self.ATTRIBUTES.items()
+            if col != "notes"
+        }
+        handler = MethodHandler(MagicMock(), dsrc_method, 0)
+        columns = {"age": 0, "name": 1, "ssn": 2}
+
+        whole, rows, _ = handler.deidentify_data(b"".join(self.ROWS), columns)
+        first, first_rows, _ = handler.deidentify_data(b"".join(self.ROWS[:1]), columns)
+        rest, rest_rows, _ = handler.deidentify_data(b"".join(self.ROWS[1:]), columns)
+
+        self.assertEqual(whole, first + rest)
+        self.assertEqual(len(self.ROWS), rows)
+        self.assertEqual(rows, first_rows + rest_rows)
+
+    def test_stats_count_fallback_values(self):
+        dsrc_method = self.dsrc_method()
+        dsrc_method.attributes = {"age": self.ATTRIBUTES["age"]}
+        handler = MethodHandler(MagicMock(), dsrc_method, 0)
+
+        _, _, stats = handler.deidentify_data(b"".join(self.ROWS), {"age": 0})
+
+        self.assertEqual(Offset._ACTION_NAME, stats["age"]["action"])
+        self.assertEqual(
+            (1, 1), (stats["age"]["exceptions"], stats["age"]["fallbacks"])
+        )
+        self.assertEqual(0, handler.pop_stats()["age"]["fallbacks"])
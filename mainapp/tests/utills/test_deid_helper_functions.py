@@ -0,0 +1,53 @@
+from unittest.mock import MagicMock, patch
+
+from django.test import TestCase
+
+from mainapp.utils.deidentification.common import deid_helper_functions
+
+
+class ResumeAbandonedMethodsTestCase(TestCase):
+    @staticmethod
+    def abandoned_dsrc_method(claimed=True):
+        dsrc_method = MagicMock()
+        dsrc_method.is_abandoned = True
+        dsrc_method.beat.return_value = claimed
+        dsrc_method.checkpoint = {"data_source_index": 0, "new_objects": None}
+        return dsrc_method
+
+    @patch.object(deid_helper_functions, "MethodHandler")
+    @patch.object(deid_helper_functions, "deid_max_jobs", return_value=1)
+    @patch.object(deid_helper_functions, "deid_scheduler")
+    @patch.object(deid_helper_functions, "DataSourceMethod")
+    def test_only_methods_claimed_by_this_worker_are_resumed(
+        self, dsrc_method_model, deid_scheduler, deid_max_jobs, method_handler
+    ):
+        taken_over = self.abandoned_dsrc_method(claimed=False)
+        abandoned = self.abandoned_dsrc_method()
+        dsrc_method_model.objects.filter.return_value = [taken_over, abandoned]
+
+        resumed_method_ids = deid_helper_functions.resume_abandoned_methods()
+
+        self.assertEqual([abandoned.method_id], resumed_method_ids)
+        method_handler.assert_called_once_with(
+            abandoned.data_source, abandoned, 0, new_objects=None
+        )
+        deid_scheduler.submit.assert_called_once()
+        # the in-process scheduler isn't trusted to know about the jobs of other workers
+        deid_scheduler.has_tag.assert_not_called()
+        taken_over.set_as_error.assert_not_called()
+
+    @patch.object(deid_helper_functions, "MethodHandler")
+    @patch.object(deid_helper_functions, "deid_scheduler")
+    @patch.object(deid_helper_functions, "DataSourceMethod")
+    def test_beating_method_is_not_claimed(
+        self, dsrc_method_model, deid_scheduler, method_handler
+    ):
+        beating = self.abandoned_dsrc_method()
+        beating.is_abandoned = False
+        dsrc_method_model.objects.filter.return_value = [beating]
+
+        self.assertEqual([], deid_helper_functions.resume_abandoned_methods())
+
+        beating.beat.assert_not_called()
+        method_handler.assert_not_called()
+        deid_scheduler.submit.assert_not_called()
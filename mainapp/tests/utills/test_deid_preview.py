@@ -0,0 +1,189 @@
+import io
+import random
+from unittest.mock import MagicMock, patch
+
+from botocore.exceptions import ClientError
+from django.test import Client, TestCase
+
+from mainapp import settings
+from mainapp.models import (
+    DataSource,
+    DataSourceMethod,
+    Dataset,
+    Organization,
+    User,
+)
+from mainapp.utils import csv_stream
+from mainapp.utils.deidentification import (
+    Actions,
+    LynxDataTypeNames,
+    benchmark,
+    preview,
+)
+from mainapp.utils.deidentification.common.exceptions import DeidentificationError
+
+PREVIEW = "mainapp.utils.deidentification.preview"
+METHOD_HANDLER = "mainapp.utils.deidentification.method_handler"
+
+
+@patch(f"{METHOD_HANDLER}.create_deid_glue_table")
+@patch(f"{METHOD_HANDLER}.create_s3_client")
+@patch(f"{PREVIEW}.create_s3_client")
+class DeidPreviewTestCase(TestCase):
+    ATTRIBUTES = benchmark.benchmark_attributes()
+
+    def setUp(self):
+        self.sample = csv_stream.write_rows(
+            [list(self.ATTRIBUTES)]
+            + [
+                [
+                    record[col_attributes["lynx_type"]]
+                    for col_attributes in self.ATTRIBUTES.values()
+                ]
+                for record in [benchmark.synthetic_record(random.Random(0))]
+            ]
+        )
+        dataset = Dataset(
+            name="preview",
+            organization=Organization(name="preview"),
+            bucket_override="preview",
+        )
+        self.data_source = DataSource(
+            dataset=dataset,
+            name="preview",
+            dir="preview",
+            type=DataSource.STRUCTURED,
+            glue_table="preview",
+            columns={
+                col: {"lynx_type": col_attributes["lynx_type"]}
+                for col, col_attributes in self.ATTRIBUTES.items()
+            },
+        )
+
+    def s3_client(self):
+        s3_client = MagicMock()
+        s3_client.get_object.side_effect = lambda **kwargs: {
+            "Body": io.BytesIO(self.sample)
+        }
+        return s3_client
+
+    @patch.object(DataSourceMethod, "save")
+    def test_preview_deidentifies_the_sample_without_writing(
+        self, save, create_s3_client, handler_s3_client, create_deid_glue_table
+    ):
+        s3_client = self.s3_client()
+        create_s3_client.return_value = s3_client
+
+        result = preview.preview_method(self.data_source, self.ATTRIBUTES)
+
+        self.assertEqual(list(self.ATTRIBUTES), result["columns"])
+        self.assertEqual(1, len(result["rows"]))
+        self.assertEqual(1, len(result["deid_rows"]))
+        self.assertEqual(len(self.ATTRIBUTES), len(result["deid_rows"][0]))
+        # the sample is only read, nothing is written to S3 or Glue or saved
+        self.assertEqual(
+            {"get_object"}, {name for name, _, _ in s3_client.method_calls}
+        )
+        handler_s3_client.assert_not_called()
+        create_deid_glue_table.assert_not_called()
+        save.assert_not_called()
+
+    def test_cached_sample_is_reused(
+        self, create_s3_client, handler_s3_client, create_deid_glue_table
+    ):
+        s3_client = self.s3_client()
+        create_s3_client.return_value = s3_client
+
+        first = preview.load_sample(self.data_source)
+        second = preview.load_sample(self.data_source)
+
+        self.assertEqual(first, second)
+        s3_client.get_object.assert_called_once()
+
+    @patch(f"{PREVIEW}.sample_data_source", return_value=(["a"], [["1"]]))
+    def test_data_sources_without_a_sample_are_sampled_from_their_csv(
+        self,
+        sample_data_source,
+        create_s3_client,
+        handler_s3_client,
+        create_deid_glue_table,
+    ):
+        create_s3_client.return_value.get_object.side_effect = ClientError(
+            {"Error": {"Code": "NoSuchKey", "Message": "No sample"}}, "GetObject"
+        )
+
+        self.assertEqual((["a"], [["1"]]), preview.load_sample(self.data_source))
+        sample_data_source.assert_called_once_with(
+            org_name="preview",
+            data_source=self.data_source,
+            sample_size=settings.GLUE_SCHEMA_SAMPLE_SIZE,
+        )
+
+    def test_unknown_column_is_rejected(
+        self, create_s3_client, handler_s3_client, create_deid_glue_table
+    ):
+        attributes = dict(self.ATTRIBUTES, unknown=next(iter(self.ATTRIBUTES.values())))
+
+        with self.assertRaises(DeidentificationError):
+            preview.preview_method(self.data_source, attributes)
+
+        create_s3_client.assert_not_called()
+
+
+class PreviewMethodViewTestCase(TestCase):
+    def setUp(self):
+        organization = Organization.objects.create(name="Lynx", logo=None)
+        user = User.objects.create(
+            email="admin_user@lynx.com",
+            is_active=True,
+            is_superuser=True,
+            is_admin=True,
+            name="Lynx",
+            first_login=False,
+            organization=organization,
+            cognito_id="1234",
+            is_execution=True,
+        )
+        self.dataset = Dataset.objects.create(
+            name="Private Dataset",
+            description="...",
+            readme=None,
+            user_created=user,
+            state="private",
+            is_discoverable=True,
+            organization=organization,
+        )
+        self.dataset.admin_users.set(User.objects.filter(id=user.id))
+        self.data_source = DataSource.objects.create(
+            name="A test DataSource",
+            dataset=self.dataset,
+            type=DataSource.STRUCTURED,
+            columns={"age": {"lynx_type": LynxDataTypeNames.AGE.value}},
+        )
+        self.client = Client()
+        self.client.force_login(user)
+
+    @patch(f"{PREVIEW}.create_s3_client")
+    def test_unknown_column_returns_400(self, create_s3_client):
+        response = self.client.post(
+            f"/datasets/{self.dataset.id}/preview_method/",
+            {
+                "data_source_methods": [
+                    {
+                        "data_source": str(self.data_source.id),
+                        "attributes": {
+                            "unknown": {
+                                "action": Actions.MASK.value,
+                                "lynx_type": LynxDataTypeNames.AGE.value,
+                                "arguments": dict(),
+                            }
+                        },
+                    }
+                ]
+            },
+            content_type="application/json",
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("Unknown column unknown", str(response.data))
+        create_s3_client.assert_not_called()
@@ -0,0 +1,58 @@
+import threading
+import time
+
+from django.test import TestCase
+
+from mainapp.utils.deidentification.scheduler import DeidScheduler
+
+
+class DeidSchedulerTestCase(TestCase):
+    def run_jobs(self, jobs, cancelled_tags=()):
+        scheduler = DeidScheduler(1)
+        gate = threading.Event()
+        ran = list()
+        scheduler.submit("a", 2, ["blocking"], gate.wait)
+        for org_name, name, tags in jobs:
+            scheduler.submit(org_name, 2, tags, ran.append, name)
+        cancelled = sum(scheduler.cancel(tag) for tag in cancelled_tags)
+
+        gate.set()
+        deadline = time.time() + 5
+        while scheduler.stats()["completed"] < 1 + len(jobs) - cancelled:
+            self.assertLess(time.time(), deadline)
+            time.sleep(0.01)
+
+        return ran, scheduler.stats()
+
+    def test_organizations_take_turns(self):
+        ran, stats = self.run_jobs(
+            [("a", "a1", ["1"]), ("a", "a2", ["2"]), ("b", "b1", ["3"])]
+        )
+
+        self.assertEqual(["a1", "b1", "a2"], ran)
+        self.assertEqual(0, stats["queued"])
+        self.assertEqual({"a", "b"}, set(stats["organizations"]))
+
+    def test_jobs_are_dropped_once_all_their_tags_are_cancelled(self):
+        ran, stats = self.run_jobs(
+            [("a", "a1", ["1", "2"]), ("b", "b1", ["3"])], cancelled_tags=["1", "3"]
+        )
+
+        self.assertEqual(["a1"], ran)
+        self.assertEqual(1, stats["cancelled"])
+
+    def test_queued_and_running_jobs_have_their_tags(self):
+        scheduler = DeidScheduler(1)
+        gate = threading.Event()
+        scheduler.submit("a", 1, ["running"], gate.wait)
+        scheduler.submit("a", 1, ["queued"], lambda: None)
+
+        self.assertTrue(scheduler.has_tag("running"))
+        self.assertTrue(scheduler.has_tag("queued"))
+        self.assertFalse(scheduler.has_tag("other"))
+
+        gate.set()
+        deadline = time.time() + 5
+        while scheduler.has_tag("running") or scheduler.has_tag("queued"):
+            self.assertLess(time.time(), deadline)
+            time.sleep(0.01)
@@ -0,0 +1,90 @@
+from unittest.mock import patch
+
+from django.test import TestCase
+
+from mainapp.exceptions import SchemaInferenceError
+from mainapp.utils import glue_schema
+
+
+class GlueSchemaTestCase(TestCase):
+    def test_infer_csv_schema(self):
+        sample = b"ID,Weight,Name,Active\n1,70.5,john,true\n2,80,,false\n"
+        schema = glue_schema.infer_csv_schema(sample)
+
+        self.assertEqual(
+            [
+                {"Name": "id", "Type": "bigint"},
+                {"Name": "weight", "Type": "double"},
+                {"Name": "name", "Type": "string"},
+                {"Name": "active", "Type": "boolean"},
+            ],
+            schema["columns"],
+        )
+        self.assertEqual(",", schema["delimiter"])
+        self.assertTrue(schema["has_header"])
+        self.assertFalse(schema["quoted"])
+
+    def test_truncated_sample_ignores_last_row(self):
+        sample = b"id,name\n1,john\n2,jo"
+        schema = glue_schema.infer_csv_schema(sample + b"hn1", truncated=True)
+
+        self.assertEqual(
+            [{"Name": "id", "Type": "bigint"}, {"Name": "name", "Type": "string"}],
+            schema["columns"],
+        )
+
+    def test_empty_file(self):
+        with self.assertRaises(SchemaInferenceError):
+            glue_schema.infer_csv_schema(b"")
+
+    def test_derive_deid_columns(self):
+        source_columns = [
+            {"Name": "id", "Type": "bigint"},
+            {"Name": "name", "Type": "string"},
+            {"Name": "age", "Type": "bigint"},
+        ]
+        attributes = {"name": {"action": "omit"}, "age": {"action": "mask"}}
+
+        self.assertEqual(
+            [{"Name": "id", "Type": "bigint"}, {"Name": "age", "Type": "string"}],
+            glue_schema.derive_deid_columns(source_columns, attributes),
+        )
+
+    def test_derive_parquet_columns(self):
+        columns = [
+            {"Name": "id", "Type": "int"},
+            {"Name": "weight", "Type": "float"},
+            {"Name": "born", "Type": "date"},
+            {"Name": "active", "Type": "boolean"},
+        ]
+
+        self.assertEqual(
+            [
+                {"Name": "id", "Type": "bigint"},
+                {"Name": "weight", "Type": "double"},
+                {"Name": "born", "Type": "string"},
+                {"Name": "active", "Type": "boolean"},
+            ],
+            glue_schema.derive_parquet_columns(columns),
+        )
+
+    @patch("mainapp.utils.decorators.aws_service.create_glue_client")
+    def test_csv_format_only_of_quoted_tables(self, create_glue_client):
+        columns = [{"Name": "id", "Type": "bigint"}, {"Name": "name", "Type": "string"}]
+        for quoted, csv_format in [
+            (True, {"columns": ["id", "name"], "delimiter": ";", "has_header": True}),
+            # LazySimpleSerDe keeps quotes in its values, it's read through Athena
+            (False, None),
+        ]:
+            create_glue_client.return_value.get_table.return_value = {
+                "Table": glue_schema.build_csv_table_input(
+                    "table", "s3://bucket/dir", columns, delimiter=";", quoted=quoted
+                )
+            }
+
+            self.assertEqual(
+                csv_format,
+                glue_schema.get_csv_format(
+                    org_name="org", glue_database="database", glue_table="table"
+                ),
+            )
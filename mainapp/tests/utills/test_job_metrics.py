@@ -0,0 +1,42 @@
+from django.test import TestCase
+
+from mainapp.utils.deidentification.job_metrics import JobMetrics
+
+
+class JobMetricsTestCase(TestCase):
+    STATS = {
+        "age": {
+            "action": "mask",
+            "seconds": 0.5,
+            "hits": 3,
+            "misses": 1,
+            "exceptions": 0,
+            "fallbacks": 1,
+            "size": 4,
+        }
+    }
+
+    def test_resumed_job_keeps_the_metrics_of_its_checkpoint(self):
+        metrics = JobMetrics(bytes_total=100)
+        metrics.add(bytes_in=40, bytes_out=30, rows=4, stats=self.STATS)
+        checkpointed = metrics.as_dict()
+
+        resumed = JobMetrics(bytes_total=100, bytes_in=40, rows=4, metrics=checkpointed)
+        resumed.add(bytes_in=60, bytes_out=50, rows=6, stats=self.STATS)
+        resumed_metrics = resumed.as_dict()
+
+        self.assertEqual(80, resumed_metrics["bytes_out"])
+        self.assertEqual(10, resumed_metrics["rows"])
+        self.assertEqual(
+            {
+                "action": "mask",
+                "seconds": 1.0,
+                "hits": 6,
+                "misses": 2,
+                "exceptions": 0,
+                "fallbacks": 2,
+                "cache_hit_rate": 0.75,
+                "cache_size": 4,
+            },
+            resumed_metrics["columns"]["age"],
+        )
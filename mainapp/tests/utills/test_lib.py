@@ -1,5 +1,10 @@
+import io
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
+from botocore.exceptions import ClientError
 from django.test import TestCase
-from mainapp.utils import lib
+from mainapp.utils import csv_stream, glue_schema, lib
 import os
 
 
@@ -33,3 +38,209 @@ class UtilsLibTestCase(TestCase):
             split_line = read_file.readline().split(",")
             for item in split_line:
                 self.assertTrue(char in item for char in lib.UNSUPPORTED_CHARS)
+
+
+@patch("mainapp.utils.lib.settings.SAV_CONVERSION_CHUNK_ROWS", 2)
+@patch("mainapp.utils.lib.aws_service")
+@patch("mainapp.utils.lib.s3_storage")
+class SavConversionTestCase(TestCase):
+    ROWS = pd.DataFrame({"age": [30, 40, 50, 60], "name": ["a", "b", "c", "d"]})
+
+    @staticmethod
+    def data_source():
+        data_source = MagicMock()
+        data_source.s3_objects = [{"key": "dir/survey.sav"}]
+        return data_source
+
+    def read_sav(self, path, metadataonly=False, row_offset=0, row_limit=0):
+        metadata = MagicMock(number_rows=len(self.ROWS))
+        if metadataonly:
+            return self.ROWS.iloc[:0], metadata
+
+        return (
+            self.ROWS.iloc[row_offset : row_offset + row_limit].reset_index(drop=True),
+            metadata,
+        )
+
+    @patch("mainapp.utils.lib.smart_open")
+    @patch("mainapp.utils.lib.pyreadstat")
+    def test_chunks_are_written_as_a_single_csv(
+        self, pyreadstat, smart_open, s3_storage, aws_service
+    ):
+        pyreadstat.read_sav.side_effect = self.read_sav
+        csv_file = io.BytesIO()
+        csv_file.close = lambda: None
+        smart_open.open.return_value.__enter__.return_value = csv_file
+        data_source = self.data_source()
+
+        lib.convert_sav_to_csv(org_name="org", data_source=data_source)
+
+        self.assertEqual(self.ROWS.to_csv().encode("utf-8"), csv_file.getvalue())
+        # the row count is a multiple of the chunk size, no read past the last row
+        self.assertEqual(
+            [0, 2],
+            [
+                call[1]["row_offset"]
+                for call in pyreadstat.read_sav.call_args_list
+                if not call[1].get("metadataonly")
+            ],
+        )
+        self.assertEqual(
+            [{"key": "dir/survey.csv", "size": len(csv_file.getvalue())}],
+            data_source.s3_objects,
+        )
+
+    @patch("mainapp.utils.lib.create_full_data_glue_table")
+    @patch("mainapp.utils.lib.smart_open")
+    @patch("mainapp.utils.lib.pyreadstat")
+    def test_failed_conversion_sets_the_data_source_as_error(
+        self,
+        pyreadstat,
+        smart_open,
+        create_full_data_glue_table,
+        s3_storage,
+        aws_service,
+    ):
+        pyreadstat.read_sav.side_effect = ValueError("corrupt file")
+        data_source = self.data_source()
+
+        lib.process_sav_data_source(
+            org_name="org", data_source=data_source, check_columns=False
+        )
+
+        data_source.set_as_error.assert_called_once()
+        create_full_data_glue_table.assert_not_called()
+
+
+@patch("mainapp.utils.lib.magic.from_buffer", return_value="text/csv")
+class FileTypeValidationTestCase(TestCase):
+    FILE_TYPES = {".csv": ["text/csv"]}
+
+    def setUp(self):
+        self.s3_client = MagicMock()
+        self.s3_client.get_object.side_effect = self.get_object
+
+    @staticmethod
+    def get_object(Bucket, Key, Range):
+        if Key.startswith("empty"):
+            raise ClientError(
+                {"Error": {"Code": "InvalidRange", "Message": "empty object"}},
+                "GetObject",
+            )
+        if Key.startswith("denied"):
+            raise ClientError(
+                {"Error": {"Code": "AccessDenied", "Message": "denied"}}, "GetObject"
+            )
+
+        return {"Body": io.BytesIO(b"a,b\n1,2\n")}
+
+    def test_valid_file_type_is_kept(self, from_buffer):
+        lib.validate_file_type(self.s3_client, "bucket", "data.csv", self.FILE_TYPES)
+
+        self.s3_client.delete_object.assert_not_called()
+
+    def test_invalid_and_empty_files_are_deleted(self, from_buffer):
+        for object_key in ["data.exe", "empty.csv"]:
+            with self.assertRaises(AssertionError):
+                lib.validate_file_type(
+                    self.s3_client, "bucket", object_key, self.FILE_TYPES
+                )
+
+            self.s3_client.delete_object.assert_called_with(
+                Bucket="bucket", Key=object_key
+            )
+
+    @patch("mainapp.utils.lib.s3_move.delete_objects")
+    def test_validate_many_deletes_invalid_and_unreadable_files(
+        self, delete_objects, from_buffer
+    ):
+        with self.assertRaises(AssertionError):
+            lib.validate_file_types(
+                self.s3_client,
+                "bucket",
+                ["data.csv", "data.exe", "empty.csv", "denied.csv"],
+                self.FILE_TYPES,
+            )
+
+        delete_objects.assert_called_once_with(
+            self.s3_client, "bucket", ["data.exe", "empty.csv", "denied.csv"]
+        )
+
+    @patch("mainapp.utils.lib.s3_move.delete_objects")
+    def test_validate_many_valid_files(self, delete_objects, from_buffer):
+        lib.validate_file_types(
+            self.s3_client, "bucket", ["a.csv", "b.csv"], self.FILE_TYPES
+        )
+
+        delete_objects.assert_not_called()
+
+
+@patch("mainapp.utils.lib.settings.GLUE_TABLE_CREATION_MODE", "inference")
+@patch("mainapp.utils.lib.query_cache")
+@patch("mainapp.utils.lib.update_deid_hierarchy")
+@patch("mainapp.utils.lib.delete_if_table_exists")
+class DeidGlueTableTestCase(TestCase):
+    @patch("mainapp.utils.decorators.aws_service.create_glue_client")
+    @patch("mainapp.utils.lib.glue_schema.create_table")
+    def test_csv_output_round_trips_quoted_values(
+        self,
+        create_table,
+        create_glue_client,
+        delete_if_table_exists,
+        update_deid_hierarchy,
+        query_cache,
+    ):
+        data_source = MagicMock(dir="survey", glue_table="survey")
+        data_source.dataset.get_columns_types.return_value = [
+            {"Name": "id", "Type": "bigint"},
+            {"Name": "address", "Type": "string"},
+        ]
+        dsrc_method = MagicMock(attributes=dict())
+
+        lib.create_deid_glue_table(data_source, "deid", 0, dsrc_method=dsrc_method)
+
+        create_glue_client.return_value.get_table.return_value = {
+            "Table": create_table.call_args[1]["table_input"]
+        }
+        csv_format = glue_schema.get_csv_format(
+            org_name="org", glue_database="database", glue_table="survey_deid_deid"
+        )
+        rows = [["id", "address"], ["1", 'Herzl 1, "Tel Aviv"\nIsrael']]
+        output = csv_stream.write_rows(rows)
+
+        self.assertIsNotNone(csv_format)
+        self.assertEqual(
+            rows,
+            list(
+                csv_stream.read_rows(
+                    io.BytesIO(output), delimiter=csv_format["delimiter"]
+                )
+            ),
+        )
+
+
+class FolderHierarchyTestCase(TestCase):
+    @patch("mainapp.utils.decorators.aws_service.create_s3_client")
+    def test_sources_are_deleted_after_the_new_keys_are_saved(self, create_s3_client):
+        s3_client = create_s3_client.return_value
+        s3_client.head_object.return_value = {"ContentLength": 1}
+        s3_client.delete_objects.return_value = dict()
+        data_source = MagicMock(dir="survey", bucket="bucket")
+        data_source.s3_objects = [{"key": "uploads/survey.csv"}]
+        calls = MagicMock()
+        calls.attach_mock(data_source.save, "save")
+        calls.attach_mock(s3_client.delete_objects, "delete_objects")
+
+        lib.update_folder_hierarchy(data_source=data_source, org_name="org")
+
+        self.assertEqual(
+            [{"key": "survey/lynx-storage/full_access/survey.csv"}],
+            data_source.s3_objects,
+        )
+        self.assertEqual(
+            ["save", "delete_objects"], [name for name, _, _ in calls.mock_calls]
+        )
+        s3_client.delete_objects.assert_called_once_with(
+            Bucket="bucket",
+            Delete={"Objects": [{"Key": "uploads/survey.csv"}], "Quiet": True},
+        )
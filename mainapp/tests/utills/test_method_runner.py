@@ -0,0 +1,84 @@
+from concurrent.futures.thread import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+
+from django.test import TestCase
+
+from mainapp.utils.deidentification.method_runner import PartUploader
+
+
+class PartUploaderTestCase(TestCase):
+    @patch(
+        "mainapp.utils.deidentification.method_runner.settings.S3_UPLOAD_PART_SIZE", 4
+    )
+    def test_chunks_are_coalesced_to_ordered_parts(self):
+        s3_client = MagicMock()
+        s3_client.create_multipart_upload.return_value = {"UploadId": "upload"}
+        s3_client.upload_part.side_effect = lambda **kwargs: {
+            "ETag": kwargs["Body"].decode("utf-8")
+        }
+
+        with ThreadPoolExecutor(2) as upload_executor:
+            uploader = PartUploader(s3_client, "bucket", "key", upload_executor)
+            for chunk in [b"ab", b"cd", b"efgh", b"i"]:
+                uploader.write(chunk)
+            uploader.complete()
+
+        s3_client.complete_multipart_upload.assert_called_once_with(
+            Bucket="bucket",
+            Key="key",
+            UploadId="upload",
+            MultipartUpload={
+                "Parts": [
+                    {"PartNumber": 1, "ETag": "abcd"},
+                    {"PartNumber": 2, "ETag": "efgh"},
+                    {"PartNumber": 3, "ETag": "i"},
+                ]
+            },
+        )
+
+    @patch(
+        "mainapp.utils.deidentification.method_runner.settings.S3_UPLOAD_PART_SIZE", 4
+    )
+    def test_resumes_from_the_checkpoint_of_uploaded_parts(self):
+        s3_client = MagicMock()
+        s3_client.create_multipart_upload.return_value = {"UploadId": "upload"}
+        s3_client.upload_part.side_effect = lambda **kwargs: {
+            "ETag": kwargs["Body"].decode("utf-8")
+        }
+
+        with ThreadPoolExecutor(2) as upload_executor:
+            uploader = PartUploader(s3_client, "bucket", "key", upload_executor)
+            uploader.write(b"abcd", rows=2, source_offset=10)
+            uploader.write(b"ef", rows=1, source_offset=15)
+        checkpoint = uploader.checkpoint()
+
+        self.assertEqual(
+            {
+                "upload_id": "upload",
+                "parts": [{"PartNumber": 1, "ETag": "abcd"}],
+                "source_offset": 10,
+                "rows": 2,
+            },
+            checkpoint,
+        )
+
+        with ThreadPoolExecutor(2) as upload_executor:
+            uploader = PartUploader(
+                s3_client, "bucket", "key", upload_executor, checkpoint=checkpoint
+            )
+            uploader.write(b"gh", rows=1, source_offset=15)
+            uploader.complete()
+
+        self.assertEqual(3, uploader.rows)
+        s3_client.create_multipart_upload.assert_called_once()
+        s3_client.complete_multipart_upload.assert_called_once_with(
+            Bucket="bucket",
+            Key="key",
+            UploadId="upload",
+            MultipartUpload={
+                "Parts": [
+                    {"PartNumber": 1, "ETag": "abcd"},
+                    {"PartNumber": 2, "ETag": "gh"},
+                ]
+            },
+        )
@@ -0,0 +1,42 @@
+from django.test import TestCase
+
+from mainapp.utils.query_cache import AthenaResultCache
+
+
+class AthenaResultCacheTestCase(TestCase):
+    def test_equivalent_queries_share_key(self):
+        cache = AthenaResultCache()
+        first = cache.key(
+            "db", "table", "v1", 'select * from "db"."table"  -- comment\n limit 5;'
+        )
+        second = cache.key("db", "table", "v1", 'SELECT *\nFROM "db"."table" LIMIT 5')
+
+        self.assertEqual(first, second)
+
+    def test_whitespace_in_literals_changes_key(self):
+        cache = AthenaResultCache()
+        first = cache.key(
+            "db", "table", "v1", "SELECT * FROM \"table\" WHERE name = 'a  b'"
+        )
+        second = cache.key(
+            "db", "table", "v1", "SELECT * FROM \"table\" WHERE name = 'a b'"
+        )
+
+        self.assertNotEqual(first, second)
+
+    def test_table_version_changes_key(self):
+        cache = AthenaResultCache()
+        query = 'SELECT * FROM "db"."table"'
+
+        self.assertNotEqual(
+            cache.key("db", "table", "v1", query), cache.key("db", "table", "v2", query)
+        )
+
+    def test_invalidate_table(self):
+        cache = AthenaResultCache()
+        cache.put("key1", "db", "table", "execution1", "s3://bucket/results")
+        cache.put("key2", "db", "other_table", "execution2", "s3://bucket/results")
+        cache.invalidate("db", "table")
+
+        self.assertIsNone(cache.get("key1"))
+        self.assertEqual("execution2", cache.get("key2")["query_execution_id"])
@@ -0,0 +1,24 @@
+from django.test import TestCase
+
+from mainapp.utils.deidentification.common import ReplacementTrie
+
+
+class ReplacementTrieTestCase(TestCase):
+    def test_longest_case_insensitive_match(self):
+        replacements = ReplacementTrie({"John": "x", "john smith": "y"})
+
+        self.assertEqual(
+            "y met x and xny", replacements.replace("JOHN SMITH met John and johnny")
+        )
+
+    def test_replaced_text_is_not_rescanned(self):
+        replacements = ReplacementTrie({"a": "b", "b": "c"})
+
+        self.assertEqual("bc", replacements.replace("ab"))
+
+    def test_incremental_patterns(self):
+        replacements = ReplacementTrie()
+        self.assertEqual("Jane Doe", replacements.replace("Jane Doe"))
+
+        replacements.update({"jane": "x", "": "ignored"})
+        self.assertEqual("x doe", replacements.replace("Jane Doe"))
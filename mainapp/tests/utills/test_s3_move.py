@@ -0,0 +1,59 @@
+import io
+from unittest.mock import MagicMock, patch
+
+from django.test import TestCase
+
+from mainapp.utils.aws_utils import s3_move
+
+
+class S3MoveTestCase(TestCase):
+    def test_copy_parts_cover_object(self):
+        parts = s3_move.copy_parts(10, part_size=4)
+
+        self.assertEqual([(1, 0, 3), (2, 4, 7), (3, 8, 9)], parts)
+
+    def test_copy_parts_stay_within_part_limit(self):
+        parts = s3_move.copy_parts(s3_move.MAX_COPY_PARTS * 10, part_size=1)
+
+        self.assertEqual(s3_move.MAX_COPY_PARTS, len(parts))
+
+    def test_move_objects_deletes_only_copied_sources(self):
+        s3_client = MagicMock()
+        s3_client.copy_object.side_effect = [None, Exception("copy failed")]
+        s3_client.delete_objects.return_value = dict()
+
+        result = s3_move.move_objects(
+            s3_client, "bucket", [("a", "dir/a", 1), ("b", "dir/b", 1)], max_workers=1
+        )
+
+        self.assertEqual({"a": "dir/a"}, result["moved"])
+        self.assertIn("b", result["failed"])
+        s3_client.delete_objects.assert_called_once_with(
+            Bucket="bucket", Delete={"Objects": [{"Key": "a"}], "Quiet": True}
+        )
+
+    @patch.object(s3_move, "MIN_PART_SIZE", 4)
+    def test_replace_object_head_copies_body_server_side(self):
+        s3_client = MagicMock()
+        s3_client.head_object.return_value = {"ContentLength": 20}
+        s3_client.get_object.return_value = {"Body": io.BytesIO(b"1234")}
+        s3_client.create_multipart_upload.return_value = {"UploadId": "upload"}
+        s3_client.upload_part.return_value = {"ETag": "first"}
+        s3_client.upload_part_copy.return_value = {"CopyPartResult": {"ETag": "copy"}}
+
+        size = s3_move.replace_object_head(
+            s3_client, "bucket", "file.csv", b"a,b\n", replaced_length=3
+        )
+
+        self.assertEqual(21, size)
+        s3_client.get_object.assert_called_once_with(
+            Bucket="bucket", Key="file.csv", Range="bytes=3-6"
+        )
+        s3_client.upload_part_copy.assert_called_once_with(
+            Bucket="bucket",
+            Key="file.csv",
+            UploadId="upload",
+            PartNumber=2,
+            CopySource={"Bucket": "bucket", "Key": "file.csv"},
+            CopySourceRange="bytes=7-19",
+        )
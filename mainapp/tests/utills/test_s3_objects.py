@@ -0,0 +1,86 @@
+import io
+from concurrent.futures.thread import ThreadPoolExecutor
+from unittest.mock import MagicMock
+
+from django.test import TestCase
+
+from mainapp.utils.aws_utils import s3_objects
+
+
+class S3ObjectsTestCase(TestCase):
+    OBJECTS = {
+        "a.csv": b"\xef\xbb\xbfid,name\n1,a\n2,b",
+        "b.csv": b'id,name\n3,"c\nd"\n',
+        "c.csv": b"id,name",
+    }
+
+    def s3_client(self):
+        def get_object(Bucket, Key, Range):
+            first_byte, last_byte = map(int, Range.replace("bytes=", "").split("-"))
+            return {"Body": io.BytesIO(self.OBJECTS[Key][first_byte : last_byte + 1])}
+
+        s3_client = MagicMock()
+        s3_client.get_object.side_effect = get_object
+        return s3_client
+
+    def read(self, **kwargs):
+        objects = [
+            {"key": key, "size": len(data)} for key, data in self.OBJECTS.items()
+        ]
+        with ThreadPoolExecutor(2) as executor:
+            return s3_objects.open_s3_objects(
+                self.s3_client(),
+                "bucket",
+                objects,
+                executor,
+                range_size=3,
+                window=2,
+                **kwargs,
+            ).read()
+
+    def test_objects_are_read_in_order(self):
+        self.assertEqual(
+            b'id,name\n1,a\n2,b\nid,name\n3,"c\nd"\nid,name\n', self.read()
+        )
+
+    def test_skip_first_line(self):
+        self.assertEqual(b'1,a\n2,b\n3,"c\nd"\n', self.read(skip_first_line=True))
+
+    def test_read_is_resumed_from_any_line(self):
+        objects = [
+            {"key": key, "size": len(data)} for key, data in self.OBJECTS.items()
+        ]
+        with ThreadPoolExecutor(2) as executor:
+            stream = s3_objects.open_s3_objects(
+                self.s3_client(),
+                "bucket",
+                objects,
+                executor,
+                skip_first_line=True,
+                range_size=3,
+                window=2,
+            )
+            data = stream.read()
+            for offset in [0] + [
+                index + 1 for index, byte in enumerate(data) if byte == ord("\n")
+            ]:
+                position = stream.raw.locate(offset)
+                if position is None:
+                    self.assertEqual(len(data), offset)
+                    continue
+
+                index = [s3_object["key"] for s3_object in objects].index(
+                    position["key"]
+                )
+                resumed = s3_objects.open_s3_objects(
+                    self.s3_client(),
+                    "bucket",
+                    [dict(objects[index], first_byte=position["first_byte"])]
+                    + objects[index + 1 :],
+                    executor,
+                    skip_first_line=True,
+                    range_size=3,
+                    window=2,
+                )
+
+                self.assertEqual(data[offset:], resumed.read())
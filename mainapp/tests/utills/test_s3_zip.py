@@ -0,0 +1,50 @@
+import io
+import zipfile
+from unittest.mock import MagicMock
+
+from django.test import TestCase
+
+from mainapp.utils.aws_utils import s3_zip
+
+
+class S3ZipTestCase(TestCase):
+    @staticmethod
+    def s3_client_for(data):
+        def get_object(Bucket, Key, Range):
+            first_byte, last_byte = map(int, Range.replace("bytes=", "").split("-"))
+            return {"Body": io.BytesIO(data[first_byte : last_byte + 1])}
+
+        uploads = dict()
+
+        def upload_fileobj(fileobj, bucket, key, Config=None):
+            uploads[key] = fileobj.read()
+
+        s3_client = MagicMock()
+        s3_client.head_object.return_value = {"ContentLength": len(data)}
+        s3_client.get_object.side_effect = get_object
+        s3_client.upload_fileobj.side_effect = upload_fileobj
+
+        return s3_client, uploads
+
+    def test_member_key(self):
+        self.assertEqual("dir/a/b.csv", s3_zip.member_key("dir/", "a/b.csv"))
+        self.assertIsNone(s3_zip.member_key("dir", "a/"))
+        self.assertIsNone(s3_zip.member_key("dir", "../b.csv"))
+
+    def test_extract_zip(self):
+        archive = io.BytesIO()
+        with zipfile.ZipFile(archive, "w", zipfile.ZIP_DEFLATED) as zip_file:
+            zip_file.writestr("a.csv", "id\n1\n" * 1000)
+            zip_file.writestr("folder/", "")
+            zip_file.writestr("folder/b.csv", "id\n2\n")
+        s3_client, uploads = self.s3_client_for(archive.getvalue())
+
+        result = s3_zip.extract_zip(
+            s3_client, "bucket", "dir/file.zip", "dir/file", max_workers=2
+        )
+
+        self.assertEqual({}, result["failed"])
+        self.assertEqual(
+            {"dir/file/a.csv": b"id\n1\n" * 1000, "dir/file/folder/b.csv": b"id\n2\n"},
+            uploads,
+        )
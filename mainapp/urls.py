@@ -52,6 +52,16 @@ urlpatterns = [
     url(
         r"^health_check_aws/?$", views.AWSHealthCheck.as_view(), name="health_check_aws"
     ),
+    url(
+        r"^aws_client_pool_stats/?$",
+        views.AWSClientPoolStats.as_view(),
+        name="aws_client_pool_stats",
+    ),
+    url(
+        r"^deid_scheduler_stats/?$",
+        views.DeidSchedulerStats.as_view(),
+        name="deid_scheduler_stats",
+    ),
     url(r"^me/?$", views.CurrentUserView.as_view(), name="me"),
     url(
         r"^get_dataset_sts/(?P<dataset_id>[^/]+)/?$",
@@ -80,6 +90,16 @@ urlpatterns = [
     url(r"^run_query/?$", views.RunQuery.as_view(), name="run_query"),  # for execution
     url(r"^create_cohort/?$", views.CreateCohort.as_view(), name="create_cohort"),
     url(r"^query/?$", views.Query.as_view(), name="query"),
+    url(
+        r"^query/(?P<job_id>[^/]+)/status/?$",
+        views.QueryJobStatus.as_view(),
+        name="query_job_status",
+    ),
+    url(
+        r"^query/(?P<job_id>[^/]+)/results/?$",
+        views.QueryJobResults.as_view(),
+        name="query_job_results",
+    ),
     url(r"^challenges/?$", views.QuickSightChallenges.as_view(), name="quicksight"),
     url(
         r"^dashboards/?$",
@@ -0,0 +1,197 @@
+import logging
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import Future
+
+from mainapp import settings
+from mainapp.exceptions import (
+    InvalidExecutionId,
+    MaxExecutionReactedError,
+    QueryExecutionError,
+)
+from mainapp.utils import aws_service
+
+logger = logging.getLogger(__name__)
+
+
+class AthenaExecutionWaiter(object):
+    """
+    Tracks every pending Athena execution of the process and checks them together.
+
+    Executions are grouped per organization and checked with a single `batch_get_query_execution` call
+    per 50 executions. The polling interval starts at `min_interval` whenever a new execution is added and
+    grows by `backoff_factor` (up to `max_interval`) every round nothing finishes.
+    The future of every execution is resolved with its `QueryExecution` once it succeeds, or with an error
+    once it fails, is cancelled or exceeds `max_wait` seconds.
+    """
+
+    SUCCEEDED = "SUCCEEDED"
+    FINISHED_STATES = ["SUCCEEDED", "FAILED", "CANCELLED"]
+    BATCH_SIZE = 50
+    __TIMED_OUT = object()
+
+    def __init__(
+        self, min_interval=0.5, max_interval=5, backoff_factor=1.5, max_wait=3600
+    ):
+        self.__min_interval = min_interval
+        self.__max_interval = max_interval
+        self.__backoff_factor = backoff_factor
+        self.__max_wait = max_wait
+        self.__interval = min_interval
+        self.__condition = threading.Condition()
+        self.__pending = defaultdict(dict)
+        self.__thread = None
+        self.__api_calls = 0
+        self.__resolved = 0
+
+    def __ensure_running(self):
+        # started lazily so every gunicorn worker gets its own thread after the fork
+        if not self.__thread or not self.__thread.is_alive():
+            self.__thread = threading.Thread(
+                target=self.__run, name="athena-execution-waiter", daemon=True
+            )
+            self.__thread.start()
+
+    def wait(self, org_name, query_execution_id, callback=None):
+        """
+        Returns a future which is resolved once the given execution is done.
+        """
+        if not query_execution_id:
+            raise InvalidExecutionId
+
+        with self.__condition:
+            pending = self.__pending[org_name].get(query_execution_id)
+            if pending:
+                future = pending[0]
+            else:
+                future = Future()
+                self.__pending[org_name][query_execution_id] = (
+                    future,
+                    time.monotonic(),
+                )
+                self.__interval = self.__min_interval
+                self.__ensure_running()
+                self.__condition.notify()
+
+        if callback:
+            future.add_done_callback(callback)
+
+        return future
+
+    def __check_organization(self, org_name, executions):
+        client = aws_service.create_athena_client(org_name=org_name)
+        execution_ids = list(executions)
+        finished = dict()
+
+        for index in range(0, len(execution_ids), self.BATCH_SIZE):
+            self.__api_calls += 1
+            response = client.batch_get_query_execution(
+                QueryExecutionIds=execution_ids[index : index + self.BATCH_SIZE]
+            )
+            for query_execution in response.get("QueryExecutions", list()):
+                if query_execution["Status"]["State"] in self.FINISHED_STATES:
+                    finished[query_execution["QueryExecutionId"]] = query_execution
+            for unprocessed in response.get("UnprocessedQueryExecutionIds", list()):
+                logger.warning(
+                    f"Athena could not process execution {unprocessed['QueryExecutionId']} "
+                    f"in org {org_name} - {unprocessed.get('ErrorMessage')}"
+                )
+                finished[unprocessed["QueryExecutionId"]] = None
+
+        return finished
+
+    @classmethod
+    def __resolve(cls, future, query_execution):
+        if query_execution is cls.__TIMED_OUT:
+            future.set_exception(MaxExecutionReactedError())
+        elif query_execution is None:
+            future.set_exception(InvalidExecutionId())
+        elif query_execution["Status"]["State"] == AthenaExecutionWaiter.SUCCEEDED:
+            future.set_result(query_execution)
+        else:
+            logger.error(
+                f"Athena execution {query_execution['QueryExecutionId']} ended with state "
+                f"{query_execution['Status']['State']} - {query_execution['Status'].get('StateChangeReason')}"
+            )
+            future.set_exception(QueryExecutionError())
+
+    def __poll(self):
+        with self.__condition:
+            snapshot = {
+                org_name: dict(executions)
+                for org_name, executions in self.__pending.items()
+                if executions
+            }
+
+        any_finished = False
+        for org_name, executions in snapshot.items():
+            try:
+                finished = self.__check_organization(org_name, executions)
+            except Exception as e:
+                logger.exception(
+                    f"Failed checking Athena executions for org {org_name} - {e}"
+                )
+                finished = dict()
+
+            now = time.monotonic()
+            done = list()
+            with self.__condition:
+                for query_execution_id, (future, added_at) in executions.items():
+                    if query_execution_id in finished:
+                        done.append((future, finished[query_execution_id]))
+                    elif now - added_at > self.__max_wait:
+                        done.append((future, self.__TIMED_OUT))
+                    else:
+                        continue
+
+                    self.__resolved += 1
+                    self.__pending[org_name].pop(query_execution_id, None)
+
+            # futures are resolved outside the lock, so slow done callbacks don't hold up other callers
+            for future, query_execution in done:
+                self.__resolve(future, query_execution)
+            any_finished = any_finished or bool(done)
+
+        return any_finished
+
+    def __run(self):
+        while True:
+            with self.__condition:
+                while not any(self.__pending.values()):
+                    self.__condition.wait()
+
+            any_finished = self.__poll()
+
+            with self.__condition:
+                if not any_finished:
+                    self.__interval = min(
+                        self.__interval * self.__backoff_factor, self.__max_interval
+                    )
+                self.__condition.wait(self.__interval)
+
+    def stats(self):
+        with self.__condition:
+            return {
+                "pending": sum(
+                    len(executions) for executions in self.__pending.values()
+                ),
+                "resolved": self.__resolved,
+                "api_calls": self.__api_calls,
+                "interval": self.__interval,
+            }
+
+
+athena_waiter = AthenaExecutionWaiter(
+    min_interval=settings.ATHENA_WAITER_MIN_INTERVAL,
+    max_interval=settings.ATHENA_WAITER_MAX_INTERVAL,
+    max_wait=settings.ATHENA_WAITER_MAX_WAIT,
+)
+
+
+def wait_for_query_execution(org_name, query_execution_id, timeout=None):
+    """
+    Block until the given execution is done and return its `QueryExecution`.
+    Raises QueryExecutionError if it failed.
+    """
+    return athena_waiter.wait(org_name, query_execution_id).result(timeout=timeout)
@@ -1,35 +1,38 @@
-import boto3
 import logging
 
 from botocore.client import Config
 
+from mainapp import settings
+from .client_pool import ClientPool
 from .decorators import organization_dependent
 
 logger = logging.getLogger(__name__)
 
+client_pool = ClientPool(
+    max_size=settings.AWS_CLIENT_POOL_MAX_SIZE,
+    idle_timeout=settings.AWS_CLIENT_POOL_IDLE_TIMEOUT,
+)
+
 
 @organization_dependent
 def create_client(org_settings, org_name, service_name, *args, **kwargs):
-    logger.debug(f"Creating {service_name} client for organization {org_name}")
-    return boto3.client(
-        service_name,
-        region_name=org_settings["AWS_REGION"],
-        aws_access_key_id=org_settings["AWS_ACCESS_KEY_ID"],
-        aws_secret_access_key=org_settings["AWS_SECRET_ACCESS_KEY"],
-        *args,
-        **kwargs,
+    return client_pool.get(
+        ClientPool.CLIENT, org_name, org_settings, service_name, **kwargs
     )
 
 
 @organization_dependent
 def create_resource(org_settings, org_name, service_name, *args, **kwargs):
-    logger.debug(f"Creating {service_name} resource for organization {org_name}")
-    return boto3.resource(
-        service_name,
-        region_name=org_settings["AWS_REGION"],
-        aws_access_key_id=org_settings["AWS_ACCESS_KEY_ID"],
-        aws_secret_access_key=org_settings["AWS_SECRET_ACCESS_KEY"],
-    )
+    return client_pool.get(ClientPool.RESOURCE, org_name, org_settings, service_name)
+
+
+@organization_dependent
+def create_session(org_settings, org_name):
+    return client_pool.get_session(org_name, org_settings)
+
+
+def client_pool_stats():
+    return client_pool.stats()
 
 
 def create_sts_client(*args, **kwargs):
@@ -10,3 +10,14 @@ from .ec2 import (
 from .glue import delete_database
 from .route_53 import Route53Actions, delete_route53, create_route53
 from .s3_storage import download_file, upload_file
+from .s3_move import (
+    copy_object,
+    copy_objects,
+    delete_objects,
+    move_objects,
+    move_prefix,
+    replace_object_head,
+)
+from .local_s3 import LocalS3Client
+from .s3_objects import S3ObjectsReader, open_s3_objects
+from .s3_zip import S3RangeReader, open_s3_object, extract_zip
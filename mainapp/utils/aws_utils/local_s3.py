@@ -0,0 +1,99 @@
+import hashlib
+import io
+import os
+import shutil
+import uuid
+
+from botocore.exceptions import ClientError
+
+
+class LocalS3Client(object):
+    """
+    Stand-in for the S3 client calls of de-identification jobs, keeping every object as a file under `root`,
+    e.g. to run jobs end to end without AWS. Only the arguments these jobs use are supported.
+    """
+
+    def __init__(self, root):
+        self.__root = root
+
+    def path(self, Bucket, Key):
+        return os.path.join(self.__root, Bucket, Key)
+
+    def __upload_dir(self, UploadId):
+        return os.path.join(self.__root, ".uploads", UploadId)
+
+    def __existing_path(self, Bucket, Key):
+        path = self.path(Bucket, Key)
+        if not os.path.isfile(path):
+            raise ClientError(
+                {"Error": {"Code": "NoSuchKey", "Message": f"No object {Key}"}},
+                "GetObject",
+            )
+
+        return path
+
+    @staticmethod
+    def __etag(path):
+        digest = hashlib.md5()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+
+        return f'"{digest.hexdigest()}"'
+
+    def put_object(self, Bucket, Key, Body=b"", **kwargs):
+        path = self.path(Bucket, Key)
+        if Key.endswith("/"):
+            os.makedirs(path, exist_ok=True)
+            return {"ETag": '""'}
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(Body)
+
+        return {"ETag": self.__etag(path)}
+
+    def head_object(self, Bucket, Key):
+        path = self.__existing_path(Bucket, Key)
+        return {"ContentLength": os.path.getsize(path), "ETag": self.__etag(path)}
+
+    def get_object(self, Bucket, Key, Range=None):
+        path = self.__existing_path(Bucket, Key)
+        with open(path, "rb") as f:
+            if Range:
+                first_byte, last_byte = Range.replace("bytes=", "").split("-")
+                f.seek(int(first_byte))
+                data = f.read(int(last_byte) - int(first_byte) + 1)
+            else:
+                data = f.read()
+
+        return {"Body": io.BytesIO(data), "ContentLength": len(data)}
+
+    def create_multipart_upload(self, Bucket, Key, **kwargs):
+        upload_id = uuid.uuid4().hex
+        os.makedirs(self.__upload_dir(upload_id))
+        return {"UploadId": upload_id}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body):
+        path = os.path.join(self.__upload_dir(UploadId), str(PartNumber))
+        with open(path, "wb") as f:
+            f.write(Body)
+
+        return {"ETag": self.__etag(path)}
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        path = self.path(Bucket, Key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            for part in MultipartUpload["Parts"]:
+                part_path = os.path.join(
+                    self.__upload_dir(UploadId), str(part["PartNumber"])
+                )
+                with open(part_path, "rb") as part_file:
+                    shutil.copyfileobj(part_file, f)
+
+        shutil.rmtree(self.__upload_dir(UploadId))
+        return {"ETag": self.__etag(path)}
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId):
+        shutil.rmtree(self.__upload_dir(UploadId), ignore_errors=True)
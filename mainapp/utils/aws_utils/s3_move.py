@@ -0,0 +1,277 @@
+import logging
+import time
+from concurrent.futures.thread import ThreadPoolExecutor
+
+from mainapp import settings
+
+logger = logging.getLogger(__name__)
+
+MAX_COPY_PARTS = 10000
+MIN_PART_SIZE = 5 * 1024 * 1024
+DELETE_BATCH_SIZE = 1000
+
+
+def __copy_part(s3_client, bucket, source_key, destination_key, upload_id, part):
+    part_number, first_byte, last_byte = part
+    response = s3_client.upload_part_copy(
+        Bucket=bucket,
+        Key=destination_key,
+        UploadId=upload_id,
+        PartNumber=part_number,
+        CopySource={"Bucket": bucket, "Key": source_key},
+        CopySourceRange=f"bytes={first_byte}-{last_byte}",
+    )
+    return {"PartNumber": part_number, "ETag": response["CopyPartResult"]["ETag"]}
+
+
+def copy_parts(size, part_size=None):
+    """
+    Split an object of `size` bytes to (part number, first byte, last byte) ranges,
+    growing the part size if needed to stay within the S3 limit of 10,000 parts.
+    """
+    part_size = max(part_size or settings.S3_COPY_PART_SIZE, -(-size // MAX_COPY_PARTS))
+    return [
+        (index + 1, first_byte, min(first_byte + part_size, size) - 1)
+        for index, first_byte in enumerate(range(0, size, part_size))
+    ]
+
+
+def copy_object(
+    s3_client, bucket, source_key, destination_key, size=None, executor=None
+):
+    """
+    Server side copy of a single object.
+    Objects larger than S3_MULTIPART_COPY_THRESHOLD are copied with a multipart upload,
+    their parts are copied concurrently on `executor` if one is given.
+    Returns the size of the object.
+    """
+    if size is None:
+        size = s3_client.head_object(Bucket=bucket, Key=source_key)["ContentLength"]
+
+    if size <= settings.S3_MULTIPART_COPY_THRESHOLD:
+        s3_client.copy_object(
+            Bucket=bucket,
+            Key=destination_key,
+            CopySource={"Bucket": bucket, "Key": source_key},
+        )
+        return size
+
+    upload_id = s3_client.create_multipart_upload(Bucket=bucket, Key=destination_key)[
+        "UploadId"
+    ]
+    try:
+        parts = copy_parts(size)
+
+        def copy_part(part):
+            return __copy_part(
+                s3_client, bucket, source_key, destination_key, upload_id, part
+            )
+
+        completed_parts = list(
+            executor.map(copy_part, parts) if executor else map(copy_part, parts)
+        )
+        s3_client.complete_multipart_upload(
+            Bucket=bucket,
+            Key=destination_key,
+            UploadId=upload_id,
+            MultipartUpload={"Parts": completed_parts},
+        )
+    except Exception:
+        s3_client.abort_multipart_upload(
+            Bucket=bucket, Key=destination_key, UploadId=upload_id
+        )
+        raise
+
+    return size
+
+
+def delete_objects(s3_client, bucket, keys):
+    """
+    Delete keys in batches of 1000. Returns the keys which could not be deleted.
+    """
+    failed = list()
+    for index in range(0, len(keys), DELETE_BATCH_SIZE):
+        response = s3_client.delete_objects(
+            Bucket=bucket,
+            Delete={
+                "Objects": [
+                    {"Key": key} for key in keys[index : index + DELETE_BATCH_SIZE]
+                ],
+                "Quiet": True,
+            },
+        )
+        for error in response.get("Errors", list()):
+            logger.warning(
+                f"Unable to delete file with key {error['Key']} from bucket {bucket} - {error.get('Message')}"
+            )
+            failed.append(error["Key"])
+
+    return failed
+
+
+def copy_objects(s3_client, bucket, copies, max_workers=None):
+    """
+    Copy objects within a bucket concurrently.
+    `copies` is a list of (source key, destination key, size or None) tuples.
+    Returns a dict with the `copied` (source -> destination) and `failed` (source -> error) objects
+    and the `stats` of the copy.
+    """
+    max_workers = max_workers or settings.S3_MOVE_MAX_WORKERS
+    started_at = time.monotonic()
+    copied, failed = dict(), dict()
+    total_bytes = 0
+
+    # parts run on their own pool, so objects waiting on their parts never starve it
+    with ThreadPoolExecutor(max_workers) as objects_executor, ThreadPoolExecutor(
+        max_workers
+    ) as parts_executor:
+        futures = {
+            source_key: (
+                destination_key,
+                objects_executor.submit(
+                    copy_object,
+                    s3_client,
+                    bucket,
+                    source_key,
+                    destination_key,
+                    size,
+                    parts_executor,
+                ),
+            )
+            for source_key, destination_key, size in copies
+        }
+        for source_key, (destination_key, future) in futures.items():
+            try:
+                total_bytes += future.result()
+                copied[source_key] = destination_key
+            except Exception as e:
+                logger.error(
+                    f"Unable to copy file with key {source_key} to {destination_key} in bucket {bucket} - {e}"
+                )
+                failed[source_key] = e
+
+    seconds = time.monotonic() - started_at
+    stats = {
+        "objects": len(copied),
+        "failed": len(failed),
+        "bytes": total_bytes,
+        "seconds": round(seconds, 3),
+        "bytes_per_second": int(total_bytes / seconds) if seconds else 0,
+    }
+    logger.info(
+        f"Copied {stats['objects']} objects ({total_bytes} bytes) in bucket {bucket} in {stats['seconds']}s "
+        f"({stats['bytes_per_second']} bytes/s), {stats['failed']} failed"
+    )
+
+    return {"copied": copied, "failed": failed, "stats": stats}
+
+
+def move_objects(s3_client, bucket, moves, max_workers=None):
+    """
+    Move objects within a bucket.
+    `moves` is a list of (source key, destination key, size or None) tuples. Objects are copied concurrently,
+    and the sources of every successful copy are then deleted in batches.
+    Callers which record the keys of the objects should copy them, save the new keys and only then delete
+    the sources, so a failure in between never leaves them pointing at deleted objects.
+    Returns a dict with the `moved` (source -> destination) and `failed` (source -> error) objects
+    and the `stats` of the move.
+    """
+    result = copy_objects(s3_client, bucket, moves, max_workers=max_workers)
+    not_deleted = delete_objects(s3_client, bucket, list(result["copied"]))
+
+    return {
+        "moved": result["copied"],
+        "failed": result["failed"],
+        "stats": dict(result["stats"], not_deleted=len(not_deleted)),
+    }
+
+
+def move_prefix(s3_client, bucket, source_prefix, destination_prefix, max_workers=None):
+    """
+    Move every object under `source_prefix` to `destination_prefix`, keeping their relative keys.
+    Folder placeholders (keys ending with "/") under the source prefix are deleted.
+    """
+    source_prefix = f"{source_prefix.rstrip('/')}/"
+    destination_prefix = f"{destination_prefix.rstrip('/')}/"
+    moves, placeholders = list(), list()
+
+    paginator = s3_client.get_paginator("list_objects_v2")
+    for page in paginator.paginate(Bucket=bucket, Prefix=source_prefix):
+        for s3_obj in page.get("Contents", list()):
+            if s3_obj["Key"].endswith("/"):
+                placeholders.append(s3_obj["Key"])
+                continue
+
+            moves.append(
+                (
+                    s3_obj["Key"],
+                    destination_prefix + s3_obj["Key"][len(source_prefix) :],
+                    s3_obj["Size"],
+                )
+            )
+
+    result = move_objects(s3_client, bucket, moves, max_workers=max_workers)
+    if not result["failed"]:
+        delete_objects(s3_client, bucket, placeholders)
+
+    return result
+
+
+def replace_object_head(s3_client, bucket, key, head, replaced_length):
+    """
+    Replace the first `replaced_length` bytes of an object with `head`, in place.
+    The head and the next 5MB of the object (the minimal part size) are uploaded as the first part of a
+    multipart upload, and the rest of the object is copied server side with UploadPartCopy ranges,
+    so memory use is constant and the rest of the object never passes through the server.
+    Returns the new size of the object.
+    """
+    size = s3_client.head_object(Bucket=bucket, Key=key)["ContentLength"]
+    first_part_end = min(size, replaced_length + MIN_PART_SIZE)
+    first_part = head
+    if first_part_end > replaced_length:
+        first_part += s3_client.get_object(
+            Bucket=bucket,
+            Key=key,
+            Range=f"bytes={replaced_length}-{first_part_end - 1}",
+        )["Body"].read()
+
+    if first_part_end == size:
+        s3_client.put_object(Bucket=bucket, Key=key, Body=first_part)
+        return len(first_part)
+
+    upload_id = s3_client.create_multipart_upload(Bucket=bucket, Key=key)["UploadId"]
+    try:
+        completed_parts = [
+            {
+                "PartNumber": 1,
+                "ETag": s3_client.upload_part(
+                    Bucket=bucket,
+                    Key=key,
+                    UploadId=upload_id,
+                    PartNumber=1,
+                    Body=first_part,
+                )["ETag"],
+            }
+        ]
+        parts = [
+            (part_number + 1, first_part_end + first_byte, first_part_end + last_byte)
+            for part_number, first_byte, last_byte in copy_parts(size - first_part_end)
+        ]
+
+        def copy_part(part):
+            return __copy_part(s3_client, bucket, key, key, upload_id, part)
+
+        with ThreadPoolExecutor(settings.S3_MOVE_MAX_WORKERS) as parts_executor:
+            completed_parts += list(parts_executor.map(copy_part, parts))
+
+        s3_client.complete_multipart_upload(
+            Bucket=bucket,
+            Key=key,
+            UploadId=upload_id,
+            MultipartUpload={"Parts": completed_parts},
+        )
+    except Exception:
+        s3_client.abort_multipart_upload(Bucket=bucket, Key=key, UploadId=upload_id)
+        raise
+
+    return len(first_part) + size - first_part_end
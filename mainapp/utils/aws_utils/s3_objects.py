@@ -0,0 +1,168 @@
+import io
+from collections import deque
+
+from mainapp import settings
+
+BOM = b"\xef\xbb\xbf"
+
+
+class S3ObjectsReader(io.RawIOBase):
+    """
+    Read-only stream of the bodies of text objects one after the other, e.g. the csv files of a table.
+    Objects are read in ranges of `range_size` bytes, of which up to `window` are fetched concurrently on
+    `executor`, across objects. Every body ends with a newline, and starts after its first line when
+    `skip_first_line`. `objects` are dicts with the `key` and `size` of every object, and optionally the
+    `first_byte` to read it from (its first line isn't skipped then), e.g. to resume a read from `locate`.
+    """
+
+    def __init__(
+        self,
+        s3_client,
+        bucket,
+        objects,
+        executor,
+        skip_first_line=False,
+        range_size=None,
+        window=None,
+    ):
+        super().__init__()
+        self.__s3_client = s3_client
+        self.__bucket = bucket
+        self.__objects = objects
+        self.__executor = executor
+        self.__skip_first_line = skip_first_line
+        self.__range_size = range_size or settings.S3_READ_BUFFER_SIZE
+        self.__window = window or settings.DEID_SOURCE_READ_WORKERS
+        self.__chunks = self.__read_chunks()
+        self.__chunk = bytes()
+        self.__chunk_position = 0
+        # the stream offset, object index and object byte where the data of every object starts
+        self.__starts = list()
+        self.__position = 0
+        self.requests = 0
+
+    def readable(self):
+        return True
+
+    def __ranges(self):
+        for index, s3_object in enumerate(self.__objects):
+            for first_byte in range(
+                s3_object.get("first_byte", 0), s3_object["size"], self.__range_size
+            ):
+                last_byte = min(first_byte + self.__range_size, s3_object["size"]) - 1
+                yield index, first_byte, last_byte
+
+    def __fetch(self, key, first_byte, last_byte):
+        return self.__s3_client.get_object(
+            Bucket=self.__bucket, Key=key, Range=f"bytes={first_byte}-{last_byte}"
+        )["Body"].read()
+
+    def __read_chunks(self):
+        pending = deque()
+        skipping = False
+        for index, first_byte, last_byte in self.__ranges():
+            self.requests += 1
+            pending.append(
+                (
+                    index,
+                    first_byte,
+                    last_byte,
+                    self.__executor.submit(
+                        self.__fetch,
+                        self.__objects[index]["key"],
+                        first_byte,
+                        last_byte,
+                    ),
+                )
+            )
+            if len(pending) < self.__window:
+                continue
+
+            chunk, skipping = self.__chunk_of(*pending.popleft(), skipping)
+            yield chunk
+
+        while pending:
+            chunk, skipping = self.__chunk_of(*pending.popleft(), skipping)
+            yield chunk
+
+    def __chunk_of(self, index, first_byte, last_byte, future, skipping):
+        data = future.result()
+        ends_line = data.endswith(b"\n")
+        if first_byte == 0:
+            skipping = self.__skip_first_line
+            if data.startswith(BOM):
+                data = data[len(BOM) :]
+
+        if skipping:
+            line_end = data.find(b"\n")
+            data = data[line_end + 1 :] if line_end != -1 else bytes()
+            skipping = line_end == -1
+
+        added_newline = (
+            last_byte == self.__objects[index]["size"] - 1
+            and not ends_line
+            and not skipping
+        )
+        if added_newline:
+            data += b"\n"
+
+        if data and (not self.__starts or self.__starts[-1][1] != index):
+            # only a prefix of a range is ever dropped, so its data is the end of the range
+            object_byte = last_byte + 1 - (len(data) - added_newline)
+            self.__starts.append((self.__position, index, object_byte))
+        self.__position += len(data)
+
+        return data, skipping
+
+    def locate(self, offset):
+        """
+        The `key` of the object and the `first_byte` in it to read the stream from `offset` on,
+        an offset which ends a line. None when the stream ends at `offset`.
+        """
+        starts = [start for start in self.__starts if start[0] <= offset]
+        if not starts:
+            # no data was read before the offset, the stream is read from its start
+            index, first_byte = 0, None
+        else:
+            stream_start, index, object_byte = starts[-1]
+            first_byte = object_byte + offset - stream_start
+            if first_byte >= self.__objects[index]["size"]:
+                # the object was read to its end, the stream goes on with the next one
+                index, first_byte = index + 1, None
+
+        if index >= len(self.__objects):
+            return None
+
+        s3_object = self.__objects[index]
+        return {
+            "key": s3_object["key"],
+            "first_byte": (
+                s3_object.get("first_byte", 0) if first_byte is None else first_byte
+            ),
+        }
+
+    def readinto(self, buffer):
+        while self.__chunk_position >= len(self.__chunk):
+            self.__chunk = next(self.__chunks, None)
+            self.__chunk_position = 0
+            if self.__chunk is None:
+                self.__chunk = bytes()
+                return 0
+
+        size = min(len(buffer), len(self.__chunk) - self.__chunk_position)
+        buffer[:size] = self.__chunk[
+            self.__chunk_position : self.__chunk_position + size
+        ]
+        self.__chunk_position += size
+
+        return size
+
+
+def open_s3_objects(s3_client, bucket, objects, executor, **kwargs):
+    """
+    Buffered `S3ObjectsReader` over the objects, see its arguments.
+    """
+    return io.BufferedReader(
+        S3ObjectsReader(s3_client, bucket, objects, executor, **kwargs),
+        buffer_size=kwargs.get("range_size") or settings.S3_READ_BUFFER_SIZE,
+    )
@@ -0,0 +1,166 @@
+import io
+import logging
+import posixpath
+import threading
+import time
+import zipfile
+from concurrent.futures.thread import ThreadPoolExecutor
+
+from boto3.s3.transfer import TransferConfig
+
+from mainapp import settings
+
+logger = logging.getLogger(__name__)
+
+
+class S3RangeReader(io.RawIOBase):
+    """
+    Seekable read-only file over an S3 object, every read is a ranged GET.
+    Wrap it with `io.BufferedReader` to read ahead in large ranges.
+    """
+
+    def __init__(self, s3_client, bucket, key, size=None):
+        super().__init__()
+        self.__s3_client = s3_client
+        self.__bucket = bucket
+        self.__key = key
+        self.__size = (
+            size
+            if size is not None
+            else s3_client.head_object(Bucket=bucket, Key=key)["ContentLength"]
+        )
+        self.__position = 0
+        self.requests = 0
+
+    @property
+    def size(self):
+        return self.__size
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self.__position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            self.__position = offset
+        elif whence == io.SEEK_CUR:
+            self.__position += offset
+        elif whence == io.SEEK_END:
+            self.__position = self.__size + offset
+        else:
+            raise ValueError(f"Invalid whence {whence}")
+
+        self.__position = max(0, self.__position)
+        return self.__position
+
+    def readinto(self, buffer):
+        if self.__position >= self.__size or not len(buffer):
+            return 0
+
+        last_byte = min(self.__position + len(buffer), self.__size) - 1
+        self.requests += 1
+        data = self.__s3_client.get_object(
+            Bucket=self.__bucket,
+            Key=self.__key,
+            Range=f"bytes={self.__position}-{last_byte}",
+        )["Body"].read()
+        buffer[: len(data)] = data
+        self.__position += len(data)
+
+        return len(data)
+
+
+def open_s3_object(s3_client, bucket, key, size=None, buffer_size=None):
+    return io.BufferedReader(
+        S3RangeReader(s3_client, bucket, key, size=size),
+        buffer_size=buffer_size or settings.S3_READ_BUFFER_SIZE,
+    )
+
+
+def member_key(destination_prefix, member_name):
+    """
+    The key a zip member is extracted to, or None for directories and names escaping the destination
+    """
+    name = posixpath.normpath(member_name.replace("\\", "/")).lstrip("/")
+    if member_name.endswith("/") or name in [".", ".."] or name.startswith("../"):
+        return None
+
+    return f"{destination_prefix.rstrip('/')}/{name}"
+
+
+def extract_zip(s3_client, bucket, key, destination_prefix, max_workers=None):
+    """
+    Extract a zip object to `destination_prefix` in the same bucket without landing anything on local disk.
+    The central directory and members are read with ranged GETs and every member is streamed into its own
+    (multipart) upload, `max_workers` members at a time.
+    Returns the extracted keys, the failed members (name -> error) and the stats of the extraction.
+    """
+    max_workers = max_workers or settings.ZIP_EXTRACT_MAX_WORKERS
+    started_at = time.monotonic()
+    archive_size = s3_client.head_object(Bucket=bucket, Key=key)["ContentLength"]
+    transfer_config = TransferConfig(
+        multipart_chunksize=settings.S3_UPLOAD_PART_SIZE, max_concurrency=2
+    )
+    # zip files can't be shared between threads reading different members
+    local = threading.local()
+
+    def archive():
+        if not hasattr(local, "archive"):
+            local.archive = zipfile.ZipFile(
+                open_s3_object(s3_client, bucket, key, size=archive_size)
+            )
+        return local.archive
+
+    members = [
+        (member, member_key(destination_prefix, member.filename))
+        for member in archive().infolist()
+    ]
+    members = [(member, target) for member, target in members if target]
+    extracted, failed = list(), dict()
+
+    def extract(index, member, target):
+        with archive().open(member) as member_file:
+            s3_client.upload_fileobj(
+                member_file, bucket, target, Config=transfer_config
+            )
+        logger.info(
+            f"Extracted member {index + 1}/{len(members)} {member.filename} "
+            f"({member.file_size} bytes) of {bucket}/{key} to {target}"
+        )
+        return member.file_size
+
+    total_bytes = 0
+    with ThreadPoolExecutor(max_workers) as members_executor:
+        futures = [
+            (member, target, members_executor.submit(extract, index, member, target))
+            for index, (member, target) in enumerate(members)
+        ]
+        for member, target, future in futures:
+            try:
+                total_bytes += future.result()
+                extracted.append(target)
+            except Exception as e:
+                logger.error(
+                    f"Failed extracting member {member.filename} of {bucket}/{key} - {e}"
+                )
+                failed[member.filename] = e
+
+    seconds = time.monotonic() - started_at
+    stats = {
+        "members": len(extracted),
+        "failed": len(failed),
+        "bytes": total_bytes,
+        "seconds": round(seconds, 3),
+        "bytes_per_second": int(total_bytes / seconds) if seconds else 0,
+    }
+    logger.info(
+        f"Extracted {stats['members']} members ({total_bytes} bytes) of {bucket}/{key} "
+        f"in {stats['seconds']}s ({stats['bytes_per_second']} bytes/s), {stats['failed']} failed"
+    )
+
+    return {"extracted": extracted, "failed": failed, "stats": stats}
@@ -0,0 +1,149 @@
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+import boto3
+
+logger = logging.getLogger(__name__)
+
+
+class ClientPool(object):
+    """
+    Thread safe pool of boto3 sessions, clients and resources.
+
+    Clients are shared between threads (boto3 clients are thread safe), resources are kept per thread since
+    boto3 resources are not. Entries are keyed by organization, service and config, bounded in size (LRU) and
+    evicted after being idle for `idle_timeout` seconds. Whenever the credentials of an organization in
+    `ORG_VALUES` change, its session and every client created from it are rebuilt.
+    """
+
+    CLIENT = "client"
+    RESOURCE = "resource"
+
+    def __init__(self, max_size=128, idle_timeout=900):
+        self.__max_size = max_size
+        self.__idle_timeout = idle_timeout
+        self.__lock = threading.RLock()
+        self.__sessions = dict()
+        self.__entries = OrderedDict()
+        self.__hits = 0
+        self.__misses = 0
+        self.__evictions = 0
+        self.__reloads = 0
+
+    @staticmethod
+    def __credentials_fingerprint(org_settings):
+        return hashlib.sha256(
+            "|".join(
+                [
+                    str(org_settings.get("AWS_REGION")),
+                    str(org_settings["AWS_ACCESS_KEY_ID"]),
+                    str(org_settings["AWS_SECRET_ACCESS_KEY"]),
+                ]
+            ).encode("utf-8")
+        ).hexdigest()
+
+    @staticmethod
+    def __config_key(config):
+        if config is None:
+            return None
+        # noinspection PyProtectedMember
+        return tuple(
+            sorted(
+                (option, repr(value))
+                for option, value in config._user_provided_options.items()
+            )
+        )
+
+    def __get_session(self, org_name, org_settings, fingerprint):
+        session_fingerprint, session = self.__sessions.get(org_name, (None, None))
+        if session_fingerprint != fingerprint:
+            if session:
+                logger.info(
+                    f"Credentials for organization {org_name} were rotated, reloading boto3 session"
+                )
+                self.__reloads += 1
+                self.__drop_organization(org_name)
+            session = boto3.session.Session(
+                region_name=org_settings["AWS_REGION"],
+                aws_access_key_id=org_settings["AWS_ACCESS_KEY_ID"],
+                aws_secret_access_key=org_settings["AWS_SECRET_ACCESS_KEY"],
+            )
+            self.__sessions[org_name] = (fingerprint, session)
+
+        return session
+
+    def __drop_organization(self, org_name):
+        for key in [key for key in self.__entries if key[0] == org_name]:
+            del self.__entries[key]
+
+    def __evict(self, now):
+        for key in [
+            key
+            for key, (_, last_used) in self.__entries.items()
+            if now - last_used > self.__idle_timeout
+        ]:
+            del self.__entries[key]
+            self.__evictions += 1
+
+        while len(self.__entries) > self.__max_size:
+            self.__entries.popitem(last=False)
+            self.__evictions += 1
+
+    def get_session(self, org_name, org_settings):
+        with self.__lock:
+            return self.__get_session(
+                org_name, org_settings, self.__credentials_fingerprint(org_settings)
+            )
+
+    def get(self, kind, org_name, org_settings, service_name, config=None, **kwargs):
+        fingerprint = self.__credentials_fingerprint(org_settings)
+        key = (
+            org_name,
+            kind,
+            service_name,
+            self.__config_key(config),
+            tuple(sorted((arg, repr(value)) for arg, value in kwargs.items())),
+            threading.get_ident() if kind == self.RESOURCE else None,
+        )
+        now = time.monotonic()
+
+        with self.__lock:
+            session = self.__get_session(org_name, org_settings, fingerprint)
+            entry = self.__entries.get(key)
+            if entry is not None:
+                self.__hits += 1
+                self.__entries[key] = (entry[0], now)
+                self.__entries.move_to_end(key)
+                return entry[0]
+
+            self.__misses += 1
+            logger.debug(f"Creating {service_name} {kind} for organization {org_name}")
+            if config is not None:
+                kwargs["config"] = config
+            instance = getattr(session, kind)(service_name, **kwargs)
+            self.__entries[key] = (instance, now)
+            self.__evict(now)
+
+            return instance
+
+    def clear(self):
+        with self.__lock:
+            self.__sessions.clear()
+            self.__entries.clear()
+
+    def stats(self):
+        with self.__lock:
+            requests = self.__hits + self.__misses
+            return {
+                "size": len(self.__entries),
+                "max_size": self.__max_size,
+                "sessions": len(self.__sessions),
+                "hits": self.__hits,
+                "misses": self.__misses,
+                "evictions": self.__evictions,
+                "reloads": self.__reloads,
+                "hit_rate": round(self.__hits / requests, 4) if requests else 0,
+            }
@@ -0,0 +1,133 @@
+import csv
+import io
+import random
+from itertools import islice
+
+from mainapp import settings
+
+
+class BodyReader(io.RawIOBase):
+    """
+    Raw binary file over anything with a `read(size)`, e.g. the streaming body of an S3 object.
+    """
+
+    def __init__(self, body):
+        super().__init__()
+        self.__body = body
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        data = self.__body.read(len(buffer))
+        buffer[: len(data)] = data
+        return len(data)
+
+
+def open_body(body, block_size=None):
+    """
+    Buffered binary stream over `body`, which is read in blocks of CSV_READ_BLOCK_SIZE
+    """
+    return io.BufferedReader(
+        BodyReader(body), buffer_size=block_size or settings.CSV_READ_BLOCK_SIZE
+    )
+
+
+def read_rows(stream, delimiter=",", encoding="utf-8"):
+    """
+    Rows of a binary csv stream, quoted delimiters, quotes and newlines are kept in their values.
+    A blank line is a row with a single empty value.
+    """
+    rows = csv.reader(
+        io.TextIOWrapper(stream, encoding=encoding, newline=""), delimiter=delimiter
+    )
+    return (row or [str()] for row in rows)
+
+
+def parse_row(line):
+    return next(read_rows(io.BytesIO(line)), list())
+
+
+def parse_rows(text):
+    return list(read_rows(io.BytesIO(text.encode("utf-8"))))
+
+
+def fit_rows(rows, width):
+    """
+    Pad or cut rows to `width` values, the way Athena reads rows of a table with `width` columns.
+    """
+    for row in rows:
+        if len(row) == width:
+            yield row
+        elif len(row) < width:
+            yield row + [str()] * (width - len(row))
+        else:
+            yield row[:width]
+
+
+def batches(rows, batch_rows):
+    rows = iter(rows)
+    batch = list(islice(rows, batch_rows))
+    while batch:
+        yield batch
+        batch = list(islice(rows, batch_rows))
+
+
+def sample_rows(rows, size, rng=None):
+    """
+    Uniform sample of up to `size` rows of a stream of any length (reservoir sampling), in stream order.
+    """
+    rng = rng or random.Random()
+    reservoir = list()
+    for index, row in enumerate(rows):
+        if index < size:
+            reservoir.append((index, row))
+            continue
+
+        slot = rng.randint(0, index)
+        if slot < size:
+            reservoir[slot] = (index, row)
+
+    return [row for _, row in sorted(reservoir, key=lambda entry: entry[0])]
+
+
+def write_rows(rows):
+    """
+    Encode rows as csv, only values which need it are quoted
+    """
+    output = io.StringIO()
+    csv.writer(output, lineterminator="\n").writerows(rows)
+    return output.getvalue().encode("utf-8")
+
+
+def __record_end(block):
+    # a newline ends a record only outside quotes, after an even number of quotes since the block start
+    line_end = block.rfind(b"\n")
+    while line_end != -1 and block.count(b'"', 0, line_end) % 2:
+        line_end = block.rfind(b"\n", 0, line_end)
+
+    return line_end
+
+
+def record_blocks(stream, block_size):
+    """
+    Split a binary csv stream, positioned at the start of a record, to blocks of whole records
+    of about `block_size` bytes.
+    """
+    remainder = bytes()
+    while True:
+        data = stream.read(block_size)
+        if not data:
+            break
+
+        block = remainder + data
+        record_end = __record_end(block)
+        if record_end == -1:
+            remainder = block
+            continue
+
+        yield block[: record_end + 1]
+        remainder = block[record_end + 1 :]
+
+    if remainder:
+        yield remainder
@@ -1,13 +1,23 @@
 import logging
-
+import sys
 from abc import ABC, abstractmethod
 
+from cachetools import LRUCache
+
+from mainapp import settings
 
 logger = logging.getLogger(__name__)
 
 
+def cache_entry_size(entry):
+    # module level, unlike a lambda, so the caches of actions sent to worker processes pickle
+    return sys.getsizeof(entry[0]) + sys.getsizeof(entry[1])
+
+
 class DeidentificationAction(ABC):
     _ACTION_NAME = None
+    # deterministic actions remember the deid value of the raw values they've seen
+    _MEMOIZED = True
 
     def __init__(self, data_source, dsrc_method, col, lynx_type):
         if not self._ACTION_NAME:
@@ -19,11 +29,33 @@ class DeidentificationAction(ABC):
         self._data_source = data_source
         self._lynx_type = lynx_type
         self._dsrc_method = dsrc_method
+        self._column_arguments = lynx_type.column_arguments()
+        self.__cache = self.__create_cache()
+        self.__hits = 0
+        self.__misses = 0
+        self.__exceptions = 0
+        self.__fallbacks = 0
         logger.info(
             f"Created Deidentification Action {self._ACTION_NAME} for Data Source "
             f"{self._data_source.name}:{self._data_source.id}"
         )
 
+    def __create_cache(self):
+        if not self._MEMOIZED:
+            return None
+
+        # entries hold their raw value as well, so both the raw and the deid values are accounted for
+        return LRUCache(
+            maxsize=settings.DEID_COLUMN_CACHE_SIZE,
+            getsizeof=cache_entry_size,
+        )
+
+    def __getstate__(self):
+        # copies sent to worker processes start with an empty cache
+        state = self.__dict__.copy()
+        state["_DeidentificationAction__cache"] = self.__create_cache()
+        return state
+
     def deid_column_names(self, column_names_row, col_index):
         return column_names_row[col_index]
 
@@ -36,11 +68,79 @@ class DeidentificationAction(ABC):
     def get_fallback_value(self):
         return self._lynx_type().get_fallback_value()
 
+    def __deid(self, value):
+        try:
+            if self._dsrc_method.method.group_age_over:
+                value = self._lynx_type.group_over_age(value, **self._column_arguments)
+
+            return self._deid(value)
+        except Exception:
+            self.__exceptions += 1
+            raise
+
     def deid(self, value):
-        if self._dsrc_method.method.group_age_over:
-            value = self._lynx_type.group_over_age(value)
+        if self.__cache is None:
+            return self.__deid(value)
+
+        entry = self.__cache.get(value)
+        if entry:
+            self.__hits += 1
+            return entry[1]
+
+        self.__misses += 1
+        deid_value = self.__deid(value)
+        try:
+            self.__cache[value] = (value, deid_value)
+        except ValueError:
+            # larger than the whole cache
+            pass
+
+        return deid_value
+
+    def deid_fallback_value(self):
+        self.__fallbacks += 1
+        return self.deid(self.get_fallback_value())
+
+    def deid_with_fallback(self, value):
+        try:
+            return self.deid(value)
+        except Exception:
+            return self.deid_fallback_value()
+
+    def deid_batch(self, values):
+        """
+        De-identify a whole column. Actions override it with a vectorized version, this is the per value fallback.
+        """
+        return [self.deid_with_fallback(value) for value in values]
+
+    def _lynx_type_batch(self, action_name, values, **arguments):
+        """
+        De-identify a column with the batch version of the lynx type action,
+        values it can't handle (or every value if it has none) go through `deid_with_fallback`.
+        """
+        deid_values = self._lynx_type.deid_batch(action_name, values, **arguments)
+        if deid_values is None:
+            return DeidentificationAction.deid_batch(self, values)
+
+        return [
+            deid_value if deid_value is not None else self.deid_with_fallback(value)
+            for value, deid_value in zip(values, deid_values)
+        ]
 
-        return self._deid(value)
+    def pop_stats(self):
+        """
+        Cache hits and misses, failed values and fallback values written since the last call,
+        and the current size of the cache in bytes.
+        """
+        stats = {
+            "hits": self.__hits,
+            "misses": self.__misses,
+            "size": self.__cache.currsize if self.__cache is not None else 0,
+            "exceptions": self.__exceptions,
+            "fallbacks": self.__fallbacks,
+        }
+        self.__hits, self.__misses, self.__exceptions, self.__fallbacks = 0, 0, 0, 0
+        return stats
 
     @property
     def name(self):
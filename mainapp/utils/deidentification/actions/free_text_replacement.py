@@ -1,20 +1,19 @@
 from mainapp.utils.deidentification.actions.deid_action import DeidentificationAction
 from mainapp.utils.deidentification.common.enums import Actions
+from mainapp.utils.deidentification.common.replacement_trie import ReplacementTrie
 
 
 class FreeTextReplacement(DeidentificationAction):
     _ACTION_NAME = Actions.FREE_TEXT_REPLACEMENT.value
+    # the replacements change with every row
+    _MEMOIZED = False
 
     def __init__(self, data_source, dsrc_method, col, lynx_type, mapping):
         super().__init__(data_source, dsrc_method, col, lynx_type)
-        self.__mapping = mapping.copy()
+        self.__replacements = ReplacementTrie(mapping)
 
     def update_mapping(self, new_values):
-        self.__mapping.update(new_values)
+        self.__replacements.update(new_values)
 
     def _deid(self, value):
-        deid_value = value[:]
-        for original_text, deid_text in self.__mapping.items():
-            deid_value = deid_value.lower().replace(original_text.lower(), deid_text)
-
-        return deid_value
+        return self.__replacements.replace(value)
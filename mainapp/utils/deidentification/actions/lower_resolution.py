@@ -13,6 +13,15 @@ class LowerResolution(DeidentificationAction):
         self.__action_arguments.update(
             self._col_to_deid.get("additional_attributes", dict())
         )
+        self.__action_arguments.update(self._column_arguments)
 
     def _deid(self, value):
         return self._lynx_type.deid(self._ACTION_NAME, value, **self.__action_arguments)
+
+    def deid_batch(self, values):
+        if self._dsrc_method.method.group_age_over:
+            return super().deid_batch(values)
+
+        return self._lynx_type_batch(
+            self._ACTION_NAME, values, **self.__action_arguments
+        )
@@ -4,6 +4,8 @@ from mainapp.utils.deidentification.common.enums import Actions
 
 class Mask(DeidentificationAction):
     _ACTION_NAME = Actions.MASK.value
+    # the masked value is the same for every value
+    _MEMOIZED = False
 
     def __init__(self, data_source, dsrc_method, col, lynx_type, masked_value):
         super().__init__(data_source, dsrc_method, col, lynx_type)
@@ -14,3 +16,6 @@ class Mask(DeidentificationAction):
 
     def _deid(self, value):
         return self._mask(self._masked_value)
+
+    def deid_batch(self, values):
+        return [self._mask(self._masked_value)] * len(values)
@@ -14,8 +14,24 @@ class Offset(DeidentificationAction):
             action_name,
             value,
             interval=interval,
+            **self._column_arguments,
+            **self._col_to_deid.get("additional_attributes", dict())
+        )
+
+    def _offset_batch(self, values, interval):
+        return self._lynx_type_batch(
+            Actions.OFFSET.value,
+            values,
+            interval=interval,
+            **self._column_arguments,
             **self._col_to_deid.get("additional_attributes", dict())
         )
 
     def _deid(self, value):
         return self._offset(value, self.__interval)
+
+    def deid_batch(self, values):
+        if self._dsrc_method.method.group_age_over:
+            return super().deid_batch(values)
+
+        return self._offset_batch(values, self.__interval)
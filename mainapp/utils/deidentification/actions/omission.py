@@ -4,9 +4,13 @@ from mainapp.utils.deidentification.common.enums import Actions
 
 class Omission(DeidentificationAction):
     _ACTION_NAME = Actions.OMIT.value
+    _MEMOIZED = False
 
     def deid_column_names(self, column_names_row, col_index):
         return None
 
     def _deid(self, value):
         return None
+
+    def deid_batch(self, values):
+        return [None] * len(values)
@@ -1,11 +1,14 @@
 from random import gauss
 
+import numpy as np
+
 from mainapp.utils.deidentification.actions.offset import Offset
 from mainapp.utils.deidentification.common.enums import Actions
 
 
 class RandomOffset(Offset):
     _ACTION_NAME = Actions.RANDOM_OFFSET.value
+    _MEMOIZED = False
 
     def __init__(self, data_source, dsrc_method, col, lynx_type, std):
         super(Offset, self).__init__(data_source, dsrc_method, col, lynx_type)
@@ -14,3 +17,14 @@ class RandomOffset(Offset):
     def _deid(self, value):
         interval = max(min(3 * self.__std, gauss(0, self.__std)), -3 * self.__std)
         return self._offset(value, interval)
+
+    def deid_batch(self, values):
+        if self._dsrc_method.method.group_age_over:
+            return super(Offset, self).deid_batch(values)
+
+        intervals = np.clip(
+            np.random.normal(0, self.__std, len(values)),
+            -3 * self.__std,
+            3 * self.__std,
+        )
+        return self._offset_batch(values, intervals)
@@ -6,6 +6,7 @@ from mainapp.utils.deidentification.common.enums import Actions
 
 class SaltedMask(Mask):
     _ACTION_NAME = Actions.SALTED_HASH.value
+    _MEMOIZED = True
 
     def __init__(self, data_source, dsrc_method, col, lynx_type):
         super(Mask, self).__init__(data_source, dsrc_method, col, lynx_type)
@@ -16,3 +17,7 @@ class SaltedMask(Mask):
             value.encode("utf-8") + self._salt_key.encode("utf-8")
         ).hexdigest()
         return self._mask(masked_value)
+
+    def deid_batch(self, values):
+        masked_values = {value: self.deid_with_fallback(value) for value in set(values)}
+        return [masked_values[value] for value in values]
@@ -0,0 +1,346 @@
+import datetime
+import logging
+import multiprocessing
+import os
+import random
+import resource
+import tempfile
+import time
+import uuid
+from contextlib import ExitStack
+from unittest.mock import patch
+
+from mainapp.models import (
+    DataSource,
+    DataSourceMethod,
+    Dataset,
+    Method,
+    Organization,
+)
+from mainapp.utils import csv_stream
+from mainapp.utils.aws_utils import LocalS3Client
+from mainapp.utils.deidentification import ACTIONS, LYNX_DATA_TYPES, LynxDataTypeNames
+from mainapp.utils.deidentification.common.enums import Actions
+from mainapp.utils.deidentification.common.exceptions import DeidentificationError
+from mainapp.utils.deidentification.method_handler import MethodHandler
+from mainapp.utils.deidentification.method_runner import S3_READER, run_methods
+
+logger = logging.getLogger(__name__)
+
+BUCKET = "benchmark"
+SOURCE_KEY = f"{BUCKET}/{BUCKET}.csv"
+# the arguments every action is benchmarked with, as far as the lynx type takes them
+ACTION_ARGUMENTS = {
+    Actions.OFFSET.value: {"interval": 30},
+    Actions.RANDOM_OFFSET.value: {"std": 10},
+    Actions.MASK.value: {"masked_value": "*****"},
+    Actions.FREE_TEXT_REPLACEMENT.value: {"mapping": dict()},
+    Actions.LOWER_RESOLUTION.value: {"keep_year": True, "keep_month": True},
+}
+# slower actions are only regressions once they take at least this long
+MIN_ACTION_SECONDS = 0.5
+
+FIRST_NAMES = ["john", "jane", "moshe", "sarah", "david", "rachel", "omar", "lin"]
+LAST_NAMES = ["smith", "cohen", "levi", "garcia", "nguyen", "haddad", "miller"]
+STREETS = ["Herzl", "Main", "Oak", "Jabotinsky", "Elm", "Weizmann"]
+NOTES = [
+    "complains of chest pain",
+    "follow up in two weeks",
+    "no known allergies",
+    "referred to cardiology, see attached",
+]
+
+
+def __date(rng):
+    day = datetime.date(1930, 1, 1) + datetime.timedelta(days=rng.randint(0, 33000))
+    # mostly iso dates, some in the us format
+    return day.strftime("%m/%d/%Y" if rng.random() < 0.1 else "%Y-%m-%d")
+
+
+def __digits(rng, count):
+    return "".join(rng.choice("0123456789") for _ in range(count))
+
+
+def synthetic_record(rng):
+    """
+    Related synthetic values of a single person, one of every lynx type by its name.
+    The free text mentions the identifiers of the person, the way clinical notes do.
+    """
+    first_name, last_name = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    record = {
+        LynxDataTypeNames.NAME.value: f"{first_name} {last_name}",
+        LynxDataTypeNames.ADDRESS.value: f"{rng.randint(1, 200)} {rng.choice(STREETS)} St, Apt {rng.randint(1, 40)}",
+        LynxDataTypeNames.ZIP_CODE.value: __digits(rng, 5),
+        LynxDataTypeNames.DATE.value: __date(rng),
+        LynxDataTypeNames.AGE.value: str(rng.randint(0, 100)),
+        LynxDataTypeNames.PHONE_NUMBER.value: f"({__digits(rng, 3)}) {__digits(rng, 3)}-{__digits(rng, 4)}",
+        LynxDataTypeNames.FAX_NUMBER.value: f"+972-{__digits(rng, 1)}-{__digits(rng, 7)}",
+        LynxDataTypeNames.EMAIL.value: f"{first_name}.{last_name}{rng.randint(1, 999)}@example.com",
+        LynxDataTypeNames.SSN.value: f"{__digits(rng, 3)}-{__digits(rng, 2)}-{__digits(rng, 4)}",
+        LynxDataTypeNames.MRD.value: f"MRN{__digits(rng, 8)}",
+        LynxDataTypeNames.HPBN.value: f"HP{__digits(rng, 10)}",
+        LynxDataTypeNames.ACCOUNT_NUMBER.value: __digits(rng, 12),
+        LynxDataTypeNames.CERTIFICATE_NUMBER.value: f"LIC-{__digits(rng, 6)}",
+        LynxDataTypeNames.IP_ADDRESS.value: ".".join(
+            str(rng.randint(1, 254)) for _ in range(4)
+        ),
+        LynxDataTypeNames.NUMBER.value: f"{rng.uniform(0, 1000):.2f}",
+        LynxDataTypeNames.BOOLEAN.value: rng.choice(["true", "false"]),
+        LynxDataTypeNames.VIDSN.value: "".join(
+            rng.choice("ABCDEFGHJKLMNPRSTUVWXYZ0123456789") for _ in range(17)
+        ),
+        LynxDataTypeNames.DIDSN.value: f"DEV-{rng.getrandbits(32):08x}",
+        LynxDataTypeNames.WURL.value: f"https://example.com/patients/{__digits(rng, 6)}",
+        LynxDataTypeNames.UID.value: str(uuid.UUID(int=rng.getrandbits(128))),
+        LynxDataTypeNames.BIRTH_DATE.value: __date(rng),
+    }
+    record[LynxDataTypeNames.TEXT.value] = (
+        f"{record[LynxDataTypeNames.NAME.value]} (SSN {record[LynxDataTypeNames.SSN.value]}, "
+        f"MRN {record[LynxDataTypeNames.MRD.value]}) seen on {record[LynxDataTypeNames.DATE.value]} "
+        f'at {record[LynxDataTypeNames.ZIP_CODE.value]}, "{rng.choice(NOTES)}"'
+    )
+    return record
+
+
+def benchmark_attributes(columns=None):
+    """
+    Data source method attributes with a column for every action of every lynx type, repeated up to
+    `columns` columns when given.
+    """
+    lynx_type_actions = [
+        (lynx_type, action, action_arguments)
+        for lynx_type, data_type in LYNX_DATA_TYPES.items()
+        for action, action_arguments in data_type.supported_actions().items()
+    ]
+    attributes = dict()
+    for index in range(columns or len(lynx_type_actions)):
+        lynx_type, action, action_arguments = lynx_type_actions[
+            index % len(lynx_type_actions)
+        ]
+        col = f"{lynx_type.lower().replace(' ', '_')}_{action}"
+        if index >= len(lynx_type_actions):
+            col = f"{col}_{index // len(lynx_type_actions)}"
+
+        arguments = {
+            argument: value
+            for argument, value in ACTION_ARGUMENTS.get(action, dict()).items()
+            if argument in (action_arguments or list())
+        }
+        LYNX_DATA_TYPES[lynx_type].validate_action(action, arguments.keys())
+        attributes[col] = {
+            "action": action,
+            "lynx_type": lynx_type,
+            "arguments": arguments,
+        }
+
+    return attributes
+
+
+def synthetic_csv(attributes, rows, seed=0, batch_rows=10000):
+    """
+    Encoded csv chunks of a header and `rows` synthetic rows for the columns of the attributes.
+    """
+    rng = random.Random(seed)
+    yield csv_stream.write_rows([list(attributes)])
+    for batch_start in range(0, rows, batch_rows):
+        batch = list()
+        for _ in range(min(batch_rows, rows - batch_start)):
+            record = synthetic_record(rng)
+            batch.append(
+                [
+                    record[col_attributes["lynx_type"]]
+                    for col_attributes in attributes.values()
+                ]
+            )
+        yield csv_stream.write_rows(batch)
+
+
+def write_source(s3_client, attributes, rows, seed=0):
+    """
+    Write the synthetic csv source object of the benchmark data source to the local S3 stand-in.
+    """
+    path = s3_client.path(BUCKET, SOURCE_KEY)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        for chunk in synthetic_csv(attributes, rows, seed):
+            f.write(chunk)
+
+
+def __peak_rss_mb(who):
+    # kilobytes on linux
+    return round(resource.getrusage(who).ru_maxrss / 1024, 1)
+
+
+def run_benchmark(s3_client, attributes, engine=None, workers=1):
+    """
+    De-identify the synthetic source object with a method of the attributes, end to end through `run_methods`,
+    reading and writing the local S3 stand-in, with no AWS or database access.
+    Returns the rows per second, the peak RSS of this process and of its deid worker processes,
+    and the seconds of every action.
+    """
+    dataset = Dataset(
+        name=BUCKET,
+        organization=Organization(name=BUCKET),
+        bucket_override=BUCKET,
+        glue_database_override=BUCKET,
+    )
+    data_source = DataSource(
+        dataset=dataset,
+        name=BUCKET,
+        dir=BUCKET,
+        type=DataSource.STRUCTURED,
+        glue_table=BUCKET,
+    )
+    dsrc_method = DataSourceMethod(
+        method=Method(dataset=dataset, name=BUCKET),
+        data_source=data_source,
+        attributes=attributes,
+    )
+    runner = "mainapp.utils.deidentification.method_runner"
+    with ExitStack() as stack:
+        for target, new in [
+            (f"{runner}.create_s3_client", lambda **kwargs: s3_client),
+            (
+                "mainapp.utils.deidentification.method_handler.create_s3_client",
+                lambda **kwargs: s3_client,
+            ),
+            (
+                f"{runner}.get_source_objects",
+                lambda org_name, data_source: {
+                    SOURCE_KEY: s3_client.head_object(Bucket=BUCKET, Key=SOURCE_KEY)[
+                        "ETag"
+                    ]
+                },
+            ),
+            (
+                "mainapp.utils.glue_schema.get_csv_format",
+                lambda **kwargs: {
+                    "columns": list(attributes),
+                    "delimiter": ",",
+                    "has_header": True,
+                },
+            ),
+            (f"{runner}.deid_workers", lambda organization: workers),
+            (f"{runner}.settings.DEID_SOURCE_READER", S3_READER),
+            (
+                "mainapp.utils.deidentification.method_handler.create_deid_glue_table",
+                lambda **kwargs: None,
+            ),
+        ]:
+            stack.enter_context(patch(target, new))
+        stack.enter_context(patch.object(DataSourceMethod, "beat", return_value=True))
+        stack.enter_context(patch.object(DataSourceMethod, "save"))
+
+        handler = MethodHandler(data_source, dsrc_method, 0, engine=engine)
+        started_at = time.monotonic()
+        run_methods([handler])
+        seconds = time.monotonic() - started_at
+
+    if not dsrc_method.is_ready():
+        raise DeidentificationError(
+            f"The benchmark job failed with the {handler.engine} engine"
+        )
+
+    seconds_by_action = dict.fromkeys(ACTIONS, 0.0)
+    for column in dsrc_method.metrics["columns"].values():
+        seconds_by_action[column["action"]] += column["seconds"]
+
+    return {
+        "seconds": round(seconds, 3),
+        "rows_per_second": int(dsrc_method.metrics["rows"] / seconds) if seconds else 0,
+        "peak_rss_mb": __peak_rss_mb(resource.RUSAGE_SELF),
+        "peak_worker_rss_mb": __peak_rss_mb(resource.RUSAGE_CHILDREN),
+        "actions": {
+            action: round(action_seconds, 3)
+            for action, action_seconds in seconds_by_action.items()
+        },
+    }
+
+
+def __run_benchmark(connection, *args):
+    try:
+        connection.send(run_benchmark(*args))
+    except Exception as e:
+        logger.exception(f"Benchmark failed - {e}")
+        connection.send(None)
+
+
+def benchmark(rows, columns=None, engines=None, workers=1, seed=0):
+    """
+    `run_benchmark` of `rows` synthetic rows with every engine, each in a process of its own so that its
+    peak RSS is its own.
+    """
+    attributes = benchmark_attributes(columns)
+    results = {
+        "rows": rows,
+        "columns": len(attributes),
+        "workers": workers,
+        "seed": seed,
+        "engines": dict(),
+    }
+    context = multiprocessing.get_context("fork")
+    with tempfile.TemporaryDirectory() as root:
+        s3_client = LocalS3Client(root)
+        write_source(s3_client, attributes, rows, seed)
+        for engine in engines or [
+            MethodHandler.ROW_ENGINE,
+            MethodHandler.COLUMNAR_ENGINE,
+        ]:
+            receiver, sender = context.Pipe(duplex=False)
+            process = context.Process(
+                target=__run_benchmark,
+                args=(sender, s3_client, attributes, engine, workers),
+            )
+            process.start()
+            engine_results = receiver.recv()
+            process.join()
+            if engine_results is None:
+                raise DeidentificationError(
+                    f"The benchmark of the {engine} engine failed"
+                )
+
+            logger.info(
+                f"Benchmarked the {engine} engine: {engine_results['rows_per_second']} rows/s"
+            )
+            results["engines"][engine] = engine_results
+
+    return results
+
+
+def find_regressions(results, baseline, tolerance):
+    """
+    Descriptions of the throughputs, peak RSSs and action times of `results` which are worse than those of
+    `baseline` by more than `tolerance` (a fraction of the baseline).
+    """
+    regressions = list()
+    for engine, engine_results in results["engines"].items():
+        engine_baseline = baseline["engines"].get(engine)
+        if not engine_baseline:
+            continue
+
+        if engine_results["rows_per_second"] < engine_baseline["rows_per_second"] * (
+            1 - tolerance
+        ):
+            regressions.append(
+                f"{engine} engine: {engine_results['rows_per_second']} rows/s, "
+                f"baseline {engine_baseline['rows_per_second']} rows/s"
+            )
+
+        for rss in ["peak_rss_mb", "peak_worker_rss_mb"]:
+            if engine_results[rss] > engine_baseline[rss] * (1 + tolerance):
+                regressions.append(
+                    f"{engine} engine: {rss} {engine_results[rss]}, baseline {engine_baseline[rss]}"
+                )
+
+        for action, seconds in engine_results["actions"].items():
+            baseline_seconds = engine_baseline["actions"].get(action)
+            if (
+                baseline_seconds is not None
+                and seconds >= MIN_ACTION_SECONDS
+                and seconds > baseline_seconds * (1 + tolerance)
+            ):
+                regressions.append(
+                    f"{engine} engine: {action} took {seconds}s, baseline {baseline_seconds}s"
+                )
+
+    return regressions
@@ -4,6 +4,7 @@ from .consts import (
     EXAMPLE_VALUES_ROW_INDEX,
     GROUP_OVER_AGE_VALUE,
 )
+from .date_parser import DateParser
 from .enums import Actions, DataTypes, GlueDataTypes, LynxDataTypeNames
 from .exceptions import (
     DeidentificationError,
@@ -14,3 +15,4 @@ from .exceptions import (
     NoExamplesError,
     UnsupportedActionArgumentError,
 )
+from .replacement_trie import ReplacementTrie
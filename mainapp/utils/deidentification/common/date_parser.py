@@ -0,0 +1,110 @@
+import datetime
+
+import pandas as pd
+from dateutil import parser
+from dateutil.relativedelta import relativedelta
+
+from .consts import GROUP_OVER_AGE_VALUE
+
+
+class DateParser(object):
+    """
+    Parses the dates of a single column. The format of the column is inferred from its first values and
+    compiled `strptime` / `pandas.to_datetime` parsing is used for it, values of any other format are
+    parsed by dateutil. `now` is taken once, so every value of the column is compared to the same date.
+    """
+
+    # only formats dateutil reads the same way (month first), so the fast path never changes a date
+    FORMATS = [
+        "%Y-%m-%d",
+        "%Y-%m-%d %H:%M:%S",
+        "%Y-%m-%d %H:%M:%S.%f",
+        "%Y-%m-%dT%H:%M:%S",
+        "%Y-%m-%dT%H:%M:%S.%f",
+        "%Y/%m/%d",
+        "%m/%d/%Y",
+        "%m/%d/%Y %H:%M:%S",
+    ]
+    # the format dates are written in, values grouped over age come back in it
+    OUTPUT_FORMAT = "%Y-%m-%d"
+    SAMPLE_SIZE = 100
+
+    def __init__(self, now=None):
+        self.now = now or datetime.datetime.now()
+        # dates up to this one are never grouped over age
+        self.group_over_age_date = self.now + relativedelta(years=GROUP_OVER_AGE_VALUE)
+        self.__format = None
+        self.__sampled = 0
+
+    @property
+    def format(self):
+        return self.__format
+
+    @staticmethod
+    def __matches(value, dt_format):
+        try:
+            datetime.datetime.strptime(value, dt_format)
+            return True
+        except ValueError:
+            return False
+
+    def infer(self, values):
+        """
+        Infer the format of the column from the values, until a format is found or SAMPLE_SIZE values were seen.
+        """
+        if self.__format or self.__sampled >= self.SAMPLE_SIZE:
+            return self.__format
+
+        sample = [value for value in values if value][
+            : self.SAMPLE_SIZE - self.__sampled
+        ]
+        self.__sampled += len(sample)
+        matches = {
+            dt_format: sum(self.__matches(value, dt_format) for value in sample)
+            for dt_format in self.FORMATS
+        }
+        best_format = max(self.FORMATS, key=matches.get)
+        if matches[best_format]:
+            self.__format = best_format
+
+        return self.__format
+
+    def parse(self, value):
+        self.infer([value])
+        for dt_format in [self.__format, self.OUTPUT_FORMAT]:
+            if dt_format:
+                try:
+                    return datetime.datetime.strptime(value, dt_format)
+                except ValueError:
+                    pass
+
+        return parser.parse(value)
+
+    def parse_batch(self, values):
+        """
+        `parse` of a whole column, values which can't be parsed are returned as None.
+        """
+        self.infer(values)
+        if self.__format:
+            dates = pd.to_datetime(
+                pd.Series(values, dtype=object), format=self.__format, errors="coerce"
+            )
+            dt_objs = [
+                None if missing else dt_obj
+                for dt_obj, missing in zip(
+                    dates.dt.to_pydatetime().tolist(), dates.isna().tolist()
+                )
+            ]
+        else:
+            dt_objs = [None] * len(values)
+
+        parsed = list()
+        for value, dt_obj in zip(values, dt_objs):
+            if dt_obj is None:
+                try:
+                    dt_obj = self.parse(value)
+                except (ValueError, OverflowError):
+                    pass
+            parsed.append(dt_obj)
+
+        return parsed
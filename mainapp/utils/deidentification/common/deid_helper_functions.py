@@ -1,7 +1,6 @@
 import logging
 
-from mainapp.models import DataSource
-from mainapp.utils import executor
+from mainapp.models import DataSource, DataSourceMethod
 from mainapp.utils.deidentification.common.exceptions import (
     DeidentificationError,
     MismatchingActionError,
@@ -9,6 +8,12 @@ from mainapp.utils.deidentification.common.exceptions import (
 )
 from mainapp.utils.deidentification import LYNX_DATA_TYPES
 from mainapp.utils.deidentification.method_handler import MethodHandler
+from mainapp.utils.deidentification.method_runner import (
+    deid_max_jobs,
+    resume_method,
+    run_methods,
+)
+from mainapp.utils.deidentification.scheduler import deid_scheduler
 from mainapp.utils.deidentification.images_de_id import ImageDeId
 
 logger = logging.getLogger(__name__)
@@ -37,10 +42,15 @@ def validate_action(method_action, column, data_source, dsrc_method, attributes)
             f"lynx data type {data_source.columns[column]['lynx_type']}"
         )
         raise DeidentificationError(uaae)
-    dsrc_method.set_as_pending()
 
 
-def handle_method(dsrc_method, data_source, data_source_index):
+def prepare_method(dsrc_method, data_source, data_source_index, source_objects=None):
+    """
+    Validate a data source method and return its MethodHandler, to be run by `submit_method_handlers`.
+    Image data sources are de-identified right away and have no handler.
+    Given the current `source_objects` ({key: ETag}) of the data source, a ready method whose deid settings
+    didn't change only de-identifies the objects it doesn't cover yet, and has no handler when there are none.
+    """
     if not dsrc_method.included:
         logger.debug(
             f"Method {dsrc_method.method.name}:{dsrc_method.method.id} does not include "
@@ -60,13 +70,35 @@ def handle_method(dsrc_method, data_source, data_source_index):
                     attributes["action"], col, data_source, dsrc_method, attributes
                 )
 
+            new_objects = (
+                dsrc_method.pending_objects(source_objects)
+                if source_objects is not None
+                else None
+            )
+            if new_objects is not None and not new_objects:
+                logger.info(
+                    f"Method {dsrc_method.method.name}:{dsrc_method.method.id} over "
+                    f"Data Source {data_source.name}:{data_source.id} is up to date - Skipping"
+                )
+                return
+
+            if dsrc_method.attributes:
+                dsrc_method.set_as_pending()
+
             try:
                 logger.info(
                     f"Handling Method {dsrc_method.method.name}:{dsrc_method.method.id} for "
                     f"Data Source {data_source.name}:{data_source.id}"
+                    f"{' incrementally, for ' + str(len(new_objects)) + ' new objects' if new_objects else str()}"
+                )
+                handler = MethodHandler(
+                    data_source, dsrc_method, data_source_index, new_objects=new_objects
                 )
-                handler = MethodHandler(data_source, dsrc_method, data_source_index)
-                executor.submit(handler.apply)
+                # the first checkpoint, which is enough to start the job over
+                dsrc_method.beat(
+                    {"data_source_index": data_source_index, "new_objects": new_objects}
+                )
+                return handler
             except Exception as e:
                 logger.error(
                     f"Failed to create Method Handler for Method {dsrc_method.method.name}:{dsrc_method.method.id} "
@@ -92,3 +124,86 @@ def handle_method(dsrc_method, data_source, data_source_index):
             f"for Data Source {data_source.name}:{data_source.id}, error - {e}"
         )
         raise
+
+
+def __schedule(handlers, fn, *args):
+    organization = handlers[0].data_source.dataset.organization
+    deid_scheduler.submit(
+        organization.name,
+        deid_max_jobs(organization),
+        [handler.dsrc_method.method_id for handler in handlers],
+        fn,
+        *args,
+    )
+
+
+def submit_method_handlers(handlers):
+    """
+    Queue the handlers on the deid scheduler, the methods of each data source together in a single read of it.
+    Incremental handlers share the read of the same new objects only.
+    """
+    handlers_by_data_source = dict()
+    for handler in handlers:
+        new_objects = (
+            tuple(sorted(handler.new_objects.items())) if handler.incremental else None
+        )
+        handlers_by_data_source.setdefault(
+            (handler.data_source.id, new_objects), list()
+        ).append(handler)
+
+    for data_source_handlers in handlers_by_data_source.values():
+        __schedule(data_source_handlers, run_methods, data_source_handlers)
+
+
+def resume_abandoned_methods(dataset=None):
+    """
+    Resume the abandoned de-identification jobs of the dataset, or of every dataset, e.g. of a restarted worker.
+    Each job is claimed in the database before anything else, so only one worker resumes it.
+    Jobs which never saved a checkpoint can't be resumed and are failed.
+    Returns the ids of the resumed methods.
+    """
+    dsrc_methods = DataSourceMethod.objects.filter(
+        data_source__type=DataSource.STRUCTURED, state=DataSourceMethod.PENDING
+    )
+    if dataset is not None:
+        dsrc_methods = dsrc_methods.filter(method__dataset=dataset)
+
+    resumed_method_ids = list()
+    for dsrc_method in dsrc_methods:
+        # a job queued on a deid scheduler doesn't beat, it finds out it was taken over once it starts
+        if not dsrc_method.is_abandoned or not dsrc_method.beat():
+            continue
+
+        checkpoint = dsrc_method.checkpoint or dict()
+        data_source_index = checkpoint.get("data_source_index")
+        if data_source_index is None:
+            logger.warning(
+                f"Method {dsrc_method.method.name}:{dsrc_method.method.id} over Data Source "
+                f"{dsrc_method.data_source.id} was abandoned without a checkpoint"
+            )
+            dsrc_method.set_as_error()
+            continue
+
+        logger.info(
+            f"Resuming abandoned Method {dsrc_method.method.name}:{dsrc_method.method.id} over "
+            f"Data Source {dsrc_method.data_source.id}"
+        )
+        try:
+            handler = MethodHandler(
+                dsrc_method.data_source,
+                dsrc_method,
+                data_source_index,
+                new_objects=checkpoint.get("new_objects"),
+            )
+        except Exception as e:
+            logger.error(
+                f"Failed to create Method Handler for Method {dsrc_method.method.name}:{dsrc_method.method.id} "
+                f"for Data Source {dsrc_method.data_source.id}, error - {e}"
+            )
+            dsrc_method.set_as_error()
+            continue
+
+        __schedule([handler], resume_method, handler)
+        resumed_method_ids.append(dsrc_method.method_id)
+
+    return resumed_method_ids
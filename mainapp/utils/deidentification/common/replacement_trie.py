@@ -0,0 +1,55 @@
+class ReplacementTrie(object):
+    """
+    Case insensitive multi pattern replacement over a trie of the lower cased patterns.
+    Patterns can be added at any time for the cost of their own length, and `replace` rewrites a text in a
+    single left to right pass taking the longest pattern at every position, so its cost depends on the
+    length of the text and not on the number of patterns.
+    """
+
+    # single characters are the only other keys of a node
+    __REPLACEMENT = ""
+
+    def __init__(self, mapping=None):
+        self.__root = dict()
+        self.update(mapping or dict())
+
+    def add(self, original_text, deid_text):
+        if not original_text:
+            return
+
+        node = self.__root
+        for char in original_text.lower():
+            node = node.setdefault(char, dict())
+        node[self.__REPLACEMENT] = deid_text
+
+    def update(self, mapping):
+        for original_text, deid_text in mapping.items():
+            self.add(original_text, deid_text)
+
+    def replace(self, text):
+        if not self.__root:
+            return text
+
+        text = text.lower()
+        replaced = list()
+        position = copied_from = 0
+        while position < len(text):
+            node = self.__root.get(text[position])
+            match_end = None
+            index = position
+            while node is not None:
+                index += 1
+                if self.__REPLACEMENT in node:
+                    match_end, deid_text = index, node[self.__REPLACEMENT]
+                node = node.get(text[index]) if index < len(text) else None
+
+            if match_end is None:
+                position += 1
+                continue
+
+            replaced.append(text[copied_from:position])
+            replaced.append(deid_text)
+            position = copied_from = match_end
+
+        replaced.append(text[copied_from:])
+        return "".join(replaced)
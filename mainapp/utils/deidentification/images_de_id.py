@@ -37,8 +37,11 @@ class ImageDeId(object):
 
             self.__upload_job_update(job_process_json=uploading_batch_status_json)
 
+            lambda_client = aws_service.create_lambda_client(org_name=self.__org_name)
             for image in self.__data_source.s3_objects:
-                self.__invoke_deid_image_lambda(data_source=image)
+                self.__invoke_deid_image_lambda(
+                    data_source=image, lambda_client=lambda_client
+                )
         except BaseImageDeIdError as e:
             logger.exception(f"Failed to process De-id image", e)
             self.__dsrc_method.set_as_error()
@@ -89,7 +92,7 @@ class ImageDeId(object):
                 f"{self.__json_destination_bucket}/{self.__job_id_file_name}", error=e
             )
 
-    def __invoke_deid_image_lambda(self, data_source):
+    def __invoke_deid_image_lambda(self, data_source, lambda_client):
         image_s3_obj = data_source["key"]
         bucket_path, image_name, _, _ = lib.break_s3_object(image_s3_obj)
 
@@ -101,8 +104,6 @@ class ImageDeId(object):
             "input_image_name": image_name,
         }
 
-        lambda_client = aws_service.create_lambda_client(org_name=self.__org_name)
-
         logger.info(
             f"Invoking Lambda function for image_object {image_s3_obj} and image_name {image_name} "
             f"Method {self.__dsrc_method.method.name}:{self.__dsrc_method.method.id}"
@@ -0,0 +1,98 @@
+import time
+
+
+class JobMetrics(object):
+    """
+    Progress of the de-identification job of a single method, saved on its DataSourceMethod with every
+    checkpoint. Rates and the ETA are of the current run, resumed jobs count the bytes and rows of the
+    checkpoint they started from as done, and keep the output bytes and column stats of its `metrics`.
+    """
+
+    __SUMMED_STATS = ["seconds", "hits", "misses", "exceptions", "fallbacks"]
+
+    def __init__(self, bytes_total, bytes_in=0, rows=0, metrics=None):
+        metrics = metrics or dict()
+        self.__started_at = time.monotonic()
+        self.__bytes_read = 0
+        self.__rows_written = 0
+        self.bytes_total = bytes_total
+        self.bytes_in = bytes_in
+        self.bytes_out = metrics.get("bytes_out", 0)
+        self.rows = rows
+        self.__columns = {
+            col: dict(
+                {stat: column.get(stat, 0) for stat in self.__SUMMED_STATS},
+                action=column["action"],
+                size=column.get("cache_size", 0),
+            )
+            for col, column in metrics.get("columns", dict()).items()
+        }
+
+    def add(self, bytes_in, bytes_out, rows, stats):
+        """
+        Count a de-identified partition, with the stats of the column actions returned by `deidentify_data`.
+        """
+        self.__bytes_read += bytes_in
+        self.__rows_written += rows
+        self.bytes_in += bytes_in
+        self.bytes_out += bytes_out
+        self.rows += rows
+        for col, col_stats in stats.items():
+            column = self.__columns.setdefault(
+                col,
+                dict(
+                    dict.fromkeys(self.__SUMMED_STATS, 0),
+                    action=col_stats["action"],
+                    size=0,
+                ),
+            )
+            for stat in self.__SUMMED_STATS:
+                column[stat] += col_stats[stat]
+            column["size"] = max(column["size"], col_stats["size"])
+
+    @property
+    def elapsed(self):
+        return time.monotonic() - self.__started_at
+
+    @property
+    def rows_per_second(self):
+        elapsed = self.elapsed
+        return int(self.__rows_written / elapsed) if elapsed else 0
+
+    @property
+    def eta(self):
+        elapsed = self.elapsed
+        if not self.__bytes_read or not elapsed:
+            return None
+
+        bytes_per_second = self.__bytes_read / elapsed
+        return round(max(0, self.bytes_total - self.bytes_in) / bytes_per_second, 3)
+
+    @staticmethod
+    def __cache_hit_rate(column):
+        lookups = column["hits"] + column["misses"]
+        return round(column["hits"] / lookups, 3) if lookups else None
+
+    def as_dict(self):
+        return {
+            "rows": self.rows,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "bytes_total": self.bytes_total,
+            "elapsed": round(self.elapsed, 3),
+            "rows_per_second": self.rows_per_second,
+            "eta": self.eta,
+            "columns": {
+                col: {
+                    "action": column["action"],
+                    "seconds": round(column["seconds"], 3),
+                    "hits": column["hits"],
+                    "misses": column["misses"],
+                    "exceptions": column["exceptions"],
+                    "fallbacks": column["fallbacks"],
+                    "cache_hit_rate": self.__cache_hit_rate(column),
+                    "cache_size": column["size"],
+                }
+                for col, column in self.__columns.items()
+            },
+        }
@@ -27,6 +27,10 @@ class Age(LynxDataType):
     def _offset(cls, value, interval):
         return cls._number_offset(value, interval)
 
+    @classmethod
+    def _offset_batch(cls, values, interval):
+        return cls._number_offset_batch(values, interval)
+
     @classmethod
     def group_over_age(cls, value, **kwargs):
         real_age_val = float(value)
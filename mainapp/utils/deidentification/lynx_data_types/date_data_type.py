@@ -1,6 +1,6 @@
 import datetime
 
-from dateutil import parser
+import numpy as np
 from dateutil.relativedelta import relativedelta
 
 from mainapp.utils.deidentification import (
@@ -9,6 +9,7 @@ from mainapp.utils.deidentification import (
     Actions,
     GROUP_OVER_AGE_VALUE,
 )
+from mainapp.utils.deidentification.common.date_parser import DateParser
 from mainapp.utils.deidentification.common.exceptions import (
     InvalidDeidentificationArguments,
 )
@@ -41,26 +42,51 @@ class Date(LynxDataType):
         return dt_obj.isoformat().split("T")[0]
 
     @classmethod
-    def group_over_age(cls, value, **attributes):
-        dt_obj = parser.parse(value)
-
-        curr_date = datetime.datetime.now()
-        date_diff = relativedelta(dt_obj, curr_date)
-        if date_diff.years > GROUP_OVER_AGE_VALUE or (
-            date_diff.years == GROUP_OVER_AGE_VALUE
-            and any([date_diff.days > 0, date_diff.months > 0])
-        ):
-            new_year = curr_date.year - (date_diff.years - GROUP_OVER_AGE_VALUE)
-            dt_obj = cls.__convert_string_to_dt(f"{new_year}-1-1", "%Y-%m-%d")
+    def column_arguments(cls):
+        return {"date_parser": DateParser()}
+
+    @classmethod
+    def group_over_age(cls, value, date_parser=None, **attributes):
+        date_parser = date_parser or DateParser()
+        dt_obj = date_parser.parse(value)
+
+        if dt_obj > date_parser.group_over_age_date:
+            curr_date = date_parser.now
+            date_diff = relativedelta(dt_obj, curr_date)
+            if date_diff.years > GROUP_OVER_AGE_VALUE or (
+                date_diff.years == GROUP_OVER_AGE_VALUE
+                and any([date_diff.days > 0, date_diff.months > 0])
+            ):
+                new_year = curr_date.year - (date_diff.years - GROUP_OVER_AGE_VALUE)
+                dt_obj = cls.__convert_string_to_dt(f"{new_year}-1-1", "%Y-%m-%d")
 
         return cls.__convert_dt_to_string(dt_obj)
 
     @classmethod
-    def _offset(cls, value, interval):
-        dt_obj = parser.parse(value)
+    def __offset_dt(cls, dt_obj, interval):
         offset_dt = dt_obj + datetime.timedelta(days=interval)
         return cls.__convert_dt_to_string(offset_dt)
 
+    @classmethod
+    def _offset(cls, value, interval, date_parser=None):
+        date_parser = date_parser or DateParser()
+        return cls.__offset_dt(date_parser.parse(value), interval)
+
+    @classmethod
+    def _offset_batch(cls, values, interval, date_parser=None):
+        date_parser = date_parser or DateParser()
+        intervals = np.broadcast_to(interval, len(values)).tolist()
+        deid_values = list()
+        for dt_obj, dt_interval in zip(date_parser.parse_batch(values), intervals):
+            try:
+                deid_values.append(
+                    cls.__offset_dt(dt_obj, dt_interval) if dt_obj is not None else None
+                )
+            except OverflowError:
+                deid_values.append(None)
+
+        return deid_values
+
     @classmethod
     def _validate_lower_resolution(
         cls, keep_year=False, keep_month=False, keep_day=False
@@ -77,9 +103,27 @@ class Date(LynxDataType):
 
     @classmethod
     def _lower_resolution(
-        cls, value, keep_year=False, keep_month=False, keep_day=False
+        cls, value, keep_year=False, keep_month=False, keep_day=False, date_parser=None
     ):
-        dt_obj = parser.parse(value)
+        date_parser = date_parser or DateParser()
+        return cls.__lower_dt_resolution(
+            date_parser.parse(value), keep_year, keep_month, keep_day
+        )
+
+    @classmethod
+    def _lower_resolution_batch(
+        cls, values, keep_year=False, keep_month=False, keep_day=False, date_parser=None
+    ):
+        date_parser = date_parser or DateParser()
+        return [
+            cls.__lower_dt_resolution(dt_obj, keep_year, keep_month, keep_day)
+            if dt_obj is not None
+            else None
+            for dt_obj in date_parser.parse_batch(values)
+        ]
+
+    @staticmethod
+    def __lower_dt_resolution(dt_obj, keep_year, keep_month, keep_day):
         low_res_dt = dt_obj
         if all([keep_year, keep_month, keep_day]):
             low_res_dt = f"{dt_obj.year}-{dt_obj.month}-{dt_obj.day}"
@@ -1,5 +1,8 @@
 from abc import ABC, abstractmethod
 
+import numpy as np
+import pandas as pd
+
 from mainapp.utils.deidentification.common.exceptions import (
     MismatchingActionError,
     MismatchingTypesError,
@@ -54,6 +57,13 @@ class LynxDataType(ABC):
             if action_arg not in cls._SUPPORTED_ACTIONS[action]:
                 raise UnsupportedActionArgumentError(cls._TYPE_NAME, action, action_arg)
 
+    @classmethod
+    def supported_actions(cls):
+        """
+        The actions of the type, by name, with the names of the arguments they take (None for no arguments).
+        """
+        return dict(cls._SUPPORTED_ACTIONS)
+
     @abstractmethod
     def _validate(self, value):
         raise NotImplementedError("Lynx Data Types must implement a _validate method")
@@ -64,6 +74,23 @@ class LynxDataType(ABC):
         int_val = int(float_val)
         return str(max(int_val, float_val) + interval)
 
+    @staticmethod
+    def _number_offset_batch(numbers_in_string, interval):
+        """
+        `_number_offset` of a whole column, `interval` is a number or an array of one per value.
+        Values which don't parse to a finite number are returned as None.
+        """
+        numbers = pd.to_numeric(
+            pd.Series(numbers_in_string, dtype=object), errors="coerce"
+        ).to_numpy(dtype=float)
+        offset_numbers = np.maximum(np.trunc(numbers), numbers) + interval
+        return [
+            str(offset_number) if is_finite else None
+            for offset_number, is_finite in zip(
+                offset_numbers.tolist(), np.isfinite(numbers).tolist()
+            )
+        ]
+
     @classmethod
     def validate_arguments(cls, action, **arguments):
         try:
@@ -82,6 +109,25 @@ class LynxDataType(ABC):
                 f"Lynx Data Type {cls._TYPE_NAME} does not implement it's own {action} action"
             )
 
+    @classmethod
+    def deid_batch(cls, action, values, **arguments):
+        """
+        `deid` of a whole column, or None if the type has no batch version of the action.
+        Values the batch version can't handle are returned as None.
+        """
+        batch_action = getattr(cls, f"_{action}_batch", None)
+        if not batch_action:
+            return None
+
+        return batch_action(values, **arguments)
+
+    @classmethod
+    def column_arguments(cls):
+        """
+        Keyword arguments given to every action of the type on a single column, created once per column.
+        """
+        return dict()
+
     @classmethod
     def group_over_age(cls, value, **kwargs):
         return value
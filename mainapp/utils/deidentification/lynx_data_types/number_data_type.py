@@ -21,3 +21,7 @@ class Number(LynxDataType):
     @classmethod
     def _offset(cls, value, interval):
         return cls._number_offset(value, interval)
+
+    @classmethod
+    def _offset_batch(cls, values, interval):
+        return cls._number_offset_batch(values, interval)
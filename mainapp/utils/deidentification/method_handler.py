@@ -1,21 +1,32 @@
-from boto3 import Session
+import hashlib
+import io
 import logging
-import smart_open
+import time
 
+from mainapp import settings
+from mainapp.models import Method
 from . import ACTIONS, LYNX_DATA_TYPES
-from mainapp.settings import ORG_VALUES
+from mainapp.utils import csv_stream, glue_schema
 from mainapp.utils.lib import create_deid_glue_table
 from mainapp.utils.aws_service import create_s3_client
+from mainapp.utils.deidentification import parquet_output
 from mainapp.utils.deidentification.common.enums import Actions
+from mainapp.utils.deidentification.method_runner import run_methods
 
 logger = logging.getLogger(__name__)
 
 
 class MethodHandler(object):
 
-    __DEID_LOG_INTERVAL = 1000
+    ROW_ENGINE = "row"
+    COLUMNAR_ENGINE = "columnar"
 
-    def __init__(self, data_source, dsrc_method, data_source_index):
+    def __init__(
+        self, data_source, dsrc_method, data_source_index, engine=None, new_objects=None
+    ):
+        self.__engine = engine or settings.DEID_ENGINE
+        # the source objects ({key: ETag}) of an incremental job, which only de-identifies them
+        self.__new_objects = new_objects
         self.__dsrc_index = data_source_index
         self.__data_source = data_source
         self.__dsrc_method = dsrc_method
@@ -31,22 +42,8 @@ class MethodHandler(object):
             )
             for col, col_attributes in dsrc_method.attributes.items()
         }
-
-    def __fetch_data_object_from_glue(self):
-        query_response = self.__data_source.dataset.query(
-            f'SELECT * FROM "{self.__data_source.glue_table}";'
-        )
-        return self.__data_source.dataset.get_query_execution(
-            query_response["QueryExecutionId"]
-        )["Body"]
-
-    @staticmethod
-    def __decode_stream_row(row):
-        return row.decode("utf-8").rstrip("\n").replace('"', "").split(",")
-
-    @staticmethod
-    def __encode_deid_row(row):
-        return f"{','.join(row)}\n".encode("utf-8")
+        self.__seconds = dict.fromkeys(self.__actions, 0.0)
+        self.__parquet_columns = None
 
     def __create_s3_deid_bucket(self):
         s3_client = create_s3_client(
@@ -80,7 +77,6 @@ class MethodHandler(object):
         return deid_row
 
     def __deidentify_row(self, data_row, columns):
-        data_row = self.__decode_stream_row(data_row)
         deid_row = list()
         final_actions = dict()
         replacement_cache = dict()
@@ -98,103 +94,280 @@ class MethodHandler(object):
                 final_actions[col] = (action, len(deid_row) - 1)
                 continue
 
+            started_at = time.perf_counter()
             try:
                 deid_value = action.deid(original_value)
                 if deid_value or not original_value:
                     deid_row.append(deid_value)
             except Exception:
-                deid_value = action.deid(action.get_fallback_value())
+                deid_value = action.deid_fallback_value()
                 deid_row.append(deid_value)
+            self.__seconds[col] += time.perf_counter() - started_at
 
             replacement_cache[original_value] = deid_value or str()
 
         for col, action_data in final_actions.items():
             original_value = data_row[columns[col]]
             action, action_col_index = action_data[0], action_data[1]
+            started_at = time.perf_counter()
             action.update_mapping(replacement_cache)
             deid_row[action_col_index] = action.deid(original_value)
+            self.__seconds[col] += time.perf_counter() - started_at
 
         return deid_row
 
-    def __communicate_with_bucket(self, data_stream, column_name_row):
-        columns = {name: idx for idx, name in enumerate(column_name_row)}
-        self.__create_s3_deid_bucket()
-        logger.info(
-            f"Deidentifying column names for Data Source {self.__data_source.name}:{self.__data_source.id}"
-        )
-
-        column_name_row = self.__deidentify_col_name_row(column_name_row, columns)
-        logger.info(
-            f"Deidentifying data for Data Source {self.__data_source.name}:{self.__data_source.id}"
-        )
+    def __deidentify_block(self, data_rows, columns):
+        """
+        Columnar version of `__deidentify_row`, every action de-identifies a whole column of the block at once.
+        Free text replacements still run row by row, after the replacements of their own row.
+        """
+        deid_columns = list()
+        replacements = list()
+        final_actions = list()
+
+        for col, original_col_index in columns.items():
+            original_values = [data_row[original_col_index] for data_row in data_rows]
+            action = self.__actions.get(col)
+            if not action:
+                deid_columns.append(original_values)
+                continue
 
-        aws_credentials = ORG_VALUES[self.__data_source.dataset.organization.name]
+            if action.name == Actions.FREE_TEXT_REPLACEMENT.value:
+                deid_columns.append(list(original_values))
+                final_actions.append(
+                    (col, action, original_values, len(deid_columns) - 1)
+                )
+                continue
 
-        output_file_session = Session(
-            aws_access_key_id=aws_credentials["AWS_ACCESS_KEY_ID"],
-            aws_secret_access_key=aws_credentials["AWS_SECRET_ACCESS_KEY"],
-        )
+            started_at = time.perf_counter()
+            deid_values = action.deid_batch(original_values)
+            self.__seconds[col] += time.perf_counter() - started_at
+            replacements.append((original_values, deid_values))
+            if action.name != Actions.OMIT.value:
+                deid_columns.append(deid_values)
+
+        for row_index in range(len(data_rows) if final_actions else 0):
+            replacement_cache = dict()
+            for original_values, deid_values in replacements:
+                replacement_cache[original_values[row_index]] = (
+                    deid_values[row_index] or str()
+                )
 
-        deid_data_file = f"s3://{self.__data_source.bucket}/{self.__deid_data_dir}/{self.__data_source.name}"
-        deid_counter = 0
-        with smart_open.open(
-            deid_data_file, "wb", transport_params={"session": output_file_session}
-        ) as deid_result:
-            if not deid_counter:
-                logger.info(
-                    f"De Identification is in progress for method "
-                    f"{self.__dsrc_method.method.id} on data source {self.__data_source.id}"
+            for col, action, original_values, deid_col_index in final_actions:
+                started_at = time.perf_counter()
+                action.update_mapping(replacement_cache)
+                deid_columns[deid_col_index][row_index] = action.deid(
+                    original_values[row_index]
                 )
-            deid_counter = (deid_counter + 1) % self.__DEID_LOG_INTERVAL
-            deid_result.write(self.__encode_deid_row(column_name_row))
-            for data_row in data_stream._raw_stream:
-                deid_row = self.__deidentify_row(data_row, columns)
-                deid_result.write(self.__encode_deid_row(deid_row))
+                self.__seconds[col] += time.perf_counter() - started_at
 
-        logger.info(f"Uploaded Deidentified file to {deid_data_file}")
+        return list(zip(*deid_columns))
 
-    def apply(self):
-        if not self.__actions:
-            logger.warning(
-                f"Method {self.__dsrc_method.method.name}:{self.__dsrc_method.method.id} has no actions for"
-                f"Data Source {self.__data_source.name}:{self.__data_source.id}"
+    def deidentify_column_names(self, column_name_row):
+        columns = {name: idx for idx, name in enumerate(column_name_row)}
+        return self.__deidentify_col_name_row(column_name_row, columns)
+
+    def deidentify_blocks(self, data_rows, columns, engine=None):
+        """
+        De-identify parsed csv rows in blocks of DEID_BLOCK_ROWS rows, with the columnar or the row engine.
+        Yields the de-identified rows of every block.
+        """
+        engine = engine or self.__engine
+        for block in csv_stream.batches(data_rows, settings.DEID_BLOCK_ROWS):
+            if engine == self.ROW_ENGINE:
+                yield [self.__deidentify_row(data_row, columns) for data_row in block]
+            else:
+                yield self.__deidentify_block(block, columns)
+
+    def measure_throughput(self, data_rows, column_name_row, engines=None):
+        """
+        Rows per second of every engine de-identifying the same rows, nothing is written.
+        """
+        data_rows = list(data_rows)
+        columns = {name: idx for idx, name in enumerate(column_name_row)}
+        throughput = dict()
+        for engine in engines or [self.ROW_ENGINE, self.COLUMNAR_ENGINE]:
+            started_at = time.monotonic()
+            for _ in self.deidentify_blocks(data_rows, columns, engine=engine):
+                pass
+            seconds = time.monotonic() - started_at
+            throughput[engine] = int(len(data_rows) / seconds) if seconds else 0
+
+        return throughput
+
+    def pop_stats(self):
+        """
+        Stats of the action of every column since the last call, along with the seconds it took.
+        """
+        stats = {
+            col: dict(
+                action.pop_stats(), action=action.name, seconds=self.__seconds[col]
             )
-            self.__dsrc_method.set_as_ready()
-            return
-
-        try:
-            logger.info(
-                f"Fetching entire data from glue table "
-                f"{self.__data_source.dataset.glue_database}.{self.__data_source.glue_table}"
+            for col, action in self.__actions.items()
+        }
+        self.__seconds = dict.fromkeys(self.__actions, 0.0)
+        return stats
+
+    def deidentify_data(self, data, columns, delimiter=","):
+        """
+        De-identify raw csv data made of whole records, returns the encoded deid data (an arrow table for
+        parquet outputs), its number of rows and the stats of its actions.
+        Runs in the worker processes of partitioned jobs.
+        """
+        deid_data, rows = list(), 0
+        data_rows = csv_stream.fit_rows(
+            csv_stream.read_rows(io.BytesIO(data), delimiter=delimiter), len(columns)
+        )
+        for deid_rows in self.deidentify_blocks(data_rows, columns):
+            if self.__parquet_columns is not None:
+                deid_data.extend(deid_rows)
+            else:
+                deid_data.append(csv_stream.write_rows(deid_rows))
+            rows += len(deid_rows)
+
+        if self.__parquet_columns is not None:
+            return (
+                parquet_output.table(deid_data, self.__parquet_columns),
+                rows,
+                self.pop_stats(),
             )
-            data_stream = self.__fetch_data_object_from_glue()
 
-            logger.info(
-                f"Reading column name row for Data Source {self.__data_source.name}:{self.__data_source.id}"
-            )
-            column_name_row = self.__decode_stream_row(
-                data_stream._raw_stream.readline()
+        return b"".join(deid_data), rows, self.pop_stats()
+
+    @property
+    def data_source(self):
+        return self.__data_source
+
+    @property
+    def dsrc_method(self):
+        return self.__dsrc_method
+
+    @property
+    def output_format(self):
+        return self.__dsrc_method.method.output_format
+
+    @property
+    def parquet_schema(self):
+        return parquet_output.schema(self.__parquet_columns)
+
+    @property
+    def engine(self):
+        return self.__engine
+
+    @property
+    def has_actions(self):
+        return bool(self.__actions)
+
+    @property
+    def partitionable(self):
+        """
+        Whether partitions can be de-identified out of order on copies of the handler.
+        Free text replacements learn from every row before them, so they must run in order on the handler itself.
+        """
+        return not any(
+            action.name == Actions.FREE_TEXT_REPLACEMENT.value
+            for action in self.__actions.values()
+        )
+
+    @property
+    def new_objects(self):
+        return self.__new_objects
+
+    @property
+    def incremental(self):
+        return self.__new_objects is not None
+
+    @property
+    def deid_data_key(self):
+        if not self.incremental:
+            return f"{self.__deid_data_dir}/{self.__data_source.name}"
+
+        # incremental outputs are added next to the previous ones
+        objects_digest = hashlib.sha1(
+            "|".join(
+                f"{key}:{etag}" for key, etag in sorted(self.__new_objects.items())
+            ).encode("utf-8")
+        ).hexdigest()[:12]
+        return f"{self.__deid_data_dir}/{self.__data_source.name}_{objects_digest}"
+
+    def start(self, column_name_row):
+        """
+        Prepare the output folders of the method, returns its encoded column name row.
+        The columns of parquet outputs are derived from the source table, and written by their writer.
+        """
+        self.__create_s3_deid_bucket()
+        if self.output_format == Method.PARQUET:
+            self.__parquet_columns = glue_schema.derive_parquet_columns(
+                glue_schema.derive_deid_columns(
+                    self.__data_source.dataset.get_columns_types(
+                        self.__data_source.glue_table
+                    ),
+                    self.__dsrc_method.attributes,
+                )
             )
+        logger.info(
+            f"Deidentifying column names for Data Source {self.__data_source.name}:{self.__data_source.id}"
+        )
 
-            self.__communicate_with_bucket(data_stream, column_name_row)
+        return csv_stream.write_rows([self.deidentify_column_names(column_name_row)])
 
-            logger.info(
-                f"Creating Deidentified glue table for Data Source {self.__data_source.name}:{self.__data_source.id} "
-                f"for Method {self.__dsrc_method.method.name}:{self.__dsrc_method.method.name}"
-            )
+    def __owns_job(self):
+        if self.__dsrc_method.beat():
+            return True
 
-            create_deid_glue_table(
-                data_source=self.__data_source,
-                deid=self.__dsrc_method.method.id,
-                dsrc_index=self.__dsrc_index,
-            )
+        logger.warning(
+            f"Method {self.__dsrc_method.method.id} over Data Source {self.__data_source.id} "
+            f"was taken over by another worker, leaving its state"
+        )
+        return False
+
+    def __processed(self, source_objects):
+        """
+        What the output of the method covers once the job is done
+        """
+        if self.incremental:
+            processed_objects = (self.__dsrc_method.processed or dict()).get("objects")
+            objects = dict(processed_objects or dict(), **self.__new_objects)
+        else:
+            objects = source_objects
+
+        if objects is None:
+            return None
+
+        return {"objects": objects, "settings": self.__dsrc_method.deid_settings}
+
+    def finish(self, source_objects=None):
+        """
+        Create the glue table of the output and mark the method as ready, along with the source objects
+        (by key and ETag) the output covers.
+        """
+        if not self.__owns_job():
+            return
 
-            self.__dsrc_method.set_as_ready()
+        logger.info(
+            f"Creating Deidentified glue table for Data Source {self.__data_source.name}:{self.__data_source.id} "
+            f"for Method {self.__dsrc_method.method.name}:{self.__dsrc_method.method.name}"
+        )
 
-        except Exception as e:
-            logger.exception(
-                f"Error occurred when applying deid method "
-                f"{self.__dsrc_method.method.name}: {self.__dsrc_method.method.id} "
-                f"on data source {self.__data_source.name}: {self.__data_source.id} - \nerror: {e}"
-            )
+        create_deid_glue_table(
+            data_source=self.__data_source,
+            deid=self.__dsrc_method.method.id,
+            dsrc_index=self.__dsrc_index,
+            dsrc_method=self.__dsrc_method,
+            incremental=self.incremental,
+        )
+
+        self.__dsrc_method.processed = self.__processed(source_objects)
+        self.__dsrc_method.set_as_ready()
+
+    def fail(self, e):
+        logger.exception(
+            f"Error occurred when applying deid method "
+            f"{self.__dsrc_method.method.name}: {self.__dsrc_method.method.id} "
+            f"on data source {self.__data_source.name}: {self.__data_source.id} - \nerror: {e}"
+        )
+        if self.__owns_job():
             self.__dsrc_method.set_as_error()
+
+    def apply(self):
+        run_methods([self])
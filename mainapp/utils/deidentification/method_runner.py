@@ -0,0 +1,763 @@
+import io
+import logging
+import multiprocessing
+from collections import deque
+from concurrent.futures import Future, TimeoutError
+from concurrent.futures.process import ProcessPoolExecutor
+from concurrent.futures.thread import ThreadPoolExecutor
+
+import django
+import pyarrow as pa
+import pyarrow.parquet as pq
+from botocore.exceptions import ClientError
+
+from mainapp import settings
+from mainapp.models import Dataset, Method, OrganizationPreference
+from mainapp.utils import athena_waiter, csv_stream, glue_schema
+from mainapp.utils.aws_service import create_s3_client
+from mainapp.utils.aws_utils import open_s3_objects
+from mainapp.utils.deidentification import parquet_output
+from mainapp.utils.deidentification.job_metrics import JobMetrics
+from mainapp.utils.lib import get_source_objects
+
+logger = logging.getLogger(__name__)
+
+ATHENA_READER = "athena"
+S3_READER = "s3"
+
+
+class PartUploader(object):
+    """
+    Multipart upload of a single object written in ordered chunks.
+    Chunks are coalesced to parts of at least S3_UPLOAD_PART_SIZE, which are uploaded on `upload_executor`.
+    Chunks carry the rows they hold and the source offset they reach, so an upload can be resumed
+    from the `checkpoint` of its uploaded parts.
+    """
+
+    def __init__(self, s3_client, bucket, key, upload_executor, checkpoint=None):
+        self.__s3_client = s3_client
+        self.__bucket = bucket
+        self.__key = key
+        self.__upload_executor = upload_executor
+        self.__buffer = list()
+        self.__buffered = 0
+        if checkpoint:
+            self.__upload_id = checkpoint["upload_id"]
+            self.__parts = [self.__uploaded(part) for part in checkpoint["parts"]]
+            self.__part_ends = [
+                (checkpoint["source_offset"], checkpoint["rows"])
+            ] * len(self.__parts)
+            self.__source_offset = checkpoint["source_offset"]
+            self.rows = checkpoint["rows"]
+        else:
+            self.__upload_id = s3_client.create_multipart_upload(
+                Bucket=bucket, Key=key
+            )["UploadId"]
+            self.__parts = list()
+            self.__part_ends = list()
+            self.__source_offset = None
+            self.rows = 0
+
+    @staticmethod
+    def __uploaded(part):
+        future = Future()
+        future.set_result(part)
+        return future
+
+    def __upload(self, part_number, body):
+        response = self.__s3_client.upload_part(
+            Bucket=self.__bucket,
+            Key=self.__key,
+            UploadId=self.__upload_id,
+            PartNumber=part_number,
+            Body=body,
+        )
+        return {"PartNumber": part_number, "ETag": response["ETag"]}
+
+    def __flush(self):
+        self.__parts.append(
+            self.__upload_executor.submit(
+                self.__upload, len(self.__parts) + 1, b"".join(self.__buffer)
+            )
+        )
+        self.__part_ends.append((self.__source_offset, self.rows))
+        self.__buffer, self.__buffered = list(), 0
+
+    def write(self, data, rows=0, source_offset=None):
+        """
+        Buffer a chunk of the object, returns its size.
+        """
+        self.__buffer.append(data)
+        self.__buffered += len(data)
+        self.rows += rows
+        if source_offset is not None:
+            self.__source_offset = source_offset
+        # every part but the last must be at least 5MB
+        if self.__buffered >= settings.S3_UPLOAD_PART_SIZE:
+            self.__flush()
+
+        return len(data)
+
+    def complete(self):
+        if self.__buffered or not self.__parts:
+            self.__flush()
+
+        self.__s3_client.complete_multipart_upload(
+            Bucket=self.__bucket,
+            Key=self.__key,
+            UploadId=self.__upload_id,
+            MultipartUpload={"Parts": [part.result() for part in self.__parts]},
+        )
+
+    def abort(self):
+        self.__s3_client.abort_multipart_upload(
+            Bucket=self.__bucket, Key=self.__key, UploadId=self.__upload_id
+        )
+
+    def checkpoint(self):
+        """
+        The upload with its leading uploaded parts, and the source offset and rows those parts cover.
+        """
+        parts = list()
+        for part in self.__parts:
+            if not part.done() or part.exception():
+                break
+            parts.append(part.result())
+
+        source_offset, rows = self.__part_ends[len(parts) - 1] if parts else (None, 0)
+        return {
+            "upload_id": self.__upload_id,
+            "parts": parts,
+            "source_offset": source_offset,
+            "rows": rows,
+        }
+
+
+class ParquetUploader(PartUploader):
+    """
+    Multipart upload of a Snappy compressed parquet object written in ordered arrow tables.
+    Tables are coalesced to row groups of about DEID_PARQUET_ROW_GROUP_SIZE bytes. The parts of the upload
+    don't end on record boundaries of the source, so its checkpoints have no source offset and can't be resumed.
+    """
+
+    def __init__(self, s3_client, bucket, key, upload_executor, schema):
+        super().__init__(s3_client, bucket, key, upload_executor)
+        self.__writer = pq.ParquetWriter(
+            parquet_output.UploadSink(super().write), schema, compression="snappy"
+        )
+        self.__tables = list()
+        self.__buffered = 0
+
+    def __flush(self):
+        if self.__tables:
+            self.__writer.write_table(pa.concat_tables(self.__tables))
+        self.__tables, self.__buffered = list(), 0
+
+    def write(self, data, rows=0, source_offset=None):
+        self.__tables.append(data)
+        self.__buffered += data.nbytes
+        self.rows += rows
+        if self.__buffered >= settings.DEID_PARQUET_ROW_GROUP_SIZE:
+            self.__flush()
+
+        return data.nbytes
+
+    def complete(self):
+        self.__flush()
+        self.__writer.close()
+        super().complete()
+
+
+def __organization_count(organization, key, default):
+    preference = OrganizationPreference.objects.filter(
+        organization=organization, key=key
+    ).first()
+    if not preference:
+        return default
+
+    try:
+        return max(1, int(preference.value))
+    except ValueError:
+        logger.warning(
+            f"Invalid {key} preference {preference.value} "
+            f"for organization {organization.name}"
+        )
+        return default
+
+
+def deid_workers(organization):
+    return __organization_count(
+        organization, OrganizationPreference.DEID_WORKERS, settings.DEID_WORKERS
+    )
+
+
+def deid_max_jobs(organization):
+    return __organization_count(
+        organization, OrganizationPreference.DEID_MAX_JOBS, settings.DEID_ORG_MAX_JOBS
+    )
+
+
+def __claim(handler):
+    """
+    Take the job of the method, unless another worker took it over since the handler was created.
+    """
+    if handler.dsrc_method.beat():
+        return True
+
+    logger.warning(
+        f"Method {handler.dsrc_method.method.id} over Data Source {handler.data_source.id} "
+        f"is already de-identified by another worker"
+    )
+    return False
+
+
+def __checkpoint(handler, uploader, source, locate=None):
+    checkpoint = dict(
+        handler.dsrc_method.checkpoint or dict(), **source, **uploader.checkpoint()
+    )
+    if locate and checkpoint["source_offset"] is not None:
+        # direct reads are resumed from the object and byte the uploaded parts reach
+        checkpoint["object_position"] = locate(checkpoint["source_offset"])
+
+    return checkpoint
+
+
+def __query_data_source(data_source, objects=None):
+    """
+    Query the data of the data source, only that of the given source objects when `objects` are given.
+    """
+    logger.info(
+        f"Fetching {'data of ' + str(len(objects)) + ' objects' if objects is not None else 'entire data'} "
+        f"from glue table {data_source.dataset.glue_database}.{data_source.glue_table}"
+    )
+    where = str()
+    if objects is not None:
+        paths = ", ".join(f"'s3://{data_source.bucket}/{key}'" for key in objects)
+        where = f' WHERE "$path" IN ({paths})'
+    query_response = data_source.dataset.query(
+        f'SELECT * FROM "{data_source.glue_table}"{where};'
+    )
+    return query_response["QueryExecutionId"]
+
+
+def __head_objects(s3_client, data_source, objects):
+    s3_objects = list()
+    for key in objects:
+        response = s3_client.head_object(Bucket=data_source.bucket, Key=key)
+        s3_objects.append(
+            {"key": key, "size": response["ContentLength"], "etag": response["ETag"]}
+        )
+
+    return s3_objects
+
+
+def __read_objects(s3_client, data_source, s3_objects, has_header, read_executor):
+    """
+    Stream the source objects of a data source directly, instead of a copy of its table extracted by Athena.
+    The header line of every object is skipped, the column name row is that of the glue table.
+    Objects with a `first_byte` are read from it.
+    """
+    logger.info(
+        f"Reading {len(s3_objects)} objects of Data Source {data_source.name}:{data_source.id} directly"
+    )
+    data_stream = open_s3_objects(
+        s3_client,
+        data_source.bucket,
+        s3_objects,
+        read_executor,
+        skip_first_line=has_header,
+    )
+    data_object = {
+        "ContentLength": sum(
+            s3_object["size"] - s3_object.get("first_byte", 0)
+            for s3_object in s3_objects
+        )
+    }
+
+    return data_object, data_stream
+
+
+def __wait_for_extract(handlers, query_execution_id):
+    """
+    Wait for the Athena extract of the data source, beating for the methods meanwhile,
+    as the wait may be longer than DEID_HEARTBEAT_TIMEOUT. Returns the methods this worker still runs.
+    """
+    org_name = handlers[0].data_source.dataset.organization.name
+    while handlers:
+        try:
+            athena_waiter.wait_for_query_execution(
+                org_name,
+                query_execution_id,
+                timeout=settings.DEID_HEARTBEAT_TIMEOUT / 3,
+            )
+            break
+        except TimeoutError:
+            handlers = [handler for handler in handlers if __claim(handler)]
+
+    return handlers
+
+
+def __deidentify_partitions(
+    data_stream,
+    columns,
+    uploaders,
+    metrics,
+    workers,
+    parallel,
+    source,
+    source_offset,
+    locate=None,
+):
+    """
+    Split the source to partitions of whole records of about DEID_PARTITION_SIZE bytes while streaming it,
+    and feed every partition to every method. Partitions of partitionable methods are de-identified on
+    `workers` processes when `parallel`, the rest in order in this thread. The results of every method are
+    written in order to its own uploader, and its checkpoint and metrics are saved. A failing method is dropped from
+    `uploaders` and marked as failed, a method taken over by another worker is just dropped.
+    `locate` maps source offsets to the position of direct reads in their objects.
+    """
+    delimiter = source.get("delimiter", ",")
+    deid_executor = (
+        # forked children of a threaded web worker may inherit locks held by its other threads, spawned ones
+        # seed their own random offsets and only need django set up to unpickle the models of the handlers
+        ProcessPoolExecutor(
+            workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=django.setup,
+        )
+        if parallel
+        else None
+    )
+
+    def consume(index, first_byte, data, futures):
+        for handler, future in futures.items():
+            if handler not in uploaders:
+                continue
+
+            try:
+                deid_data, rows, stats = (
+                    future.result()
+                    if future
+                    else handler.deidentify_data(data, columns, delimiter)
+                )
+                bytes_out = uploaders[handler].write(
+                    deid_data, rows, first_byte + len(data)
+                )
+                metrics[handler].add(len(data), bytes_out, rows, stats)
+                logger.info(
+                    f"De-identified partition {index + 1} ({len(data)} bytes from byte {first_byte}, "
+                    f"{rows} rows) of Data Source {handler.data_source.name}:{handler.data_source.id} "
+                    f"for method {handler.dsrc_method.method.id}"
+                )
+            except Exception as e:
+                uploaders.pop(handler).abort()
+                handler.fail(e)
+                continue
+
+            if not handler.dsrc_method.beat(
+                __checkpoint(handler, uploaders[handler], source, locate),
+                metrics[handler].as_dict(),
+            ):
+                logger.warning(
+                    f"Method {handler.dsrc_method.method.id} over Data Source {handler.data_source.id} "
+                    f"was taken over by another worker, leaving it"
+                )
+                uploaders.pop(handler)
+
+    try:
+        # only a couple of partitions per worker are held in memory at once
+        window = 2 * workers if deid_executor else 0
+        pending = deque()
+        first_byte = source_offset
+        partitions = csv_stream.record_blocks(data_stream, settings.DEID_PARTITION_SIZE)
+        for index, data in enumerate(partitions):
+            futures = {
+                handler: (
+                    deid_executor.submit(
+                        handler.deidentify_data, data, columns, delimiter
+                    )
+                    if deid_executor and handler.partitionable
+                    else None
+                )
+                for handler in uploaders
+            }
+            pending.append((index, first_byte, data, futures))
+            first_byte += len(data)
+            if len(pending) > window:
+                consume(*pending.popleft())
+
+            if not uploaders:
+                return
+
+        while pending:
+            consume(*pending.popleft())
+    finally:
+        if deid_executor:
+            deid_executor.shutdown(wait=True)
+
+
+def __deidentify(
+    handlers,
+    uploaders,
+    data_object,
+    data_stream,
+    source,
+    source_offset,
+    resume=False,
+    locate=None,
+):
+    """
+    De-identify the rest of the source stream, which starts `source_offset` bytes into the source object,
+    and finish the methods. Every method writes to its own uploader in `uploaders`, resumed methods continue
+    the upload of their checkpoint. Parquet outputs are never resumed.
+    """
+    data_source = handlers[0].data_source
+    columns = {name: idx for idx, name in enumerate(source["column_name_row"])}
+    workers = deid_workers(data_source.dataset.organization)
+    parallel = (
+        workers > 1 and data_object["ContentLength"] > settings.DEID_PARTITION_SIZE
+    )
+    s3_client = create_s3_client(org_name=data_source.dataset.organization.name)
+    bytes_total = data_object["ContentLength"] + (source_offset if resume else 0)
+    metrics = dict()
+    with ThreadPoolExecutor(max(workers, len(handlers))) as upload_executor:
+        for handler in handlers:
+            try:
+                if handler.output_format == Method.PARQUET:
+                    handler.start(source["column_name_row"])
+                    uploaders[handler] = ParquetUploader(
+                        s3_client,
+                        data_source.bucket,
+                        handler.deid_data_key,
+                        upload_executor,
+                        handler.parquet_schema,
+                    )
+                    metrics[handler] = JobMetrics(bytes_total, source_offset)
+                    continue
+
+                uploaders[handler] = PartUploader(
+                    s3_client,
+                    data_source.bucket,
+                    handler.deid_data_key,
+                    upload_executor,
+                    checkpoint=handler.dsrc_method.checkpoint if resume else None,
+                )
+                if not resume:
+                    uploaders[handler].write(
+                        handler.start(source["column_name_row"]),
+                        source_offset=source_offset,
+                    )
+                metrics[handler] = JobMetrics(
+                    bytes_total,
+                    source_offset,
+                    uploaders[handler].rows,
+                    handler.dsrc_method.metrics if resume else None,
+                )
+            except Exception as e:
+                if handler in uploaders:
+                    uploaders.pop(handler).abort()
+                handler.fail(e)
+
+        logger.info(
+            f"De Identification is {'resumed from byte ' + str(source_offset) if resume else 'in progress'} "
+            f"for {len(uploaders)} methods on data source {data_source.id}"
+            f"{f' in partitions by {workers} workers' if parallel else str()}"
+        )
+        __deidentify_partitions(
+            data_stream,
+            columns,
+            uploaders,
+            metrics,
+            workers,
+            parallel,
+            source,
+            source_offset,
+            locate,
+        )
+
+        for handler, uploader in list(uploaders.items()):
+            try:
+                uploader.complete()
+            except Exception as e:
+                uploaders.pop(handler).abort()
+                handler.fail(e)
+
+    for handler in uploaders:
+        job_metrics = metrics[handler].as_dict()
+        logger.info(
+            f"Uploaded Deidentified file to s3://{data_source.bucket}/{handler.deid_data_key}, "
+            f"{job_metrics['rows']} rows in {job_metrics['elapsed']}s "
+            f"({job_metrics['rows_per_second']} rows/s) with the {handler.engine} engine, "
+            f"columns: {job_metrics['columns']}"
+        )
+        handler.dsrc_method.metrics = job_metrics
+        try:
+            handler.finish(source.get("source_objects"))
+        except Exception as e:
+            handler.fail(e)
+
+
+def __fail(handlers, uploaders, e):
+    # methods which already failed on their own were removed from `uploaders`
+    for handler in list(uploaders) or handlers:
+        if handler in uploaders:
+            uploaders.pop(handler).abort()
+        handler.fail(e)
+
+
+def run_methods(handlers):
+    """
+    De-identify a data source for the method handlers of all its pending methods, reading it only once.
+    Every method is written to its own output and ends in its own glue table and state,
+    so a failing method doesn't affect the others. Incremental handlers, which must share their new objects,
+    only read those objects. Quoted (OpenCSVSerde) csv tables are read straight from their objects with the "s3"
+    DEID_SOURCE_READER, anything else from a `SELECT *` extract of Athena.
+    """
+    for handler in [handler for handler in handlers if not handler.has_actions]:
+        logger.warning(
+            f"Method {handler.dsrc_method.method.name}:{handler.dsrc_method.method.id} has no actions for"
+            f"Data Source {handler.data_source.name}:{handler.data_source.id}"
+        )
+        handler.dsrc_method.set_as_ready()
+    handlers = [
+        handler for handler in handlers if handler.has_actions and __claim(handler)
+    ]
+    if not handlers:
+        return
+
+    data_source = handlers[0].data_source
+    uploaders = dict()
+    try:
+        try:
+            source_objects = get_source_objects(
+                org_name=data_source.dataset.organization.name, data_source=data_source
+            )
+        except ClientError as e:
+            # the outputs won't be known to cover any object, and will be rebuilt by the next job
+            logger.warning(
+                f"Could not get the source objects of Data Source {data_source.name}:{data_source.id} - {e}"
+            )
+            source_objects = None
+        csv_format = (
+            glue_schema.get_csv_format(
+                org_name=data_source.dataset.organization.name,
+                glue_database=data_source.dataset.glue_database,
+                glue_table=data_source.glue_table,
+            )
+            if settings.DEID_SOURCE_READER == S3_READER
+            else None
+        )
+        if csv_format:
+            objects = handlers[0].new_objects or source_objects
+            if objects is None:
+                objects = [s3_object["key"] for s3_object in data_source.s3_objects]
+
+            s3_client = create_s3_client(org_name=data_source.dataset.organization.name)
+            s3_objects = __head_objects(s3_client, data_source, objects)
+            with ThreadPoolExecutor(settings.DEID_SOURCE_READ_WORKERS) as read_executor:
+                data_object, data_stream = __read_objects(
+                    s3_client,
+                    data_source,
+                    s3_objects,
+                    csv_format["has_header"],
+                    read_executor,
+                )
+                __deidentify(
+                    handlers,
+                    uploaders,
+                    data_object,
+                    data_stream,
+                    {
+                        "read_objects": s3_objects,
+                        "has_header": csv_format["has_header"],
+                        "column_name_row": csv_format["columns"],
+                        "delimiter": csv_format["delimiter"],
+                        "source_objects": source_objects,
+                    },
+                    0,
+                    locate=data_stream.raw.locate,
+                )
+            return
+
+        query_execution_id = __query_data_source(data_source, handlers[0].new_objects)
+        handlers = __wait_for_extract(handlers, query_execution_id)
+        if not handlers:
+            return
+
+        data_object = data_source.dataset.get_query_execution(query_execution_id)
+        data_stream = csv_stream.open_body(data_object["Body"])
+
+        logger.info(
+            f"Reading column name row for Data Source {data_source.name}:{data_source.id}"
+        )
+        column_name_row = data_stream.readline()
+        __deidentify(
+            handlers,
+            uploaders,
+            data_object,
+            data_stream,
+            {
+                "query_execution_id": query_execution_id,
+                "column_name_row": csv_stream.parse_row(column_name_row),
+                "source_objects": source_objects,
+            },
+            len(column_name_row),
+        )
+    except Exception as e:
+        __fail(handlers, uploaders, e)
+
+
+def __restart(handler, s3_client, checkpoint):
+    if checkpoint.get("upload_id"):
+        try:
+            s3_client.abort_multipart_upload(
+                Bucket=handler.data_source.bucket,
+                Key=handler.deid_data_key,
+                UploadId=checkpoint["upload_id"],
+            )
+        except ClientError as e:
+            logger.warning(
+                f"Could not abort abandoned upload {checkpoint['upload_id']} of "
+                f"s3://{handler.data_source.bucket}/{handler.deid_data_key} - {e}"
+            )
+
+    if handler.dsrc_method.beat(
+        {
+            "data_source_index": checkpoint.get("data_source_index"),
+            "new_objects": checkpoint.get("new_objects"),
+        }
+    ):
+        run_methods([handler])
+
+
+def __remaining_objects(s3_client, data_source, checkpoint):
+    """
+    The source objects a direct read resumes from, the first of them from the byte its checkpoint reached.
+    None if any of them changed since.
+    """
+    position = checkpoint["object_position"]
+    if position is None:
+        return list()
+
+    objects = checkpoint["read_objects"]
+    index = [s3_object["key"] for s3_object in objects].index(position["key"])
+    remaining = [dict(objects[index], first_byte=position["first_byte"])]
+    remaining += objects[index + 1 :]
+    for s3_object, head in zip(
+        remaining,
+        __head_objects(
+            s3_client, data_source, [s3_object["key"] for s3_object in remaining]
+        ),
+    ):
+        if head["etag"] != s3_object["etag"]:
+            logger.warning(
+                f"Source object {s3_object['key']} of Data Source {data_source.id} changed since the checkpoint"
+            )
+            return None
+
+    return remaining
+
+
+def resume_method(handler):
+    """
+    Resume the abandoned job of a method from its checkpoint: the source, its Athena extract or its objects
+    when they were read directly, is read from the offset covered by the uploaded parts, and the upload
+    continues after them.
+    Jobs without uploaded parts or a source offset (parquet outputs), or whose source or upload are gone
+    or changed, abort their upload and start over.
+    """
+    if not __claim(handler):
+        return
+
+    data_source = handler.data_source
+    checkpoint = handler.dsrc_method.checkpoint or dict()
+    s3_client = create_s3_client(org_name=data_source.dataset.organization.name)
+    direct_read = "object_position" in checkpoint
+    if (
+        not checkpoint.get("parts")
+        or checkpoint.get("source_offset") is None
+        or not (direct_read or checkpoint.get("query_execution_id"))
+    ):
+        logger.info(
+            f"Method {handler.dsrc_method.method.id} over Data Source {data_source.id} has no resumable "
+            f"parts, starting over"
+        )
+        return __restart(handler, s3_client, checkpoint)
+
+    source_key = Dataset.query_execution_key(checkpoint.get("query_execution_id", ""))
+    try:
+        s3_client.list_parts(
+            Bucket=data_source.bucket,
+            Key=handler.deid_data_key,
+            UploadId=checkpoint["upload_id"],
+            MaxParts=1,
+        )
+        if direct_read:
+            remaining_objects = __remaining_objects(s3_client, data_source, checkpoint)
+        else:
+            source_size = s3_client.head_object(
+                Bucket=data_source.bucket, Key=source_key
+            )["ContentLength"]
+    except ClientError as e:
+        logger.warning(
+            f"Could not resume Method {handler.dsrc_method.method.id} over Data Source {data_source.id}, "
+            f"starting over - {e}"
+        )
+        return __restart(handler, s3_client, checkpoint)
+
+    if direct_read and remaining_objects is None:
+        return __restart(handler, s3_client, checkpoint)
+
+    source = {
+        key: checkpoint[key]
+        for key in [
+            "query_execution_id",
+            "read_objects",
+            "has_header",
+            "column_name_row",
+            "delimiter",
+            "source_objects",
+        ]
+        if key in checkpoint
+    }
+    uploaders = dict()
+    try:
+        with ThreadPoolExecutor(settings.DEID_SOURCE_READ_WORKERS) as read_executor:
+            locate = None
+            if direct_read:
+                data_object, data_stream = __read_objects(
+                    s3_client,
+                    data_source,
+                    remaining_objects,
+                    checkpoint["has_header"],
+                    read_executor,
+                )
+
+                def locate(offset):
+                    # the stream of the remaining objects starts at the offset of the checkpoint
+                    return data_stream.raw.locate(offset - checkpoint["source_offset"])
+
+            else:
+                data_object = (
+                    s3_client.get_object(
+                        Bucket=data_source.bucket,
+                        Key=source_key,
+                        Range=f"bytes={checkpoint['source_offset']}-",
+                    )
+                    if checkpoint["source_offset"] < source_size
+                    else {"Body": io.BytesIO(), "ContentLength": 0}
+                )
+                data_stream = csv_stream.open_body(data_object["Body"])
+
+            __deidentify(
+                [handler],
+                uploaders,
+                data_object,
+                data_stream,
+                source,
+                checkpoint["source_offset"],
+                resume=True,
+                locate=locate,
+            )
+    except Exception as e:
+        __fail([handler], uploaders, e)
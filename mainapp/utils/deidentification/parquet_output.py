@@ -0,0 +1,78 @@
+import pyarrow as pa
+
+from mainapp.utils.deidentification.common.enums import GlueDataTypes
+
+ARROW_TYPES = {
+    GlueDataTypes.BIGINT.value: pa.int64(),
+    GlueDataTypes.DOUBLE.value: pa.float64(),
+    GlueDataTypes.BOOLEAN.value: pa.bool_(),
+    GlueDataTypes.STRING.value: pa.string(),
+}
+CONVERTERS = {
+    GlueDataTypes.BIGINT.value: int,
+    GlueDataTypes.DOUBLE.value: float,
+    GlueDataTypes.BOOLEAN.value: lambda value: {"true": True, "false": False}[
+        value.lower()
+    ],
+    GlueDataTypes.STRING.value: str,
+}
+
+
+def schema(columns):
+    return pa.schema(
+        [(column["Name"], ARROW_TYPES[column["Type"]]) for column in columns]
+    )
+
+
+def __convert(value, column_type):
+    if value is None or (value == "" and column_type != GlueDataTypes.STRING.value):
+        return None
+
+    try:
+        return CONVERTERS[column_type](value)
+    except (AttributeError, KeyError, ValueError):
+        return None
+
+
+def table(rows, columns):
+    """
+    An arrow table of de-identified csv rows, with the columns returned by `glue_schema.derive_parquet_columns`.
+    Values which don't convert to the type of their column are left empty.
+    """
+    values_by_column = list(zip(*rows)) if rows else [tuple() for _ in columns]
+    return pa.Table.from_arrays(
+        [
+            pa.array(
+                [__convert(value, column["Type"]) for value in values],
+                type=ARROW_TYPES[column["Type"]],
+            )
+            for values, column in zip(values_by_column, columns)
+        ],
+        schema=schema(columns),
+    )
+
+
+class UploadSink(object):
+    """
+    Write only file object over a `write` function, for writers which track their position in the file.
+    """
+
+    def __init__(self, write):
+        self.__write = write
+        self.__position = 0
+        self.closed = False
+
+    def write(self, data):
+        data = bytes(data)
+        self.__write(data)
+        self.__position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.__position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
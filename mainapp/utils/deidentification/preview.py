@@ -0,0 +1,94 @@
+import io
+import logging
+import threading
+
+from botocore.exceptions import ClientError
+from cachetools import TTLCache
+
+from mainapp import settings
+from mainapp.models import DataSourceMethod, Method
+from mainapp.utils import csv_stream
+from mainapp.utils.aws_service import create_s3_client
+from mainapp.utils.deidentification import LYNX_DATA_TYPES
+from mainapp.utils.deidentification.common.exceptions import DeidentificationError
+from mainapp.utils.deidentification.method_handler import MethodHandler
+from mainapp.utils.lib import preview_sample_key, sample_data_source
+
+logger = logging.getLogger(__name__)
+
+__samples = TTLCache(
+    maxsize=settings.DEID_PREVIEW_CACHE_MAX_SIZE, ttl=settings.DEID_PREVIEW_CACHE_TTL
+)
+__samples_lock = threading.Lock()
+
+
+def __read_sample(data_source):
+    org_name = data_source.dataset.organization.name
+    s3_client = create_s3_client(org_name=org_name)
+    try:
+        s3_object = s3_client.get_object(
+            Bucket=data_source.bucket, Key=preview_sample_key(data_source)
+        )
+    except ClientError as e:
+        # data sources ingested before samples were kept are sampled from the beginning of their csv
+        logger.warning(
+            f"No preview sample for Data Source {data_source.name}:{data_source.id}, "
+            f"sampling its first {settings.GLUE_SCHEMA_SAMPLE_SIZE} bytes - {e}"
+        )
+        return sample_data_source(
+            org_name=org_name,
+            data_source=data_source,
+            sample_size=settings.GLUE_SCHEMA_SAMPLE_SIZE,
+        )
+
+    rows = list(csv_stream.read_rows(io.BytesIO(s3_object["Body"].read())))
+    return (rows[0], rows[1:]) if rows else (list(), list())
+
+
+def load_sample(data_source):
+    """
+    The column name row and the sampled rows of a data source, read from S3 once per DEID_PREVIEW_CACHE_TTL.
+    """
+    with __samples_lock:
+        sample = __samples.get(data_source.id)
+
+    if sample is None:
+        sample = __read_sample(data_source)
+        with __samples_lock:
+            __samples[data_source.id] = sample
+
+    return sample
+
+
+def preview_method(data_source, attributes, group_age_over=False):
+    """
+    De-identify the sample of a data source with the attributes of a draft method, in memory.
+    Nothing is saved or written, so salted masks differ from those of the method once it's added.
+    """
+    for col, col_attributes in attributes.items():
+        if col not in (data_source.columns or dict()):
+            raise DeidentificationError(f"Unknown column {col}")
+
+        LYNX_DATA_TYPES[data_source.columns[col]["lynx_type"]].validate_action(
+            col_attributes["action"], col_attributes["arguments"].keys()
+        )
+
+    dsrc_method = DataSourceMethod(
+        method=Method(dataset=data_source.dataset, group_age_over=group_age_over),
+        data_source=data_source,
+        attributes=attributes,
+    )
+    handler = MethodHandler(data_source, dsrc_method, data_source_index=0)
+    column_name_row, rows = load_sample(data_source)
+    columns = {name: idx for idx, name in enumerate(column_name_row)}
+
+    return {
+        "columns": column_name_row,
+        "rows": rows,
+        "deid_columns": handler.deidentify_column_names(column_name_row),
+        "deid_rows": [
+            list(deid_row)
+            for deid_rows in handler.deidentify_blocks(rows, columns)
+            for deid_row in deid_rows
+        ],
+    }
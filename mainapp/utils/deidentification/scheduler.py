@@ -0,0 +1,154 @@
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures.thread import ThreadPoolExecutor
+
+from mainapp import settings
+
+logger = logging.getLogger(__name__)
+
+
+class DeidScheduler(object):
+    """
+    Runs de-identification jobs on its own pool of `max_workers` threads.
+    Every organization has a FIFO queue of jobs and runs up to its own number of jobs at once,
+    organizations with queued jobs take turns on the free threads.
+    Jobs are tagged, e.g. with the ids of their methods, and a queued job is dropped once all its tags are cancelled.
+    """
+
+    def __init__(self, max_workers):
+        self.__max_workers = max_workers
+        self.__executor = ThreadPoolExecutor(max_workers, thread_name_prefix="deid")
+        self.__lock = threading.Lock()
+        self.__queues = dict()
+        self.__turns = deque()
+        self.__running = dict()
+        self.__running_jobs = list()
+        self.__max_jobs = dict()
+        self.__counts = dict.fromkeys(
+            ["submitted", "started", "completed", "failed", "cancelled"], 0
+        )
+        self.__total_wait = 0.0
+        self.__max_wait = 0.0
+
+    def submit(self, org_name, max_jobs, tags, fn, *args):
+        """
+        Queue `fn(*args)` for the organization, which runs up to `max_jobs` jobs at once.
+        """
+        job = {"fn": fn, "args": args, "tags": set(tags), "queued_at": time.time()}
+        with self.__lock:
+            self.__max_jobs[org_name] = max(1, max_jobs)
+            queue = self.__queues.setdefault(org_name, deque())
+            if not queue:
+                self.__turns.append(org_name)
+            queue.append(job)
+            self.__counts["submitted"] += 1
+            self.__dispatch()
+
+    def cancel(self, tag):
+        """
+        Remove the tag from the queued jobs, dropping those left without tags. Running jobs aren't interrupted.
+        Returns the number of dropped jobs.
+        """
+        cancelled = 0
+        with self.__lock:
+            for org_name, queue in self.__queues.items():
+                for job in list(queue):
+                    job["tags"].discard(tag)
+                    if not job["tags"]:
+                        queue.remove(job)
+                        cancelled += 1
+
+                if not queue and org_name in self.__turns:
+                    self.__turns.remove(org_name)
+
+            self.__counts["cancelled"] += cancelled
+
+        if cancelled:
+            logger.info(f"Cancelled {cancelled} queued de-identification jobs of {tag}")
+        return cancelled
+
+    def has_tag(self, tag):
+        """
+        Whether a queued or running job has the tag.
+        """
+        with self.__lock:
+            return any(
+                tag in job["tags"]
+                for jobs in [self.__running_jobs, *self.__queues.values()]
+                for job in jobs
+            )
+
+    def __next_org(self):
+        for _ in range(len(self.__turns)):
+            org_name = self.__turns[0]
+            self.__turns.rotate(-1)
+            if self.__running.get(org_name, 0) < self.__max_jobs[org_name]:
+                return org_name
+
+        return None
+
+    def __dispatch(self):
+        # called with the lock held
+        while sum(self.__running.values()) < self.__max_workers:
+            org_name = self.__next_org()
+            if org_name is None:
+                return
+
+            queue = self.__queues[org_name]
+            job = queue.popleft()
+            if not queue:
+                self.__turns.remove(org_name)
+
+            wait = time.time() - job["queued_at"]
+            self.__total_wait += wait
+            self.__max_wait = max(self.__max_wait, wait)
+            self.__counts["started"] += 1
+            self.__running[org_name] = self.__running.get(org_name, 0) + 1
+            self.__running_jobs.append(job)
+            self.__executor.submit(self.__run, org_name, job)
+
+    def __run(self, org_name, job):
+        try:
+            job["fn"](*job["args"])
+            outcome = "completed"
+        except Exception as e:
+            logger.exception(
+                f"De-identification job of organization {org_name} failed - {e}"
+            )
+            outcome = "failed"
+
+        with self.__lock:
+            self.__counts[outcome] += 1
+            self.__running[org_name] -= 1
+            self.__running_jobs.remove(job)
+            self.__dispatch()
+
+    def stats(self):
+        now = time.time()
+        with self.__lock:
+            return {
+                "workers": self.__max_workers,
+                "running": sum(self.__running.values()),
+                "queued": sum(len(queue) for queue in self.__queues.values()),
+                **self.__counts,
+                "average_wait": self.__total_wait / self.__counts["started"]
+                if self.__counts["started"]
+                else 0.0,
+                "max_wait": self.__max_wait,
+                "organizations": {
+                    org_name: {
+                        "max_jobs": self.__max_jobs[org_name],
+                        "running": self.__running.get(org_name, 0),
+                        "queued": len(self.__queues.get(org_name, list())),
+                        "oldest_wait": now - self.__queues[org_name][0]["queued_at"]
+                        if self.__queues.get(org_name)
+                        else 0.0,
+                    }
+                    for org_name in self.__max_jobs
+                },
+            }
+
+
+deid_scheduler = DeidScheduler(settings.DEID_SCHEDULER_WORKERS)
@@ -0,0 +1,283 @@
+import csv
+import io
+import logging
+import re
+
+from mainapp.exceptions import SchemaInferenceError
+from mainapp.utils.decorators import with_glue_client, with_s3_client
+from mainapp.utils.deidentification import Actions, GlueDataTypes
+
+logger = logging.getLogger(__name__)
+
+BIGINT_PATTERN = re.compile(r"^[+-]?\d+$")
+DOUBLE_PATTERN = re.compile(r"^[+-]?(\d+\.\d*|\.\d+|\d+)([eE][+-]?\d+)?$")
+BOOLEAN_VALUES = ["true", "false"]
+DELIMITERS = ",;\t|"
+OPEN_CSV_SERDE = "org.apache.hadoop.hive.serde2.OpenCSVSerde"
+# glue types of parquet outputs, other types are stored as one of them or as strings
+PARQUET_TYPES = {
+    GlueDataTypes.BIGINT.value: GlueDataTypes.BIGINT.value,
+    GlueDataTypes.INT.value: GlueDataTypes.BIGINT.value,
+    GlueDataTypes.SMALLINT.value: GlueDataTypes.BIGINT.value,
+    GlueDataTypes.TINYINT.value: GlueDataTypes.BIGINT.value,
+    GlueDataTypes.DOUBLE.value: GlueDataTypes.DOUBLE.value,
+    GlueDataTypes.FLOAT.value: GlueDataTypes.DOUBLE.value,
+    GlueDataTypes.BOOLEAN.value: GlueDataTypes.BOOLEAN.value,
+}
+
+
+def value_type(value):
+    """
+    The glue type a crawler would give a single csv value
+    """
+    if value.lower() in BOOLEAN_VALUES:
+        return GlueDataTypes.BOOLEAN.value
+    if BIGINT_PATTERN.match(value):
+        return GlueDataTypes.BIGINT.value
+    if DOUBLE_PATTERN.match(value):
+        return GlueDataTypes.DOUBLE.value
+
+    return GlueDataTypes.STRING.value
+
+
+def merge_types(types):
+    types = set(types)
+    if not types:
+        return GlueDataTypes.STRING.value
+    if len(types) == 1:
+        return types.pop()
+    if types == {GlueDataTypes.BIGINT.value, GlueDataTypes.DOUBLE.value}:
+        return GlueDataTypes.DOUBLE.value
+
+    return GlueDataTypes.STRING.value
+
+
+def column_names(header):
+    names = list()
+    for index, name in enumerate(header):
+        name = name.strip().lower() or f"col{index}"
+        if name in names:
+            name = f"{name}_{index}"
+        names.append(name)
+
+    return names
+
+
+def infer_csv_schema(sample, truncated=False, s3_object=None):
+    """
+    Infer the glue columns of a csv file from the sample at its beginning, the way a glue crawler would:
+    numbers become bigint or double, true/false become boolean and everything else is a string.
+    When the sample doesn't hold the whole file, the line it cuts is ignored.
+    """
+    if truncated:
+        sample = sample[: sample.rfind(b"\n") + 1]
+
+    text = sample.decode("utf-8-sig", errors="replace")
+    if not text.strip():
+        raise SchemaInferenceError(s3_object, "file is empty")
+
+    header_line = text.splitlines()[0]
+    try:
+        delimiter = csv.Sniffer().sniff(header_line, delimiters=DELIMITERS).delimiter
+    except csv.Error:
+        delimiter = ","
+
+    try:
+        rows = [
+            row for row in csv.reader(io.StringIO(text), delimiter=delimiter) if row
+        ]
+    except csv.Error as e:
+        raise SchemaInferenceError(s3_object, e)
+
+    header, data_rows = rows[0], rows[1:]
+    has_header = len(set(header)) == len(header) and all(
+        value_type(value) == GlueDataTypes.STRING.value for value in header if value
+    )
+    if not has_header:
+        data_rows = rows
+        header = [str() for _ in header]
+
+    if any(len(row) != len(header) for row in data_rows):
+        raise SchemaInferenceError(
+            s3_object, "rows have inconsistent number of columns"
+        )
+
+    quoted = '"' in text
+    columns = list()
+    for index, name in enumerate(column_names(header)):
+        values = [row[index] for row in data_rows]
+        column_type = merge_types(value_type(value) for value in values if value)
+        # OpenCSVSerDe can't read empty values of non string columns
+        if quoted and not all(values):
+            column_type = GlueDataTypes.STRING.value
+        columns.append({"Name": name, "Type": column_type})
+
+    return {
+        "columns": columns,
+        "delimiter": delimiter,
+        "quoted": quoted,
+        "has_header": has_header,
+    }
+
+
+def derive_deid_columns(source_columns, attributes):
+    """
+    The columns of a deid output, derived from the columns of its source table and the method's attributes:
+    omitted columns are dropped, columns with any other action are strings and the rest keep their type.
+    """
+    columns = list()
+    for column in source_columns:
+        column_attributes = attributes.get(column["Name"])
+        if not column_attributes:
+            columns.append({"Name": column["Name"], "Type": column["Type"]})
+        elif column_attributes["action"] != Actions.OMIT.value:
+            columns.append({"Name": column["Name"], "Type": GlueDataTypes.STRING.value})
+
+    return columns
+
+
+def derive_parquet_columns(columns):
+    """
+    The columns of a parquet output of csv data with the given columns
+    """
+    return [
+        {
+            "Name": column["Name"],
+            "Type": PARQUET_TYPES.get(column["Type"], GlueDataTypes.STRING.value),
+        }
+        for column in columns
+    ]
+
+
+def build_csv_table_input(
+    table_name, location, columns, delimiter=",", quoted=False, has_header=True
+):
+    parameters = {
+        "classification": "csv",
+        "columnsOrdered": "true",
+        "compressionType": "none",
+        "delimiter": delimiter,
+        "typeOfData": "file",
+    }
+    if has_header:
+        parameters["skip.header.line.count"] = "1"
+
+    if quoted:
+        serde_info = {
+            "SerializationLibrary": OPEN_CSV_SERDE,
+            "Parameters": {"separatorChar": delimiter, "quoteChar": '"'},
+        }
+    else:
+        serde_info = {
+            "SerializationLibrary": "org.apache.hadoop.hive.serde2.lazy.LazySimpleSerDe",
+            "Parameters": {"field.delim": delimiter},
+        }
+
+    return {
+        "Name": table_name,
+        "TableType": "EXTERNAL_TABLE",
+        "Parameters": parameters,
+        "StorageDescriptor": {
+            "Columns": columns,
+            "Location": location,
+            "InputFormat": "org.apache.hadoop.mapred.TextInputFormat",
+            "OutputFormat": "org.apache.hadoop.hive.ql.io.HiveIgnoreKeyTextOutputFormat",
+            "Compressed": False,
+            "NumberOfBuckets": -1,
+            "SerdeInfo": serde_info,
+            "Parameters": parameters,
+            "StoredAsSubDirectories": False,
+        },
+    }
+
+
+def build_parquet_table_input(table_name, location, columns):
+    parameters = {
+        "classification": "parquet",
+        "compressionType": "snappy",
+        "typeOfData": "file",
+    }
+
+    return {
+        "Name": table_name,
+        "TableType": "EXTERNAL_TABLE",
+        "Parameters": parameters,
+        "StorageDescriptor": {
+            "Columns": columns,
+            "Location": location,
+            "InputFormat": "org.apache.hadoop.hive.ql.io.parquet.MapredParquetInputFormat",
+            "OutputFormat": "org.apache.hadoop.hive.ql.io.parquet.MapredParquetOutputFormat",
+            "Compressed": True,
+            "NumberOfBuckets": -1,
+            "SerdeInfo": {
+                "SerializationLibrary": "org.apache.hadoop.hive.ql.io.parquet.serde.ParquetHiveSerDe",
+                "Parameters": {"serialization.format": "1"},
+            },
+            "Parameters": parameters,
+            "StoredAsSubDirectories": False,
+        },
+    }
+
+
+@with_s3_client
+def read_object_sample(boto3_client, org_name, bucket, key, sample_size):
+    """
+    Read the first `sample_size` bytes of an object.
+    Returns the sample and whether the object is larger than the sample.
+    """
+    response = boto3_client.get_object(
+        Bucket=bucket, Key=key, Range=f"bytes=0-{sample_size - 1}"
+    )
+    sample = response["Body"].read()
+    content_range = response.get("ContentRange")
+    truncated = bool(content_range) and int(content_range.split("/")[-1]) > len(sample)
+
+    return sample, truncated
+
+
+@with_glue_client
+def get_csv_format(boto3_client, org_name, glue_database, glue_table):
+    """
+    The column names, delimiter and header of an uncompressed, quoted (OpenCSVSerde) csv glue table,
+    None for any other table.
+    LazySimpleSerDe tables split their rows on every delimiter and keep quotes in the values,
+    so they can't be read with csv quoting rules.
+    """
+    table = boto3_client.get_table(DatabaseName=glue_database, Name=glue_table)["Table"]
+    storage_descriptor = table["StorageDescriptor"]
+    parameters = dict(
+        storage_descriptor.get("Parameters", dict()), **table.get("Parameters", dict())
+    )
+    serde_info = storage_descriptor.get("SerdeInfo", dict())
+    serde_parameters = serde_info.get("Parameters", dict())
+    header_lines = int(parameters.get("skip.header.line.count", "0"))
+    if (
+        parameters.get("classification") != "csv"
+        or serde_info.get("SerializationLibrary") != OPEN_CSV_SERDE
+        or serde_parameters.get("quoteChar", '"') != '"'
+        or parameters.get("compressionType", "none") != "none"
+        or header_lines > 1
+    ):
+        return None
+
+    return {
+        "columns": [column["Name"] for column in storage_descriptor["Columns"]],
+        "delimiter": serde_parameters.get("separatorChar")
+        or serde_parameters.get("field.delim")
+        or parameters.get("delimiter")
+        or ",",
+        "has_header": bool(header_lines),
+    }
+
+
+@with_glue_client
+def create_table(boto3_client, org_name, glue_database, table_input):
+    try:
+        boto3_client.create_table(DatabaseName=glue_database, TableInput=table_input)
+    except boto3_client.exceptions.AlreadyExistsException:
+        boto3_client.update_table(DatabaseName=glue_database, TableInput=table_input)
+
+    logger.info(
+        f"Created glue table {glue_database}.{table_input['Name']} "
+        f"with {len(table_input['StorageDescriptor']['Columns'])} columns"
+    )
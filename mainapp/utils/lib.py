@@ -1,20 +1,20 @@
 import csv
+import itertools
 import json
 import logging
 import os
 import shutil
-import subprocess
 import tempfile
 import threading
-import zipfile
 from datetime import datetime as dt, timedelta as td
 from enum import Enum
 from time import sleep
 
-import botocore
-import botocore.exceptions
 import magic
+import pyreadstat
+import smart_open
 import sqlparse
+from botocore.exceptions import ClientError
 from rest_framework.authentication import TokenAuthentication
 from rest_framework.exceptions import AuthenticationFailed
 
@@ -32,10 +32,20 @@ from mainapp.exceptions import (
     GlueTableFetchError,
     GlueTableMigrationError,
     GlueError,
+    SchemaInferenceError,
 )
 from mainapp.exceptions.s3 import TooManyBucketsException
-from mainapp.utils import aws_service, statistics, devexpress_filtering, executor
-from mainapp.utils.aws_utils import s3_storage
+from mainapp.utils import (
+    aws_service,
+    athena_waiter,
+    csv_stream,
+    query_cache,
+    statistics,
+    devexpress_filtering,
+    executor,
+    glue_schema,
+)
+from mainapp.utils.aws_utils import s3_storage, s3_move, s3_zip
 from mainapp.utils.decorators import (
     organization_dependent,
     with_glue_client,
@@ -61,6 +71,7 @@ class PrivilegePath(Enum):
 
 
 LYNX_STORAGE_DIR = "lynx-storage"
+PREVIEW_SAMPLE_DIR = "preview_sample"
 UNSUPPORTED_CHARS = [".", ",", ":", "[", "]"]
 MAX_RETRIES = 500
 
@@ -74,36 +85,122 @@ def break_s3_object(obj):
     return path, file_name, file_name_no_ext, ext
 
 
-def validate_file_type(s3_client, bucket, workdir, object_key, local_path, file_types):
+def is_valid_file_type(s3_client, bucket, object_key, file_types):
+    """
+    check the content type of an object against the types allowed for its extension,
+    reading only its first FILE_TYPE_SAMPLE_SIZE bytes.
+    """
+    extension = os.path.splitext(object_key)[1]
     try:
-        os.makedirs(workdir)
-        s3_client.download_file(bucket, object_key, local_path)
-        extension = os.path.splitext(local_path)[1]
-        mime_by_content = magic.from_file(local_path, mime=True)
-        assert all([mime_by_content, extension]) and mime_by_content in file_types.get(
-            extension
-        )
-    except AssertionError:
-        s3_client.delete_object(Bucket=bucket, Key=object_key)
+        header = s3_client.get_object(
+            Bucket=bucket,
+            Key=object_key,
+            Range=f"bytes=0-{settings.FILE_TYPE_SAMPLE_SIZE - 1}",
+        )["Body"].read()
+    except ClientError as e:
+        # a ranged GET of an empty object fails with InvalidRange, empty files have no valid type
+        if e.response["Error"]["Code"] == "InvalidRange":
+            return False
         raise
-    finally:
-        shutil.rmtree(workdir)
 
+    mime_by_content = magic.from_buffer(header, mime=True)
 
-@with_s3_resource
+    return bool(
+        all([mime_by_content, extension])
+        and mime_by_content in file_types.get(extension, list())
+    )
+
+
+def validate_file_type(s3_client, bucket, object_key, file_types):
+    if not is_valid_file_type(s3_client, bucket, object_key, file_types):
+        s3_client.delete_object(Bucket=bucket, Key=object_key)
+        raise AssertionError(f"Invalid file type for {object_key}")
+
+
+def __is_readable_valid_file_type(s3_client, bucket, object_key, file_types):
+    try:
+        return is_valid_file_type(s3_client, bucket, object_key, file_types)
+    except Exception as e:
+        logger.warning(f"Couldn't check the file type of {object_key} - {e}")
+        return False
+
+
+def validate_file_types(s3_client, bucket, object_keys, file_types):
+    """
+    validate many objects concurrently, deleting the invalid ones.
+    objects which can't be read are counted as invalid.
+    """
+    results = executor.map(
+        lambda object_key: __is_readable_valid_file_type(
+            s3_client, bucket, object_key, file_types
+        ),
+        object_keys,
+    )
+    invalid_keys = [
+        object_key for object_key, valid in zip(object_keys, results) if not valid
+    ]
+    if invalid_keys:
+        s3_move.delete_objects(s3_client, bucket, invalid_keys)
+        raise AssertionError(f"Invalid file type for {', '.join(invalid_keys)}")
+
+
+def read_header_line(s3_client, bucket, key):
+    """
+    read the first line of an object (with its line break) in small ranged GETs.
+    """
+    header = bytes()
+    while True:
+        response = s3_client.get_object(
+            Bucket=bucket,
+            Key=key,
+            Range=f"bytes={len(header)}-{len(header) + settings.CSV_HEADER_READ_SIZE - 1}",
+        )
+        header += response["Body"].read()
+        line_break = header.find(b"\n")
+        if line_break != -1:
+            return header[: line_break + 1]
+
+        if len(header) >= int(response["ContentRange"].split("/")[-1]):
+            return header
+
+
+@with_s3_client
 def check_csv_for_empty_columns(boto3_client, org_name, data_source):
     s3_obj = data_source.s3_objects[0]["key"]
-    s3_file = boto3_client.Object(data_source.dataset.bucket, s3_obj)
+    bucket_name = data_source.dataset.bucket
 
-    column_line = list(s3_file.get(Range="bytes=1e+6")["Body"].iter_lines())[0].decode(
-        "utf-8"
-    )
+    header = read_header_line(boto3_client, bucket_name, s3_obj)
+    column_line = header.decode("utf-8").rstrip("\r\n")
 
-    download_and_upload_fixed_file(
-        org_name=org_name,
-        column_line=column_line,
-        data_source=data_source,
-        s3_obj=s3_obj,
+    if settings.CSV_HEADER_REPAIR_MODE == "download":
+        download_and_upload_fixed_file(
+            org_name=org_name,
+            column_line=column_line,
+            data_source=data_source,
+            s3_obj=s3_obj,
+        )
+        return
+
+    delimiter = csv.Sniffer().sniff(column_line).delimiter
+    if needs_column_line_fix(column_line, delimiter):
+        logger.info(
+            f"Fixing column names of {s3_obj} for data source {data_source.name}:{data_source.id}"
+        )
+        s3_move.replace_object_head(
+            boto3_client,
+            bucket_name,
+            s3_obj,
+            head=fix_column_line(header.decode("utf-8"), delimiter).encode("utf-8"),
+            replaced_length=len(header),
+        )
+
+
+def needs_column_line_fix(column_line, delimiter):
+    return (
+        column_line[0] == delimiter
+        or column_line[-1] == delimiter
+        or f"{delimiter}{delimiter}" in column_line
+        or check_for_unsupported(column_line)
     )
 
 
@@ -115,14 +212,7 @@ def download_and_upload_fixed_file(
     bucket_name = data_source.dataset.bucket
     path, file_name, _, _ = break_s3_object(s3_obj)
 
-    is_unsupported_char_present = check_for_unsupported(column_line)
-
-    if (
-        column_line[0] == delimiter
-        or column_line[-1] == delimiter
-        or f"{delimiter}{delimiter}" in column_line
-        or is_unsupported_char_present
-    ):
+    if needs_column_line_fix(column_line, delimiter):
         temp_dir = tempfile.TemporaryDirectory(str(data_source.id))
         file_path = os.path.join(temp_dir.name, file_name)
         temp_file_path = f"{file_path}.temp"
@@ -163,20 +253,25 @@ def check_for_unsupported(column_line):
     return False
 
 
+def fix_column_line(column_line, delimiter):
+    split_line = column_line.split(delimiter)
+    for index, item in enumerate(split_line):
+        if not item:
+            split_line[index] = f"Col{index}"
+
+        unsupported_char = [char for char in UNSUPPORTED_CHARS if char in item]
+        if unsupported_char:
+            split_line[index] = item.replace(unsupported_char[0], " ")
+
+    return delimiter.join(split_line)
+
+
 def replace_col_name_on_downloaded_file(read_file_path, write_file_path, delimiter):
     with open(read_file_path, "r") as read_file, open(
         write_file_path, "w"
     ) as write_file:
-        split_line = read_file.readline().split(delimiter)
-        for index, item in enumerate(split_line):
-            if not item:
-                split_line[index] = f"Col{index}"
-
-            unsupported_char = [char for char in UNSUPPORTED_CHARS if char in item]
-            if unsupported_char:
-                split_line[index] = item.replace(unsupported_char[0], " ")
-        write_file.write(",".join(split_line))
-        write_file.write(read_file.read())
+        write_file.write(fix_column_line(read_file.readline(), delimiter))
+        shutil.copyfileobj(read_file, write_file)
 
 
 @organization_dependent
@@ -419,11 +514,22 @@ def process_datasource_glue_and_bucket_data(org_name, data_source):
             )
             return ErrorResponse(str(ge))
 
+        for glue_table in [data_source.glue_table, new_table_name]:
+            query_cache.athena_result_cache.invalidate(
+                data_source.dataset.glue_database, glue_table
+            )
         data_source.glue_table = new_table_name
         data_source.save()
 
         data_source.generate_columns()
 
+        try:
+            create_preview_sample(org_name=org_name, data_source=data_source)
+        except Exception as e:
+            logger.warning(
+                f"Unable to create the preview sample of data source {data_source.name}:{data_source.id} - {e}"
+            )
+
         data_source.set_as_ready()
         logger.info(
             f"Done processing data_source {data_source.name} ({data_source.id}) "
@@ -440,21 +546,21 @@ def process_datasource_glue_and_bucket_data(org_name, data_source):
 def create_full_data_glue_table(org_name, data_source):
     path, _, _, _ = break_s3_object(data_source.s3_objects[0]["key"])
 
-    crawler_ready = create_glue_table(
+    table_ready = create_glue_table(
         org_name=org_name, data_source=data_source, path=path
     )
 
-    if not crawler_ready:
+    if not table_ready:
         logger.warning(
-            f"The crawler for data_source {data_source.name}:{data_source.id} in org {org_name} "
-            f"had a failure after {MAX_RETRIES} tries"
+            f"The glue table for data_source {data_source.name}:{data_source.id} in org {org_name} "
+            f"could not be created"
         )
         data_source.set_as_error()
 
     else:
         logger.debug(
-            f"The crawler for datasource {data_source.name} ({data_source.id}) in org {org_name} "
-            f"was finished successfully. "
+            f"The glue table for datasource {data_source.name} ({data_source.id}) in org {org_name} "
+            f"was created successfully. "
             f"Updating data_source state accordingly."
         )
 
@@ -477,28 +583,59 @@ def delete_if_table_exists(boto3_client, data_source, org_name, table_to_check):
     )
 
 
-def create_deid_glue_table(data_source, deid, dsrc_index):
+def create_deid_glue_table(
+    data_source, deid, dsrc_index, dsrc_method=None, incremental=False
+):
+    """
+    Create the glue table of a deid output.
+    The schema is derived from the source table and the method's attributes when `dsrc_method` is given,
+    otherwise (or in crawler mode) the output is crawled.
+    Incremental outputs are added to the files of the previous output, which they would replace otherwise.
+    """
     orig_path = f"{data_source.dir}/{LYNX_STORAGE_DIR}/{PrivilegePath.DEID.value}_{deid}_{dsrc_index}"
     post_path = orig_path.rstrip(f"_{dsrc_index}")
+    deid_table_name = str(deid).replace("-", "_")
 
-    crawler_ready = create_glue_table(
-        org_name=data_source.dataset.organization.name,
-        data_source=data_source,
-        path=orig_path,
-    )
-
-    if not crawler_ready:
-        raise GlueError(
-            f"Glue crawler for data source {data_source.id} did not finish properly"
+    table_input = None
+    if settings.GLUE_TABLE_CREATION_MODE == "inference" and dsrc_method:
+        columns = glue_schema.derive_deid_columns(
+            data_source.dataset.get_columns_types(data_source.glue_table),
+            dsrc_method.attributes,
+        )
+        if dsrc_method.method.output_format == models.Method.PARQUET:
+            table_input = glue_schema.build_parquet_table_input(
+                table_name=f"{data_source.dir}_deid_{deid_table_name}",
+                location=f"s3://{data_source.dataset.bucket}/{post_path}/",
+                columns=glue_schema.derive_parquet_columns(columns),
+            )
+        else:
+            # csv outputs quote the values which need it, so the table must read them with OpenCSVSerde
+            table_input = glue_schema.build_csv_table_input(
+                table_name=f"{data_source.dir}_deid_{deid_table_name}",
+                location=f"s3://{data_source.dataset.bucket}/{post_path}/",
+                columns=columns,
+                quoted=True,
+            )
+    else:
+        crawler_ready = crawl_glue_table(
+            org_name=data_source.dataset.organization.name,
+            data_source=data_source,
+            path=orig_path,
         )
 
-    deid_table_name = str(deid).replace("-", "_")
+        if not crawler_ready:
+            raise GlueError(
+                f"Glue crawler for data source {data_source.id} did not finish properly"
+            )
 
     delete_if_table_exists(
         data_source=data_source,
         org_name=data_source.dataset.organization.name,
         table_to_check=f"{data_source.dir}_deid_{deid_table_name}",
     )
+    query_cache.athena_result_cache.invalidate(
+        data_source.dataset.glue_database, f"{data_source.dir}_deid_{deid_table_name}"
+    )
 
     logger.info(
         f"Moving Data Source {data_source.id}:{data_source.name} from {orig_path} to {post_path}"
@@ -508,34 +645,98 @@ def create_deid_glue_table(data_source, deid, dsrc_index):
         bucket=data_source.dataset.bucket,
         pre_path=orig_path,
         post_path=post_path,
+        replace=not incremental,
     )
 
-    update_glue_table(
-        data_source=data_source,
-        org_name=data_source.dataset.organization.name,
-        source_table=f"{PrivilegePath.DEID.value}_{deid_table_name}_{dsrc_index}",
-        target_table=f"{data_source.dir}_deid_{deid_table_name}",
-        path=f"{data_source.dataset.bucket}/{post_path}",
+    if table_input:
+        glue_schema.create_table(
+            org_name=data_source.dataset.organization.name,
+            glue_database=data_source.dataset.glue_database,
+            table_input=table_input,
+        )
+    else:
+        update_glue_table(
+            data_source=data_source,
+            org_name=data_source.dataset.organization.name,
+            source_table=f"{PrivilegePath.DEID.value}_{deid_table_name}_{dsrc_index}",
+            target_table=f"{data_source.dir}_deid_{deid_table_name}",
+            path=f"{data_source.dataset.bucket}/{post_path}",
+        )
+
+
+@with_s3_client
+def update_deid_hierarchy(
+    boto3_client, org_name, bucket, pre_path, post_path, replace=False
+):
+    logger.info(f"Moving files from {pre_path} to {post_path} in {bucket}")
+    result = s3_move.move_prefix(
+        boto3_client, bucket, source_prefix=pre_path, destination_prefix=post_path
     )
+    if result["failed"]:
+        raise GlueError(
+            f"Failed moving {len(result['failed'])} files from {pre_path} to {post_path} in {bucket}"
+        )
+
+    if replace:
+        # files of previous outputs which the moved files didn't overwrite
+        moved = set(result["moved"].values())
+        stale_keys = [
+            s3_obj["Key"]
+            for page in boto3_client.get_paginator("list_objects_v2").paginate(
+                Bucket=bucket, Prefix=f"{post_path.rstrip('/')}/"
+            )
+            for s3_obj in page.get("Contents", list())
+            if s3_obj["Key"] not in moved and not s3_obj["Key"].endswith("/")
+        ]
+        s3_move.delete_objects(boto3_client, bucket, stale_keys)
 
 
-@with_s3_resource
-def update_deid_hierarchy(boto3_client, org_name, bucket, pre_path, post_path):
-    for s3_obj in boto3_client.Bucket(bucket).objects.filter(Prefix=pre_path):
-        src_path = s3_obj.key
-        if not src_path.endswith("/"):
-            file_name = src_path.split("/")[-1]
-            dest_file_path = post_path + "/" + file_name
-            copy_path = bucket + "/" + src_path
-            logger.info(f"Moving {file_name} from {pre_path} to {post_path}")
-            boto3_client.Object(bucket, dest_file_path).copy_from(CopySource=copy_path)
-            boto3_client.Object(bucket, src_path).delete()
-    logger.info(f"Deleting temporary directory {pre_path} from {bucket}")
-    boto3_client.Object(bucket, f"{pre_path}/").delete()
+def create_glue_table(org_name, data_source, path):
+    """
+    create the glue table of a new data-source uploaded by front-end.
+    csv files get a table from a schema inferred on a sample of the file, anything else
+    (or everything, when GLUE_TABLE_CREATION_MODE is "crawler") is crawled by glue.
+    """
+    if settings.GLUE_TABLE_CREATION_MODE == "inference":
+        try:
+            infer_glue_table(org_name=org_name, data_source=data_source, path=path)
+            return True
+        except Exception as e:
+            logger.warning(
+                f"Unable to infer glue table for datasource {data_source.name}:{data_source.id} "
+                f"in org {org_name}, falling back to a crawler - {e}"
+            )
+
+    return crawl_glue_table(org_name=org_name, data_source=data_source, path=path)
+
+
+def infer_glue_table(org_name, data_source, path):
+    s3_obj = data_source.s3_objects[0]["key"]
+    _, _, _, ext = break_s3_object(s3_obj)
+    if ext.lower() != "csv":
+        raise SchemaInferenceError(s3_obj, f"unsupported file type {ext}")
+
+    sample, truncated = glue_schema.read_object_sample(
+        org_name=org_name,
+        bucket=data_source.dataset.bucket,
+        key=s3_obj,
+        sample_size=settings.GLUE_SCHEMA_SAMPLE_SIZE,
+    )
+    schema = glue_schema.infer_csv_schema(sample, truncated, s3_object=s3_obj)
+
+    glue_schema.create_table(
+        org_name=org_name,
+        glue_database=data_source.dataset.glue_database,
+        table_input=glue_schema.build_csv_table_input(
+            table_name=data_source.glue_table,
+            location=f"s3://{data_source.dataset.bucket}/{path}/",
+            **schema,
+        ),
+    )
 
 
 @with_glue_client
-def create_glue_table(boto3_client, org_name, data_source, path):
+def crawl_glue_table(boto3_client, org_name, data_source, path):
     """
     wait for new data-source uploaded by front-end to be crawled by glue and then process it.
     """
@@ -591,11 +792,117 @@ def process_structured_data_source_in_background(org_name, data_source):
     create_glue_table_thread.start()
 
 
+def convert_sav_to_csv(org_name, data_source):
+    """
+    convert the uploaded spss (sav/zsav) file of a data source to a csv next to it.
+    The file is read SAV_CONVERSION_CHUNK_ROWS rows at a time and every chunk is appended to a streaming
+    multipart upload, so memory is bounded by the chunk size whatever the size of the file.
+    """
+    s3_obj = data_source.s3_objects[0]["key"]
+    bucket_name = data_source.dataset.bucket
+    path, file_name, file_name_no_ext, _ = break_s3_object(s3_obj)
+    csv_key = f"{path}/{file_name_no_ext}.csv"
+    chunk_rows = settings.SAV_CONVERSION_CHUNK_ROWS
+
+    with tempfile.TemporaryDirectory(str(data_source.id)) as workdir:
+        sav_path = os.path.join(workdir, file_name)
+        s3_storage.download_file(
+            s3_client=aws_service.create_s3_client(org_name=org_name),
+            bucket_name=bucket_name,
+            s3_object=s3_obj,
+            file_path=sav_path,
+        )
+
+        _, metadata = pyreadstat.read_sav(sav_path, metadataonly=True)
+        # files which don't record their number of rows are read until a short chunk
+        total_rows = metadata.number_rows
+        csv_size = 0
+        row_offset = 0
+        with smart_open.open(
+            f"s3://{bucket_name}/{csv_key}",
+            "wb",
+            transport_params={"session": aws_service.create_session(org_name=org_name)},
+        ) as csv_file:
+            while True:
+                df, _ = pyreadstat.read_sav(
+                    sav_path, row_offset=row_offset, row_limit=chunk_rows
+                )
+                # keep the running row number as the index column, like a single to_csv of the whole file
+                df.index = range(row_offset, row_offset + len(df))
+                data = df.to_csv(header=not row_offset).encode("utf-8")
+                csv_file.write(data)
+                csv_size += len(data)
+                row_offset += len(df)
+                logger.debug(
+                    f"Converted {row_offset} rows of {s3_obj} for data source {data_source.id}"
+                )
+                if len(df) < chunk_rows or (
+                    total_rows is not None and row_offset >= total_rows
+                ):
+                    break
+
+    logger.info(
+        f"Converted {s3_obj} ({row_offset} rows) to {csv_key} for data source {data_source.name}:{data_source.id}"
+    )
+    data_source.s3_objects = [{"key": csv_key, "size": csv_size}]
+    data_source.save()
+
+
+# This function should be running inside a thread!
+def process_sav_data_source(org_name, data_source, check_columns):
+    try:
+        convert_sav_to_csv(org_name=org_name, data_source=data_source)
+        if check_columns:
+            check_csv_for_empty_columns(org_name=org_name, data_source=data_source)
+    except Exception as e:
+        logger.exception(
+            f"Failed converting the data source {data_source.name} ({data_source.id}) to csv with error {e}"
+        )
+        data_source.set_as_error()
+        return
+
+    create_full_data_glue_table(org_name=org_name, data_source=data_source)
+
+
+def process_sav_data_source_in_background(org_name, data_source, check_columns):
+    """
+    called when an spss data-source was uploaded.
+    it will run a thread to convert the file to csv and then process it like any structured data-source.
+    """
+    convert_thread = threading.Thread(
+        target=process_sav_data_source,
+        kwargs={
+            "org_name": org_name,
+            "data_source": data_source,
+            "check_columns": check_columns,
+        },
+    )  # also setting the data_source state to ready or error when it's done
+    convert_thread.start()
+
+
 # This function should be running inside a thread!
 # It will call process_cohort_users which swallow errors
 def create_glue_tables_for_cohort(
-    org_name, data_source, columns, data_filter, orig_data_source
+    org_name, data_source, query_execution_id, columns, data_filter, orig_data_source
 ):
+    try:
+        # wait for the CTAS query to finish before looking for its output
+        athena_waiter.wait_for_query_execution(org_name, query_execution_id)
+        data_source.s3_objects = [
+            determine_data_source_s3_object_from_execution_id(
+                query_execution_id=query_execution_id,
+                org_name=org_name,
+                dataset=data_source.dataset,
+            )
+        ]
+        data_source.save()
+    except Exception as e:
+        logger.exception(
+            f"Failed creating the cohort data source {data_source.name} ({data_source.id}) with error {e}"
+        )
+        data_source.set_as_error()
+        return
+
     process_datasource_glue_and_bucket_data(org_name=org_name, data_source=data_source)
     process_cohort_users(
         data_source=data_source,
@@ -607,7 +914,7 @@ def create_glue_tables_for_cohort(
 
 
 def process_structured_cohort_in_background(
-    org_name, data_source, columns, data_filter, orig_data_source
+    org_name, data_source, query_execution_id, columns, data_filter, orig_data_source
 ):
     """
     process data_source glue tables
@@ -622,6 +929,7 @@ def process_structured_cohort_in_background(
         kwargs={
             "org_name": org_name,
             "data_source": data_source,
+            "query_execution_id": query_execution_id,
             "columns": columns,
             "data_filter": data_filter,
             "orig_data_source": orig_data_source,
@@ -710,10 +1018,9 @@ def update_glue_table(
         )
 
 
-@with_s3_resource
+@with_s3_client
 def update_folder_hierarchy(boto3_client, data_source, org_name):
     s3_bucket = data_source.bucket
-    s3_client = boto3_client.meta.client
 
     # create folders
     data_source_dir = data_source.dir
@@ -722,32 +1029,117 @@ def update_folder_hierarchy(boto3_client, data_source, org_name):
     agg_stat_dir = f"{base_dir}/{PrivilegePath.AGG_STATS.value}/"
 
     # create folders
-    s3_client.put_object(Bucket=s3_bucket, Key=full_access_dir, ACL="private")
-    s3_client.put_object(Bucket=s3_bucket, Key=agg_stat_dir, ACL="private")
+    boto3_client.put_object(Bucket=s3_bucket, Key=full_access_dir, ACL="private")
+    boto3_client.put_object(Bucket=s3_bucket, Key=agg_stat_dir, ACL="private")
+
+    copies = [
+        (
+            s3_object["key"],
+            f"{full_access_dir}{s3_object['key'].split('/')[-1]}",
+            None,
+        )
+        for s3_object in data_source.s3_objects
+    ]
+    result = s3_move.copy_objects(boto3_client, s3_bucket, copies)
 
-    s3_objects_all = data_source.s3_objects
+    for s3_object in data_source.s3_objects:
+        s3_object["key"] = result["copied"].get(s3_object["key"], s3_object["key"])
+    data_source.save()
+    # the sources are only deleted once the data source points at their copies
+    s3_move.delete_objects(boto3_client, s3_bucket, list(result["copied"]))
 
-    for index, s3_object in enumerate(s3_objects_all):
-        s3_object_key = s3_object["key"]
-        file_name = s3_object_key.split("/")[-1]
-        new_key = f"{data_source_dir}/{LYNX_STORAGE_DIR}/{PrivilegePath.FULL.value}/{file_name}"
-        try:
-            copy_source = f"{s3_bucket}/{s3_object_key}"
-            boto3_client.Object(s3_bucket, new_key).copy_from(CopySource=copy_source)
-        except botocore.exceptions.ClientError as e:
-            return ErrorResponse(f"Unable to Move file with key {s3_object_key}!", e)
-        data_source.s3_objects[index]["key"] = new_key
-        data_source.save()
-        try:
-            boto3_client.Object(s3_bucket, s3_object_key).delete()
-        except botocore.exceptions.ClientError as e:
-            logger.warning(f"Unable to delete file with key {s3_object_key}!")
+    if result["failed"]:
+        s3_object_key, e = next(iter(result["failed"].items()))
+        return ErrorResponse(f"Unable to Move file with key {s3_object_key}!", e)
 
     logger.info(
         f"Updated folder hierarchy for datasource {data_source.name}:{data_source.id} in org {org_name}"
     )
 
 
+@with_s3_client
+def get_source_objects(boto3_client, org_name, data_source):
+    """
+    The ETags of the source objects of a structured data source, by key.
+    """
+    return {
+        s3_object["key"]: boto3_client.head_object(
+            Bucket=data_source.bucket, Key=s3_object["key"]
+        )["ETag"]
+        for s3_object in data_source.s3_objects
+    }
+
+
+def preview_sample_key(data_source):
+    return (
+        f"{data_source.dir}/{LYNX_STORAGE_DIR}/{PREVIEW_SAMPLE_DIR}/{data_source.name}"
+    )
+
+
+@with_s3_client
+def sample_data_source(boto3_client, org_name, data_source, sample_size=None):
+    """
+    Uniform sample of DEID_PREVIEW_SAMPLE_ROWS rows of the csv of a structured data source, of only its first
+    `sample_size` bytes when given. Returns the glue column names of the data source and the sampled rows.
+    """
+    column_name_row = [
+        col["Name"]
+        for col in data_source.dataset.get_columns_types(data_source.glue_table)
+    ]
+    s3_object = boto3_client.get_object(
+        Bucket=data_source.bucket,
+        Key=data_source.s3_objects[0]["key"],
+        **({"Range": f"bytes=0-{sample_size - 1}"} if sample_size else dict()),
+    )
+    stream = csv_stream.open_body(s3_object["Body"])
+    first_line = stream.peek(settings.CSV_HEADER_READ_SIZE).split(b"\n", 1)[0]
+    try:
+        delimiter = (
+            csv.Sniffer()
+            .sniff(first_line.decode("utf-8-sig"), delimiters=glue_schema.DELIMITERS)
+            .delimiter
+        )
+    except (csv.Error, UnicodeDecodeError):
+        delimiter = ","
+
+    rows = csv_stream.read_rows(stream, delimiter=delimiter, encoding="utf-8-sig")
+    first_row = next(rows, list())
+    if glue_schema.column_names(first_row) != column_name_row:
+        rows = itertools.chain([first_row], rows)
+    content_range = s3_object.get("ContentRange")
+    if content_range and int(content_range.split("/")[-1]) > sample_size:
+        # the last row of a partial read may be cut
+        rows = list(rows)[:-1]
+
+    return (
+        column_name_row,
+        csv_stream.sample_rows(
+            (row for row in rows if len(row) == len(column_name_row)),
+            settings.DEID_PREVIEW_SAMPLE_ROWS,
+        ),
+    )
+
+
+@with_s3_client
+def create_preview_sample(boto3_client, org_name, data_source):
+    """
+    Keep a uniform sample of a new data source in its storage, for the previews of methods over it
+    (see `mainapp.utils.deidentification.preview`). The whole file is read once.
+    """
+    column_name_row, rows = sample_data_source(
+        org_name=org_name, data_source=data_source
+    )
+    boto3_client.put_object(
+        Bucket=data_source.bucket,
+        Key=preview_sample_key(data_source),
+        Body=csv_stream.write_rows([column_name_row] + rows),
+        ACL="private",
+    )
+    logger.info(
+        f"Created a preview sample of {len(rows)} rows for data source {data_source.name}:{data_source.id}"
+    )
+
+
 @with_athena_client
 def create_limited_glue_table(boto3_client, data_source, org_name, limited, query=None):
     logger.info(
@@ -786,11 +1178,6 @@ def create_limited_glue_table(boto3_client, data_source, org_name, limited, quer
             },
         )
 
-        logger.info(
-            f"limited file created for datasource {data_source.id} limited {limited} at {destination_dir} in bucket {bucket}"
-        )
-
-        return query_results
     except boto3_client.exceptions.InvalidRequestException as e:
         error = Exception(
             f"Failed executing the CTAS query: {ctas_query}. "
@@ -799,6 +1186,16 @@ def create_limited_glue_table(boto3_client, data_source, org_name, limited, quer
         logger.debug(f"This is the ctas_query {ctas_query}")
         raise error from e
 
+    athena_waiter.wait_for_query_execution(org_name, query_results["QueryExecutionId"])
+    query_cache.athena_result_cache.invalidate(
+        destination_glue_database, f"{data_source.dir}_limited_{limited}"
+    )
+    logger.info(
+        f"limited file created for datasource {data_source.id} limited {limited} at {destination_dir} in bucket {bucket}"
+    )
+
+    return query_results
+
 
 @with_s3_client
 def create_agg_stats(boto3_client, data_source, org_name):
@@ -842,29 +1239,40 @@ def create_agg_stats(boto3_client, data_source, org_name):
     logger.info(f"Created AggStats for datasource {data_source} in org {org_name}")
 
 
+def build_statistics_query(data_source, query_from_front=None):
+    dataset = data_source.dataset
+    glue_table = data_source.glue_table
+
+    columns_types = get_columns_types(
+        org_name=dataset.organization.name,
+        glue_database=dataset.glue_database,
+        glue_table=glue_table,
+    )
+    default_athena_col_names = statistics.create_default_column_names(columns_types)
+    filter_query = (
+        None
+        if not query_from_front
+        else devexpress_filtering.generate_where_sql_query(query_from_front)
+    )
+    query = statistics.sql_builder_by_columns_types(
+        glue_table, columns_types, default_athena_col_names, filter_query
+    )
+
+    return query, columns_types, default_athena_col_names
+
+
 def calculate_statistics(data_source, query_from_front=None):
     dataset = data_source.dataset
     org_name = dataset.organization.name
     glue_database = dataset.glue_database
-    glue_table = data_source.glue_table
     bucket_name = data_source.bucket
 
     try:
-        columns_types = get_columns_types(
-            org_name=org_name, glue_database=glue_database, glue_table=glue_table
+        query, columns_types, default_athena_col_names = build_statistics_query(
+            data_source, query_from_front=query_from_front
         )
-        default_athena_col_names = statistics.create_default_column_names(columns_types)
     except UnableToGetGlueColumns as e:
         return ErrorResponse(f"Glue error", error=e)
-    try:
-        filter_query = (
-            None
-            if not query_from_front
-            else devexpress_filtering.generate_where_sql_query(query_from_front)
-        )
-        query = statistics.sql_builder_by_columns_types(
-            glue_table, columns_types, default_athena_col_names, filter_query
-        )
     except UnsupportedColumnTypeError as e:
         return UnimplementedErrorResponse("There was some error in execution", error=e)
     except Exception as e:
@@ -872,7 +1280,11 @@ def calculate_statistics(data_source, query_from_front=None):
 
     try:
         response = statistics.count_all_values_query(
-            query, glue_database, bucket_name, org_name
+            query,
+            glue_database,
+            bucket_name,
+            org_name,
+            glue_table=data_source.glue_table,
         )
         data_per_column = statistics.sql_response_processing(
             response, default_athena_col_names
@@ -924,30 +1336,34 @@ def create_glue_crawler(org_settings, data_source, org_name, obj_path):
 
 @with_s3_client
 def handle_zipped_data_source(boto3_client, data_source, org_name):
+    """
+    extract the zip archive of the data source next to it, streaming from and to s3.
+    """
     s3_obj = data_source.s3_objects[0]["key"]
     path, file_name, file_name_no_ext, ext = break_s3_object(s3_obj)
 
-    workdir = "/tmp/" + str(data_source.id) + "/" + file_name_no_ext
-    os.makedirs(workdir + "/extracted")
-    boto3_client.download_file(
-        data_source.dataset.bucket, s3_obj, workdir + "/" + file_name
-    )
-    zip_ref = zipfile.ZipFile(workdir + "/" + file_name, "r")
     try:
-        zip_ref.extractall(workdir + "/extracted")
-    except:
-        data_source.state = "error: failed to extract zip file"
-    zip_ref.close()
-    subprocess.check_output(
-        [
-            "aws",
-            "s3",
-            "sync",
-            f"{workdir}/extracted",
-            f"s3://{data_source.dataset.bucket}/{path}/{file_name_no_ext}",
-        ]
-    )
-    shutil.rmtree(f"/tmp/{str(data_source.id)}")
+        result = s3_zip.extract_zip(
+            boto3_client,
+            data_source.dataset.bucket,
+            s3_obj,
+            destination_prefix=f"{path}/{file_name_no_ext}",
+        )
+    except Exception as e:
+        logger.exception(
+            f"Failed to extract zip file {s3_obj} of data source {data_source.name}:{data_source.id} - {e}"
+        )
+        data_source.set_as_error()
+        return
+
+    if result["failed"]:
+        logger.error(
+            f"Failed to extract {len(result['failed'])} members of zip file {s3_obj} "
+            f"of data source {data_source.name}:{data_source.id}"
+        )
+        data_source.set_as_error()
+        return
+
     data_source.set_as_ready()
 
 
@@ -1010,13 +1426,12 @@ def csv_to_json(csv, columns_types):
 
     dic = {}
 
-    rows = csv.split("\n")
-    columns_name = rows[0].split(",")
+    rows = csv_stream.parse_rows(csv)
+    columns_name = rows[0]
     for i, column_name in enumerate(columns_name):
         dic[column_name] = []
 
-        for row in rows[1:]:
-            cols = row.split(",")
+        for cols in rows[1:]:
             dic[column_name].append(convert(cols[i], columns_types[i]["Type"]))
 
     return dic
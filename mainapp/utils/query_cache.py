@@ -0,0 +1,165 @@
+import hashlib
+import logging
+import threading
+
+import sqlparse
+from cachetools import TTLCache
+from sqlparse import tokens as T
+
+from mainapp import settings
+from mainapp.utils import athena_waiter
+from mainapp.utils.decorators import with_glue_client
+
+logger = logging.getLogger(__name__)
+
+
+class AthenaResultCache(object):
+    """
+    Content addressed cache of Athena executions for read queries.
+
+    Entries are keyed by the normalized SQL, the glue database and table and the table version (the glue
+    table `UpdateTime`), so any rewrite of a table through glue makes its previous entries unreachable.
+    Executions are cached as soon as they start, so identical queries submitted while the first one is still
+    running share its execution. Failed executions are dropped from the cache once the waiter reports them.
+    """
+
+    def __init__(self, max_size=1024, ttl=3600):
+        self.__cache = TTLCache(maxsize=max_size, ttl=ttl)
+        self.__lock = threading.Lock()
+        self.__hits = 0
+        self.__misses = 0
+
+    @staticmethod
+    def normalize(query):
+        query = sqlparse.format(query, keyword_case="upper", strip_comments=True)
+        # whitespace is only collapsed between tokens, string literals are kept as they are
+        normalized = list()
+        for statement in sqlparse.parse(query):
+            for token in statement.flatten():
+                if token.ttype not in T.Whitespace:
+                    normalized.append(token.value)
+                elif normalized and normalized[-1] != " ":
+                    normalized.append(" ")
+
+        return "".join(normalized).strip().rstrip(";").strip()
+
+    def key(self, glue_database, glue_table, table_version, query):
+        return hashlib.sha256(
+            "|".join(
+                [glue_database, glue_table, str(table_version), self.normalize(query)]
+            ).encode("utf-8")
+        ).hexdigest()
+
+    def get(self, key):
+        with self.__lock:
+            entry = self.__cache.get(key)
+            if entry:
+                self.__hits += 1
+            else:
+                self.__misses += 1
+
+            return entry
+
+    def put(self, key, glue_database, glue_table, query_execution_id, output_location):
+        with self.__lock:
+            self.__cache[key] = {
+                "glue_database": glue_database,
+                "glue_table": glue_table,
+                "query_execution_id": query_execution_id,
+                "output_location": output_location,
+            }
+
+    def discard(self, key, query_execution_id):
+        with self.__lock:
+            entry = self.__cache.get(key)
+            if entry and entry["query_execution_id"] == query_execution_id:
+                del self.__cache[key]
+
+    def invalidate(self, glue_database, glue_table=None):
+        with self.__lock:
+            stale_keys = [
+                key
+                for key, entry in self.__cache.items()
+                if entry["glue_database"] == glue_database
+                and (glue_table is None or entry["glue_table"] == glue_table)
+            ]
+            for key in stale_keys:
+                del self.__cache[key]
+
+        logger.debug(
+            f"Invalidated {len(stale_keys)} cached executions of {glue_database}.{glue_table}"
+        )
+
+    def stats(self):
+        with self.__lock:
+            return {
+                "size": self.__cache.currsize,
+                "max_size": self.__cache.maxsize,
+                "hits": self.__hits,
+                "misses": self.__misses,
+            }
+
+
+athena_result_cache = AthenaResultCache(
+    max_size=settings.ATHENA_RESULT_CACHE_MAX_SIZE, ttl=settings.ATHENA_RESULT_CACHE_TTL
+)
+
+
+@with_glue_client
+def get_glue_table_version(boto3_client, org_name, glue_database, glue_table):
+    try:
+        table = boto3_client.get_table(DatabaseName=glue_database, Name=glue_table)
+    except boto3_client.exceptions.EntityNotFoundException:
+        return None
+
+    return table["Table"].get("UpdateTime") or table["Table"].get("CreateTime")
+
+
+def start_query_execution(
+    client, org_name, query, glue_database, output_location, glue_table=None
+):
+    """
+    Start an Athena execution for the query, or return the cached one for the same query over the same
+    version of `glue_table`. Queries which are not bound to a single glue table are never cached.
+    """
+    table_version = (
+        get_glue_table_version(
+            org_name=org_name, glue_database=glue_database, glue_table=glue_table
+        )
+        if glue_table
+        else None
+    )
+    if not table_version:
+        return client.start_query_execution(
+            QueryString=query,
+            QueryExecutionContext={"Database": glue_database},
+            ResultConfiguration={"OutputLocation": output_location},
+        )
+
+    key = athena_result_cache.key(glue_database, glue_table, table_version, query)
+    entry = athena_result_cache.get(key)
+    if entry:
+        logger.debug(
+            f"Using cached execution {entry['query_execution_id']} for query on {glue_database}.{glue_table}"
+        )
+        return {"QueryExecutionId": entry["query_execution_id"]}
+
+    response = client.start_query_execution(
+        QueryString=query,
+        QueryExecutionContext={"Database": glue_database},
+        ResultConfiguration={"OutputLocation": output_location},
+    )
+    query_execution_id = response["QueryExecutionId"]
+    athena_result_cache.put(
+        key, glue_database, glue_table, query_execution_id, output_location
+    )
+
+    def discard_failed(future):
+        if future.exception():
+            athena_result_cache.discard(key, query_execution_id)
+
+    athena_waiter.athena_waiter.wait(
+        org_name, query_execution_id, callback=discard_failed
+    )
+
+    return response
@@ -1,50 +1,32 @@
 import re
-from time import sleep
 
-from mainapp.exceptions import (
-    InvalidExecutionId,
-    QueryExecutionError,
-    MaxExecutionReactedError,
-    UnsupportedColumnTypeError,
-)
-from mainapp.utils import aws_service
+from mainapp.exceptions import QueryExecutionError, UnsupportedColumnTypeError
+from mainapp.utils import aws_service, athena_waiter, query_cache
 
 
-def count_all_values_query(query, glue_database, bucket_name, org_name):
+def count_all_values_query(
+    query, glue_database, bucket_name, org_name, glue_table=None
+):
     client = aws_service.create_athena_client(org_name=org_name)
-    response = client.start_query_execution(
-        QueryString=query,
-        QueryExecutionContext={"Database": glue_database},
-        ResultConfiguration={
-            "OutputLocation": "s3://" + bucket_name + "/temp_execution_results"
-        },
+    response = query_cache.start_query_execution(
+        client,
+        org_name=org_name,
+        query=query,
+        glue_database=glue_database,
+        output_location="s3://" + bucket_name + "/temp_execution_results",
+        glue_table=glue_table,
     )
-    return get_result_query(client, response)
-
-
-def get_result_query(client, query_execution_result):
-    max_execution = 60
-    state = "RUNNING"
-
-    while max_execution > 0 and (state in ["RUNNING", "QUEUED"]):
-        max_execution -= 1
-        query_execution_id = query_execution_result.get("QueryExecutionId")
+    return get_result_query(client, response, org_name)
 
-        if not query_execution_id:
-            raise InvalidExecutionId
 
-        response = client.get_query_execution(QueryExecutionId=query_execution_id)
-        state = response["QueryExecution"]["Status"]["State"]
-        if state == "FAILED":
-            raise QueryExecutionError
-        elif state == "SUCCEEDED":
-            try:
-                return client.get_query_results(QueryExecutionId=query_execution_id)
-            except Exception as e:
-                raise QueryExecutionError from e
-        sleep(1)
+def get_result_query(client, query_execution_result, org_name):
+    query_execution_id = query_execution_result.get("QueryExecutionId")
+    athena_waiter.wait_for_query_execution(org_name, query_execution_id)
 
-    raise MaxExecutionReactedError
+    try:
+        return client.get_query_results(QueryExecutionId=query_execution_id)
+    except Exception as e:
+        raise QueryExecutionError from e
 
 
 def max_count(response):
@@ -1,9 +1,11 @@
 from .activity_view_set import ActivityViewSet
+from .aws_client_pool_stats import AWSClientPoolStats
 from .aws_health_check import AWSHealthCheck
 from .create_cohort import CreateCohort
 from .current_user_view import CurrentUserView
 from .data_source_view_set import DataSourceViewSet
 from .dataset_view_set import DatasetViewSet
+from .deid_scheduler_stats import DeidSchedulerStats
 from .documentation_view_set import DocumentationViewSet
 from .dummy import Dummy
 from .get_dataset_sts import GetDatasetSTS
@@ -15,6 +17,7 @@ from .handle_dataset_access_request import HandleDatasetAccessRequest
 from .my_requests_view_set import MyRequestsViewSet
 from .organization_view_set import OrganizationViewSet
 from .query import Query
+from .query_job import QueryJobStatus, QueryJobResults
 from .quicksight import (
     QuickSightActivitiesDashboard,
     QuickSightChallenges,
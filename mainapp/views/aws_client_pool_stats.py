@@ -0,0 +1,16 @@
+import logging
+import os
+
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from mainapp.utils import aws_service
+
+logger = logging.getLogger(__name__)
+
+
+class AWSClientPoolStats(APIView):
+    # noinspection PyMethodMayBeStatic
+    def get(self, request):
+        # every gunicorn worker holds its own pool, so the pid tells which worker answered
+        return Response({"pid": os.getpid(), **aws_service.client_pool_stats()})
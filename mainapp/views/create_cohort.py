@@ -1,6 +1,5 @@
 import json
 import logging
-from time import sleep
 
 from django.db.utils import IntegrityError
 from rest_framework.generics import GenericAPIView
@@ -135,17 +134,10 @@ class CreateCohort(GenericAPIView):
 
             logger.debug(f"Response of created query {response}")
 
-            sleep(20)
-            s3_object = lib.determine_data_source_s3_object_from_execution_id(
-                query_execution_id=response["QueryExecutionId"],
-                org_name=org_name,
-                dataset=destination_dataset,
-            )
-
             new_data_source = data_source
             new_data_source.glue_table = data_source.dir
             new_data_source.id = None
-            new_data_source.s3_objects = [s3_object]
+            new_data_source.s3_objects = list()
             new_data_source.dataset = destination_dataset
             cohort = {"filter": data_filter, "columns": columns, "limit": limit}
             new_data_source.cohort = cohort
@@ -169,6 +161,7 @@ class CreateCohort(GenericAPIView):
             process_structured_cohort_in_background(
                 org_name=org_name,
                 data_source=new_data_source,
+                query_execution_id=response["QueryExecutionId"],
                 columns=columns,
                 data_filter=data_filter,
                 orig_data_source=dataset.data_sources.get(
@@ -176,7 +169,11 @@ class CreateCohort(GenericAPIView):
                 ),
             )
 
-            req_res = {"query": query, "ctas_query": ctas_query}
+            req_res = {
+                "query": query,
+                "ctas_query": ctas_query,
+                "query_execution_id": response["QueryExecutionId"],
+            }
             return Response(req_res, status=201)
 
         else:
@@ -1,10 +1,7 @@
 import json
 import logging
-import os
-import shutil
 import threading
 
-import pyreadstat
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
@@ -13,12 +10,19 @@ from rest_framework.viewsets import ModelViewSet
 from slugify import slugify
 
 
-from mainapp.models import Execution, DataSource, Method
-from mainapp.serializers import DataSourceSerializer, DataSourceColumnsSerializer
-from mainapp.utils import statistics, lib, aws_service
-from mainapp.utils.aws_utils import s3_storage
+from mainapp.exceptions import UnsupportedColumnTypeError
+from mainapp.models import Execution, DataSource, Method, QueryJob
+from mainapp.serializers import (
+    DataSourceSerializer,
+    DataSourceColumnsSerializer,
+    QueryJobSerializer,
+)
+from mainapp.utils import lib, aws_service
 from mainapp.utils.deidentification import DeidentificationError
-from mainapp.utils.deidentification.common.deid_helper_functions import handle_method
+from mainapp.utils.deidentification.common.deid_helper_functions import (
+    prepare_method,
+    submit_method_handlers,
+)
 from mainapp.utils.lib import process_structured_data_source_in_background
 from mainapp.utils.permissions import IsDataSourceAdmin
 from mainapp.utils.monitoring import handle_event, MonitorEvents
@@ -27,6 +31,7 @@ from mainapp.utils.response_handler import (
     ForbiddenErrorResponse,
     NotFoundErrorResponse,
     BadRequestErrorResponse,
+    UnimplementedErrorResponse,
 )
 
 logger = logging.getLogger(__name__)
@@ -64,18 +69,33 @@ class DataSourceViewSet(ModelViewSet):
         if query_from_front:
             query_from_front = json.loads(query_from_front)
 
-        final_result, response = lib.calculate_statistics(
-            data_source, query_from_front=query_from_front
+        try:
+            query, columns_types, _ = lib.build_statistics_query(
+                data_source, query_from_front=query_from_front
+            )
+        except UnsupportedColumnTypeError as e:
+            return UnimplementedErrorResponse(
+                "There was some error in execution", error=e
+            )
+        except Exception as e:
+            return ErrorResponse("There was some error in execution", error=e)
+
+        query_job = QueryJob.objects.create(
+            type=QueryJob.STATISTICS,
+            user=request.user,
+            dataset=data_source.dataset,
+            data_source=data_source,
+            glue_table=data_source.glue_table,
+            query=query,
+            columns_types=columns_types,
         )
+        query_job.submit()
+        if query_job.state == QueryJob.ERROR:
+            return ErrorResponse(
+                "There was some error in execution", error=Exception(query_job.error)
+            )
 
-        if request.user in data_source.dataset.aggregated_users.all():
-            max_rows_after_filter = statistics.max_count(response)
-            if max_rows_after_filter < 100:
-                return ForbiddenErrorResponse(
-                    "Sorry, we can not show you the results, the cohort is too small"
-                )
-
-        return Response(final_result)
+        return Response(QueryJobSerializer(query_job).data, status=202)
 
     @action(detail=True, methods=["get"])
     def example(self, request, *args, **kwargs):
@@ -119,17 +139,40 @@ class DataSourceViewSet(ModelViewSet):
 
         changed_columns = columns_serialized.get_changed_columns()
         if data_source.methods:
+            try:
+                # methods whose output is still up to date are not de-identified again
+                source_objects = lib.get_source_objects(
+                    org_name=data_source.dataset.organization.name,
+                    data_source=data_source,
+                )
+            except Exception as e:
+                logger.warning(
+                    f"Could not get the source objects of Data Source {data_source.name}:{data_source.id}, "
+                    f"rebuilding its methods - {e}"
+                )
+                source_objects = None
+
             dsrc_index = 0
+            handlers = list()
             for dsrc_method in data_source.methods.all():
                 dsrc_index += 1
                 try:
                     if any([col in dsrc_method.attributes for col in changed_columns]):
-                        handle_method(dsrc_method, data_source, dsrc_index)
+                        handler = prepare_method(
+                            dsrc_method, data_source, dsrc_index, source_objects
+                        )
+                        if handler:
+                            handlers.append(handler)
                 except DeidentificationError as de:
+                    # methods validated so far are already pending
+                    submit_method_handlers(handlers)
                     return BadRequestErrorResponse(str(de))
                 except Exception:
                     dsrc_method.set_as_error()
 
+            # methods of the data source are de-identified together, in a single read of it
+            submit_method_handlers(handlers)
+
         return Response(
             self.serializer_class(data_source, allow_null=True).data, status=201
         )
@@ -194,18 +237,10 @@ class DataSourceViewSet(ModelViewSet):
         data_source = data_source_serialized.save()
         data_source.set_as_pending()
         s3_obj = data_source.s3_objects[0]["key"]
-        _, file_name, _, _ = lib.break_s3_object(s3_obj)
-        workdir = f"/tmp/{data_source.id}"
         s3_client = aws_service.create_s3_client(org_name=dataset.organization.name)
-        local_path = os.path.join(workdir, file_name)
         try:
             lib.validate_file_type(
-                s3_client,
-                data_source.dataset.bucket,
-                workdir,
-                s3_obj,
-                local_path,
-                self.file_types,
+                s3_client, data_source.dataset.bucket, s3_obj, self.file_types
             )
         except Exception:
             data_source.set_as_error()
@@ -226,70 +261,38 @@ class DataSourceViewSet(ModelViewSet):
             s3_obj = data_source.s3_objects[0]["key"]
             path, file_name, file_name_no_ext, ext = lib.break_s3_object(s3_obj)
 
-            if ext in ["sav", "zsav"]:  # convert to csv
-                s3_client = aws_service.create_s3_client(
-                    org_name=data_source.dataset.organization.name
+            if ext in ["sav", "zsav"]:  # converted to csv in the background
+                data_source.save()
+                lib.process_sav_data_source_in_background(
+                    org_name=dataset.organization.name,
+                    data_source=data_source,
+                    check_columns=request.data["is_column_present"],
                 )
-                workdir = f"/tmp/{data_source.id}"
-                os.makedirs(workdir)
+            else:
                 try:
-                    s3_storage.download_file(
-                        s3_client=s3_client,
-                        bucket_name=data_source.dataset.bucket,
-                        s3_object=s3_obj,
-                        file_path=os.path.join(workdir, file_name),
-                    )
+                    if request.data["is_column_present"]:
+                        lib.check_csv_for_empty_columns(
+                            org_name=dataset.organization.name, data_source=data_source
+                        )
                 except Exception as e:
-                    return ErrorResponse(
-                        f"There was an error to download the file {file_name} with error",
+                    dataset.save()
+                    return BadRequestErrorResponse(
+                        f"There was an error to when tried to check column name in data_source {data_source.name} "
+                        f"and data_source_id {data_source.id}",
                         error=e,
                     )
 
-                df, meta = pyreadstat.read_sav(workdir + "/" + file_name)
-                csv_path_and_file = workdir + "/" + file_name_no_ext + ".csv"
-                df.to_csv(csv_path_and_file)
-                try:
-                    s3_storage.upload_file(
-                        s3_client=s3_client,
-                        csv_path_and_file=csv_path_and_file,
-                        bucket_name=data_source.dataset.bucket,
-                        file_path=os.path.join(path, f"{file_name_no_ext}.csv"),
-                    )
-                except Exception as e:
-                    return ErrorResponse(
-                        f"There was an error to upload the file {file_name} with error",
-                        error=e,
-                    )
-                data_source.s3_objects.pop()
-                data_source.s3_objects.append(
-                    {
-                        "key": path + "/" + file_name_no_ext + ".csv",
-                        "size": os.path.getsize(csv_path_and_file),
-                    }
+                process_structured_data_source_in_background(
+                    org_name=dataset.organization.name, data_source=data_source
                 )
-                shutil.rmtree(workdir)
-
-            try:
-                if request.data["is_column_present"]:
-                    lib.check_csv_for_empty_columns(
-                        org_name=dataset.organization.name, data_source=data_source
-                    )
-            except Exception as e:
-                dataset.save()
-                return BadRequestErrorResponse(
-                    f"There was an error to when tried to check column name in data_source {data_source.name} "
-                    f"and data_source_id {data_source.id}",
-                    error=e,
-                )
-
-            process_structured_data_source_in_background(
-                org_name=dataset.organization.name, data_source=data_source
-            )
 
         elif data_source.type == DataSource.ZIP:
             handle_zip_thread = threading.Thread(
                 target=lib.handle_zipped_data_source,
-                args=[data_source, request.user.organization.name],
+                kwargs={
+                    "data_source": data_source,
+                    "org_name": request.user.organization.name,
+                },
             )
             handle_zip_thread.start()
 
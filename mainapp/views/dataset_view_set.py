@@ -1,6 +1,5 @@
 import json
 import logging
-import os
 import time
 import uuid
 
@@ -14,11 +13,29 @@ from slugify import slugify
 
 from mainapp import resources, settings
 from mainapp.exceptions.s3 import TooManyBucketsException
-from mainapp.models import User, Dataset, Tag, Execution, Activity, DatasetUser, Method
-from mainapp.serializers import DatasetSerializer, MethodSerializer
+from mainapp.models import (
+    User,
+    Dataset,
+    DataSource,
+    Tag,
+    Execution,
+    Activity,
+    DatasetUser,
+    Method,
+)
+from mainapp.serializers import (
+    DatasetSerializer,
+    DataSourceMethodSerializer,
+    MethodSerializer,
+)
 from mainapp.utils import lib, aws_service
-from mainapp.utils.deidentification.common.deid_helper_functions import handle_method
+from mainapp.utils.deidentification.common.deid_helper_functions import (
+    prepare_method,
+    resume_abandoned_methods,
+    submit_method_handlers,
+)
 from mainapp.utils.deidentification.image_de_id_helper import ImageDeIdHelper
+from mainapp.utils.deidentification import preview
 from mainapp.utils.lib import process_structured_data_sources_in_background
 from mainapp.utils.permissions import IsDatasetAdmin
 from mainapp.utils.monitoring.monitor_events import MonitorEvents
@@ -41,6 +58,7 @@ class DatasetViewSet(ModelViewSet):
         "data_source_examples",
         "methods",
         "add_method",
+        "preview_method",
         "update",
         "destroy",
     ]
@@ -124,6 +142,7 @@ class DatasetViewSet(ModelViewSet):
 
         method_serialized.is_valid(raise_exception=True)
 
+        resume_abandoned_methods(dataset)
         for method in dataset.methods.all():
             if method.state == Method.PENDING:
                 logger.warning(
@@ -143,20 +162,66 @@ class DatasetViewSet(ModelViewSet):
         )
         if method.data_source_methods:
             dsrc_index = 0
+            handlers = list()
             for dsrc_method in method.data_source_methods.all():
                 dsrc_index += 1
                 try:
-                    handle_method(dsrc_method, dsrc_method.data_source, dsrc_index)
+                    handler = prepare_method(
+                        dsrc_method, dsrc_method.data_source, dsrc_index
+                    )
+                    if handler:
+                        handlers.append(handler)
                 except Exception as e:
                     # If the code reached here, it means that an error was raised trying to create the method handler.
                     # Meaning data source methods will never be invoked, so the method is discarded.
                     method.delete()
                     return BadRequestErrorResponse(str(e))
 
+            submit_method_handlers(handlers)
+
         method.save()
 
         return Response(MethodSerializer(method).data, status=201)
 
+    @action(detail=True, methods=["post"])
+    def preview_method(self, request, *args, **kwargs):
+        """
+        De-identify a sample of the structured data sources of the dataset with a draft method,
+        without creating it. Returns the original and de-identified rows of every data source.
+        """
+        dataset = self.get_object()
+        dsrc_methods_serialized = DataSourceMethodSerializer(
+            data=request.data.get("data_source_methods", list()), many=True
+        )
+        dsrc_methods_serialized.is_valid(raise_exception=True)
+
+        previews = dict()
+        for dsrc_method in dsrc_methods_serialized.validated_data:
+            data_source = dsrc_method["data_source"]
+            if data_source.dataset_id != dataset.id:
+                return BadRequestErrorResponse(
+                    f"Data Source {data_source.id} is not in Dataset {dataset.id}"
+                )
+            if (
+                not dsrc_method.get("included", True)
+                or data_source.type != DataSource.STRUCTURED
+            ):
+                continue
+
+            try:
+                previews[str(data_source.id)] = preview.preview_method(
+                    data_source,
+                    dsrc_method.get("attributes", dict()),
+                    group_age_over=bool(request.data.get("group_age_over")),
+                )
+            except Exception as e:
+                logger.warning(
+                    f"Could not preview method for Data Source {data_source.name}:{data_source.id} - {e}"
+                )
+                return BadRequestErrorResponse(str(e))
+
+        return Response(previews, status=200)
+
     def get_queryset(self):
         return self.request.user.datasets.exclude(is_deleted=True)
 
@@ -626,18 +691,14 @@ class DatasetViewSet(ModelViewSet):
             if dataset.cover != request.data["cover"]:
                 if not request.data["cover"].lower().startswith("dataset/gallery"):
                     file_name = request.data["cover"]
-                    workdir = "/tmp/"
                     s3_client = aws_service.create_s3_client(
                         org_name=settings.LYNX_ORGANIZATION
                     )
-                    local_path = os.path.join(workdir, file_name)
                     try:
                         lib.validate_file_type(
                             s3_client=s3_client,
                             bucket=settings.LYNX_FRONT_STATIC_BUCKET,
-                            workdir="/tmp/dataset/",
                             object_key=file_name,
-                            local_path=local_path,
                             file_types=self.file_types,
                         )
                     except Exception as e:
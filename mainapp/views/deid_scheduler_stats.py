@@ -0,0 +1,16 @@
+import logging
+import os
+
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from mainapp.utils.deidentification.scheduler import deid_scheduler
+
+logger = logging.getLogger(__name__)
+
+
+class DeidSchedulerStats(APIView):
+    # noinspection PyMethodMayBeStatic
+    def get(self, request):
+        # every gunicorn worker runs its own scheduler, so the pid tells which worker answered
+        return Response({"pid": os.getpid(), **deid_scheduler.stats()})
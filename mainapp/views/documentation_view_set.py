@@ -1,4 +1,3 @@
-import os
 import logging
 
 from botocore.config import Config
@@ -8,6 +7,7 @@ from rest_framework.viewsets import ModelViewSet
 from mainapp.models import Documentation
 from mainapp.serializers import DocumentationSerializer
 from mainapp.utils import aws_service, lib
+from mainapp.utils.aws_utils import s3_move
 from mainapp.utils.response_handler import BadRequestErrorResponse
 
 logger = logging.getLogger(__name__)
@@ -74,29 +74,20 @@ class DocumentationViewSet(ModelViewSet):
             doc_serialized.is_valid(raise_exception=True)
             documentations = doc_serialized.save()
             dataset = documentations[0].dataset
-            workdir = f"/tmp/documentation_{dataset.id}"
             s3_client = aws_service.create_s3_client(org_name=dataset.organization.name)
-            validated_files = []
+            file_keys = [
+                f"documentation/{documentation.file_name}"
+                for documentation in documentations
+            ]
             try:
-                for documentation in documentations:
-                    local_path = os.path.join(workdir, documentation.file_name)
-                    file_key = f"documentation/{documentation.file_name}"
-                    lib.validate_file_type(
-                        s3_client,
-                        documentation.dataset.bucket,
-                        workdir,
-                        file_key,
-                        local_path,
-                        self.file_types,
-                    )
-
-                    validated_files.append(file_key)
+                lib.validate_file_types(
+                    s3_client, dataset.bucket, file_keys, self.file_types
+                )
             except Exception:
                 for documentation in documentations:
                     documentation.delete()
 
-                for file_to_delete in validated_files:
-                    s3_client.delete_object(Bucket=dataset.bucket, Key=file_to_delete)
+                s3_move.delete_objects(s3_client, dataset.bucket, file_keys)
                 raise
 
         except Exception:
@@ -4,8 +4,7 @@ import logging
 from rest_framework.generics import GenericAPIView
 from rest_framework.response import Response
 
-from mainapp.exceptions import BucketNotFound
-from mainapp.models import Dataset, DataSource
+from mainapp.models import Dataset, DataSource, QueryJob
 from mainapp.serializers import QuerySerializer
 from mainapp.utils import devexpress_filtering
 from mainapp.utils import lib
@@ -90,149 +89,49 @@ class Query(GenericAPIView):
                 )
                 _, count_query, _ = lib.get_query_no_limit_and_count_query(query)
 
-            req_res = {}
+            return_count = True if request.GET.get("return_count") == "true" else False
 
-            final_query = query_no_limit
+            query_job = QueryJob.objects.create(
+                type=QueryJob.QUERY,
+                user=user,
+                dataset=dataset,
+                data_source=data_source,
+                glue_table=glue_table,
+                query=query_no_limit,
+                count_query=count_query,
+                sample_aprx=sample_aprx,
+                limit=limit,
+                return_count=return_count,
+            )
             logger.info(
-                f"Executing Query : {final_query} "
+                f"Submitting QueryJob {query_job.id} : {query_no_limit} "
                 f"on dataset: {dataset.name}:{dataset.id} "
                 f"and datasource: {data_source.name}:{data_source.id} "
                 f"in org {dataset.organization.name} "
                 f"by user: {request.user.display_name}"
             )
-
-            return_count = True if request.GET.get("return_count") == "true" else False
-            if sample_aprx or return_count:
-                logger.debug(f"Count query: {count_query}")
-
-                try:
-                    response = dataset.query(count_query)
-                except Exception as e:
-                    return ErrorResponse(
-                        f"Failed executing the query: {count_query} ."
-                        f"Original query: {query}",
-                        error=e,
-                    )
-
-                query_execution_id = response["QueryExecutionId"]
-
-                try:
-                    obj = dataset.get_query_execution(query_execution_id)
-                except BucketNotFound as e:
-                    error = Exception(
-                        f"The requested bucket does not exist. Query result file was not found. Query string: {query}"
-                    ).with_traceback(e.__traceback__)
-                    return ErrorResponse(
-                        f"Could not create result for following query {query}",
-                        error=error,
-                    )
-                except Exception as e:
-                    error = Exception(
-                        f"Can not get s3 object, with following error"
-                    ).with_traceback(e.__traceback__)
-                    return ErrorResponse(
-                        "Unknown error occurred during reading of the query result",
-                        error=error,
-                    )
-
-                count = int(
-                    obj["Body"].read().decode("utf-8").split("\n")[1].strip('"')
+            query_job.submit()
+            if query_job.state == QueryJob.ERROR:
+                return ErrorResponse(
+                    f"Query execution failed", error=Exception(query_job.error)
                 )
 
-                if return_count:
-                    req_res["count_no_limit"] = count
-
-                if sample_aprx:
-                    if count > sample_aprx:
-                        percentage = int((sample_aprx / count) * 100)
-                        final_query = (
-                            f"{query_no_limit} TABLESAMPLE BERNOULLI({percentage})"
-                        )
-
-            if limit:
-                final_query += f" LIMIT {limit}"
-
-            logger.debug(f"Final query: {final_query}")
-
-            try:
-                response = dataset.query(final_query)
-            except Exception as e:
-                error = Exception(
-                    f"Failed to start_query_execution with the following error"
-                ).with_traceback(e.__traceback__)
-                logger.info(
-                    f"Final query {final_query} on Dataset {dataset.name}:{dataset.id} in org {dataset.organization.name}"
-                )
-                return ErrorResponse(f"Query execution failed", error=error)
-
-            req_res["query"] = final_query
-            req_res["count_query"] = count_query
-            query_execution_id = response["QueryExecutionId"]
-            req_res["execution_result"] = {
-                "query_execution_id": query_execution_id,
-                "item": {
-                    "bucket": dataset.bucket,
-                    "key": f"temp_execution_results/{query_execution_id}.csv",
-                },
+            req_res = {
+                "job_id": query_job.id,
+                "state": query_job.state,
+                "query": query_no_limit,
+                "count_query": count_query,
             }
 
-            return_result = (
-                True if request.GET.get("return_result") == "true" else False
-            )
-            result_format = request.GET.get("result_format")
-
-            if result_format and not return_result:
-                return BadRequestErrorResponse(
-                    "Why result_format and no return_result=true?"
-                )
-
             return_columns_types = (
                 True if request.GET.get("return_columns_types") == "true" else False
             )
-            if return_columns_types or (return_result and result_format == "json"):
-                columns_types = dataset.get_columns_types(glue_table=glue_table)
-                if return_columns_types:
-                    req_res["columns_types"] = columns_types
-
-            if return_result:
-                try:
-                    result_obj = dataset.get_query_execution(query_execution_id)
-                except BucketNotFound as e:
-                    error = Exception(
-                        f"Query result file does not exist in bucket. Query string: {query}"
-                    ).with_traceback(e.__traceback__)
-                    logger.info(
-                        f"No result for query: {query} on Dataset {dataset.name}:{dataset.id} "
-                        f"in org {dataset.organization.name}"
-                    )
-                    return ErrorResponse(
-                        f"Could not create result for following query", error=error
-                    )
-                except Exception as e:
-                    error = Exception(
-                        f"Can not get s3 object, with following error"
-                    ).with_traceback(e.__traceback__)
-                    return ForbiddenErrorResponse(
-                        "Unauthorized to perform this request", error=error
-                    )
-
-                result = result_obj["Body"].read().decode("utf-8")
-                result_no_quotes = (
-                    result.replace('"\n"', "\n")
-                    .replace('","', ",")
-                    .strip('"')
-                    .strip('\n"')
+            if return_columns_types:
+                req_res["columns_types"] = dataset.get_columns_types(
+                    glue_table=glue_table
                 )
 
-                if return_result:
-                    if result_format == "json":
-                        req_res["result"] = lib.csv_to_json(
-                            result_no_quotes, columns_types
-                        )
-                    else:
-                        req_res["result"] = result_no_quotes
-
-            return Response(req_res)
+            return Response(req_res, status=202)
         else:
             return BadRequestErrorResponse(
                 "Bad Request:", error=query_serialized.errors
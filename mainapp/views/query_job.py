@@ -0,0 +1,113 @@
+import logging
+
+from django.core.exceptions import ValidationError
+from rest_framework.generics import GenericAPIView
+from rest_framework.response import Response
+
+from mainapp.models import QueryJob
+from mainapp.serializers import QueryJobSerializer
+from mainapp.utils.response_handler import (
+    ErrorResponse,
+    ForbiddenErrorResponse,
+    NotFoundErrorResponse,
+    BadRequestErrorResponse,
+    ConflictErrorResponse,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def get_user_query_job(user, job_id):
+    try:
+        return user.query_jobs.get(id=job_id)
+    except (QueryJob.DoesNotExist, ValidationError):
+        return None
+
+
+class QueryJobStatus(GenericAPIView):
+    serializer_class = QueryJobSerializer
+
+    def get(self, request, job_id):
+        query_job = get_user_query_job(request.user, job_id)
+        if not query_job:
+            return NotFoundErrorResponse(f"Query job {job_id} does not exist")
+
+        try:
+            query_execution = query_job.refresh()
+        except Exception as e:
+            return ErrorResponse(
+                f"Could not get the state of query job {job_id}", error=e
+            )
+
+        req_res = self.serializer_class(query_job).data
+        if query_job.return_count:
+            req_res["count_no_limit"] = query_job.count
+
+        if query_execution:
+            execution_statistics = query_execution.get("Statistics", dict())
+            req_res["execution"] = {
+                "query_execution_id": query_execution["QueryExecutionId"],
+                "state": query_execution["Status"]["State"],
+                "data_scanned_in_bytes": execution_statistics.get("DataScannedInBytes"),
+                "engine_execution_time_in_millis": execution_statistics.get(
+                    "EngineExecutionTimeInMillis"
+                ),
+                "total_execution_time_in_millis": execution_statistics.get(
+                    "TotalExecutionTimeInMillis"
+                ),
+            }
+
+        if query_job.execution_id:
+            req_res["execution_result"] = {
+                "query_execution_id": query_job.execution_id,
+                "item": {
+                    "bucket": query_job.dataset.bucket,
+                    "key": f"temp_execution_results/{query_job.execution_id}.csv",
+                },
+            }
+
+        return Response(req_res)
+
+
+class QueryJobResults(GenericAPIView):
+    def get(self, request, job_id):
+        query_job = get_user_query_job(request.user, job_id)
+        if not query_job:
+            return NotFoundErrorResponse(f"Query job {job_id} does not exist")
+
+        if query_job.state == QueryJob.PENDING:
+            query_job.refresh()
+
+        if query_job.state == QueryJob.ERROR:
+            return ErrorResponse(f"Query job {job_id} failed: {query_job.error}")
+
+        if not query_job.is_ready():
+            return ConflictErrorResponse(f"Query job {job_id} is still running")
+
+        try:
+            page_size = int(request.GET.get("page_size", QueryJob.MAX_PAGE_SIZE))
+        except ValueError as e:
+            return BadRequestErrorResponse("page_size must be a number", error=e)
+
+        try:
+            results = query_job.results(
+                page_token=request.GET.get("page_token"),
+                page_size=page_size,
+                result_format=request.GET.get("result_format"),
+            )
+        except Exception as e:
+            return ErrorResponse(
+                f"Unknown error occurred during reading of the query result", error=e
+            )
+
+        if query_job.type == QueryJob.STATISTICS:
+            max_rows_after_filter = results.pop("max_count")
+            if (
+                request.user in query_job.dataset.aggregated_users.all()
+                and max_rows_after_filter < 100
+            ):
+                return ForbiddenErrorResponse(
+                    "Sorry, we can not show you the results, the cohort is too small"
+                )
+
+        return Response(results)
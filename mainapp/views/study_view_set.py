@@ -1,5 +1,4 @@
 import logging
-import os
 import uuid
 
 from rest_framework.decorators import action
@@ -210,18 +209,14 @@ class StudyViewSet(ModelViewSet):
             if study.cover != request.data["cover"]:
                 if not request.data["cover"].lower().startswith("dataset/gallery"):
                     file_name = request.data["cover"]
-                    workdir = "/tmp/"
                     s3_client = aws_service.create_s3_client(
                         org_name=settings.LYNX_ORGANIZATION
                     )
-                    local_path = os.path.join(workdir, file_name)
                     try:
                         lib.validate_file_type(
                             s3_client=s3_client,
                             bucket=settings.LYNX_FRONT_STATIC_BUCKET,
-                            workdir="/tmp/study/",
                             object_key=file_name,
-                            local_path=local_path,
                             file_types=self.file_types,
                         )
                     except Exception as e:
@@ -1,5 +1,4 @@
 import logging
-import os
 from rest_framework.response import Response
 from rest_framework import mixins, viewsets
 
@@ -55,18 +54,14 @@ class UserViewSet(
             return ForbiddenErrorResponse(f"User is not the same {request.user.id}")
         if user.photo != request.data["photo"]:
             file_name = request.data["photo"]
-            workdir = "/tmp/"
             s3_client = aws_service.create_s3_client(
                 org_name=settings.LYNX_ORGANIZATION
             )
-            local_path = os.path.join(workdir, file_name)
             try:
                 lib.validate_file_type(
                     s3_client=s3_client,
                     bucket=settings.LYNX_FRONT_STATIC_BUCKET,
-                    workdir="/tmp/user/",
                     object_key=file_name,
-                    local_path=local_path,
                     file_types=self.file_types,
                 )
             except Exception as e: